@@ -0,0 +1,214 @@
+"""Time template generation and the generated-project workflows for every option combination.
+
+``run`` bakes each entry of ``COMBINATIONS`` (tests/test_combinations.py) with cookiecutter and runs
+the generated project's make targets, timing every phase in a trace span:
+
+- ``render``: the whole ``cookiecutter`` call, with the ``pre_gen_project`` and ``post_gen_project``
+  hooks as nested spans
+- ``install``, ``check``, ``test``, ``docs-test``: the generated project's make targets (``docs-test``
+  only for combinations with documentation)
+
+The spans are written as a Chrome trace, and the per-phase seconds are appended as one JSON line to
+the history file. ``baseline`` stores the latest history entry as the baseline, and ``compare``
+fails if the latest entry is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, cast
+from unittest import mock
+
+from cookiecutter import generate
+from cookiecutter.main import cookiecutter
+from test_combinations import COMBINATIONS
+from tracing import Tracer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / ".benchmarks"
+HISTORY_FILE = RESULTS_DIR / "history.jsonl"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+PHASES = ("render", "install", "check", "test", "docs-test")
+# Phases run as make targets in the generated project, in order; a failing phase skips the rest.
+PROJECT_PHASES = {"install": "make install", "check": "make check", "test": "make test", "docs-test": "make docs-test"}
+
+Results = dict[str, dict[str, float]]
+
+
+def bake(tracer: Tracer, options: dict[str, str], output_dir: Path) -> Path:
+    """Render the template with cookiecutter, wrapping each hook in its own span."""
+
+    def traced_hook(repo_dir: Any, hook_name: str, *args: Any, **kwargs: Any) -> None:
+        with tracer.span(hook_name):
+            run_hook_from_repo_dir(repo_dir, hook_name, *args, **kwargs)
+
+    run_hook_from_repo_dir = generate.run_hook_from_repo_dir
+    with mock.patch.object(generate, "run_hook_from_repo_dir", traced_hook):
+        project_dir = cookiecutter(str(REPO_ROOT), no_input=True, extra_context=options, output_dir=str(output_dir))
+    return Path(project_dir)
+
+
+def run_project_command(project_dir: Path, command: str) -> subprocess.CompletedProcess:
+    # Strip VIRTUAL_ENV so this repo's environment doesn't leak into the generated project.
+    env = {k: v for k, v in os.environ.items() if k != "VIRTUAL_ENV"}
+    return subprocess.run(command.split(), cwd=project_dir, capture_output=True, text=True, env=env)
+
+
+def bench_combination(
+    tracer: Tracer, combination_id: str, options: dict[str, str], phases: list[str]
+) -> dict[str, float]:
+    """Run the selected phases for one combination and return their durations in seconds."""
+    timings: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp, tracer.span(combination_id, **options):
+        with tracer.span("render") as event:
+            project_dir = bake(tracer, options, Path(tmp))
+        timings["render"] = event["seconds"]
+        for hook in ("pre_gen_project", "post_gen_project"):
+            timings[hook] = next(e["seconds"] for e in reversed(tracer.events) if e["name"] == hook)
+        if not any(phase in PROJECT_PHASES for phase in phases):
+            return timings
+
+        run_project_command(project_dir, "git init")
+        run_project_command(project_dir, "git add .")
+        for phase, command in PROJECT_PHASES.items():
+            if phase not in phases or (phase == "docs-test" and not (project_dir / "zensical.toml").exists()):
+                continue
+            with tracer.span(phase) as event:
+                result = run_project_command(project_dir, command)
+                event["args"]["returncode"] = result.returncode
+            if result.returncode != 0:
+                msg = f"{combination_id}: '{command}' failed\n{result.stdout}\n{result.stderr}"
+                raise RuntimeError(msg)
+            timings[phase] = event["seconds"]
+    return timings
+
+
+def git_commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def run(args: argparse.Namespace) -> int:
+    tracer = Tracer()
+    results: Results = {}
+    failures = []
+    for param in COMBINATIONS:
+        combination_id, options = str(param.id), cast(dict[str, str], param.values[0])
+        if args.combination and combination_id not in args.combination:
+            continue
+        samples = []
+        for _ in range(args.repeat):
+            try:
+                samples.append(bench_combination(tracer, combination_id, options, args.phases))
+            except Exception as e:
+                failures.append(str(e))
+                print(f"FAILED {e}", file=sys.stderr)
+                break
+        if samples:
+            results[combination_id] = {phase: statistics.median(s[phase] for s in samples) for phase in samples[0]}
+            print(f"{combination_id}: " + ", ".join(f"{k} {v:.2f}s" for k, v in results[combination_id].items()))
+
+    timestamp = datetime.datetime.now(datetime.UTC)
+    trace_path = args.trace or RESULTS_DIR / f"trace-{timestamp:%Y%m%dT%H%M%S}.json"
+    tracer.write(trace_path)
+    entry = {
+        "timestamp": timestamp.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+        "failures": failures,
+    }
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with args.history.open("a") as f:
+        f.write(json.dumps(entry) + "\n")
+    print(f"Trace written to {trace_path}, results appended to {args.history}")
+    return 1 if failures else 0
+
+
+def latest_entry(history: Path) -> dict:
+    lines = history.read_text().splitlines() if history.is_file() else []
+    if not lines:
+        msg = f"No benchmark results in {history}; run 'bench.py run' first"
+        raise SystemExit(msg)
+    return json.loads(lines[-1])
+
+
+def save_baseline(args: argparse.Namespace) -> int:
+    entry = latest_entry(args.history)
+    args.baseline.write_text(json.dumps(entry, indent=2) + "\n")
+    print(f"Saved results of {entry['timestamp']} ({entry['commit']}) as the baseline in {args.baseline}")
+    return 0
+
+
+def find_regressions(baseline: Results, current: Results, threshold: float, min_delta: float) -> list[str]:
+    """Describe every phase that got slower than ``threshold`` (a fraction) and ``min_delta`` seconds."""
+    regressions = []
+    for combination_id, timings in current.items():
+        for phase, seconds in timings.items():
+            base = baseline.get(combination_id, {}).get(phase)
+            if base is None:
+                continue
+            if seconds > base * (1 + threshold) and seconds - base > min_delta:
+                regressions.append(
+                    f"{combination_id}/{phase}: {base:.2f}s -> {seconds:.2f}s (+{seconds / base - 1:.0%})"
+                )
+    return regressions
+
+
+def compare(args: argparse.Namespace) -> int:
+    if not args.baseline.is_file():
+        msg = f"No baseline at {args.baseline}; run 'bench.py baseline' first"
+        raise SystemExit(msg)
+    baseline = json.loads(args.baseline.read_text())
+    current = latest_entry(args.history)
+    regressions = find_regressions(baseline["results"], current["results"], args.threshold, args.min_delta)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(
+        f"{len(regressions)} regression(s) beyond {args.threshold:.0%} comparing {current['commit']} "
+        f"against baseline {baseline['commit']}"
+    )
+    return 1 if regressions else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="bench", description="Benchmark template generation and generated-project workflows."
+    )
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="JSON-lines file of past results")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="results to compare against")
+    subparsers = parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="time every phase of every combination")
+    run_parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    run_parser.add_argument("--combination", nargs="+", help="only these combination ids")
+    run_parser.add_argument("--repeat", type=int, default=1, help="runs per combination; the median is kept")
+    run_parser.add_argument("--trace", type=Path, help="trace output path (default: .benchmarks/trace-<time>.json)")
+    run_parser.set_defaults(handler=run)
+
+    baseline_parser = subparsers.add_parser("baseline", help="store the latest results as the baseline")
+    baseline_parser.set_defaults(handler=save_baseline)
+
+    compare_parser = subparsers.add_parser("compare", help="fail if the latest results regressed against the baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (default: 0.2 = 20%%)")
+    compare_parser.add_argument(
+        "--min-delta", type=float, default=0.05, help="ignore slowdowns below this many seconds (default: 0.05)"
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
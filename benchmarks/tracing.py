@@ -0,0 +1,43 @@
+"""Nested timing spans recorded as a Chrome trace (open it in https://ui.perfetto.dev or chrome://tracing)."""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+class Tracer:
+    """Collects complete ("X") trace events; each span also reports its duration to the caller."""
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self._origin = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Generator[dict[str, Any]]:
+        """Time the enclosed block; the yielded event gains ``seconds`` on exit and accepts extra ``args``."""
+        event: dict[str, Any] = {
+            "name": name,
+            "ph": "X",
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        start = time.perf_counter_ns()
+        try:
+            yield event
+        finally:
+            end = time.perf_counter_ns()
+            event["ts"] = (start - self._origin) / 1000
+            event["dur"] = (end - start) / 1000
+            event["seconds"] = (end - start) / 1e9
+            self.events.append(event)
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = [{k: v for k, v in event.items() if k != "seconds"} for event in self.events]
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=2) + "\n")
@@ -0,0 +1,181 @@
+"""Pack the template into a single precompiled bundle file, and generate projects from it.
+
+`compile_bundle` stores everything a `Template` discovers and parses at startup in one file: the
+cookiecutter.json configuration, the template name and commit, the file manifest (paths, modes, newline styles),
+every Jinja template (file contents, file paths, the project directory name, the pre-generation hook and
+the templates that files include) compiled to marshalled Python bytecode, and the contents of binary files.
+
+`BundledTemplate` maps the bundle with a single mmap and rebuilds the templates from their bytecode,
+so loading involves no directory walk, file reads or Jinja parsing. It otherwise renders exactly
+like `Template`, running the (Python) hook in-process.
+
+Bytecode is tied to the Python and Jinja versions that compiled it, which the bundle header records;
+loading a bundle built by other versions raises `BundleError`. Recompile the bundle whenever the
+template changes.
+
+Layout: ``MAGIC``, the header length as a 4-byte big-endian integer, the JSON header, then the data
+blobs the header refers to by (offset, length) relative to the end of the header.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import marshal
+import mmap
+import struct
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any
+
+import jinja2
+from cookiecutter.environment import StrictEnvironment
+from engine import INCLUDE_DIR, Template, TemplateFile, extension_import_path
+
+MAGIC = b"CCUVBNDL"
+FORMAT_VERSION = 3
+_LENGTH = struct.Struct(">I")
+
+
+class BundleError(Exception):
+    """The file is not a bundle, or was compiled by an incompatible version."""
+
+
+def _runtime() -> dict[str, Any]:
+    return {
+        "format": FORMAT_VERSION,
+        "python": importlib.util.MAGIC_NUMBER.hex(),
+        "jinja2": jinja2.__version__,
+    }
+
+
+def compile_bundle(template: Template, path: Path) -> Path:
+    """Write ``template``, with every Jinja template compiled to bytecode, to the bundle file ``path``."""
+    blobs: list[bytes] = []
+    offset = 0
+
+    def add(data: bytes) -> list[int]:
+        nonlocal offset
+        blobs.append(data)
+        offset += len(data)
+        return [offset - len(data), len(data)]
+
+    def add_code(source: str, name: str | None = None) -> list[int]:
+        return add(marshal.dumps(template.env.compile(source, name=name, filename=name)))
+
+    files = []
+    for f in template.files:
+        source = template.project_template / f.path
+        if f.binary:
+            content = add(source.read_bytes())
+        else:
+            content = add_code(source.read_text(encoding="utf-8"), f.path)
+        files.append({"path": f.path, "mode": f.mode, "binary": f.binary, "newline": f.newline, "content": content})
+        files[-1]["path_code"] = add_code(f.path)
+
+    hooks = {}
+    for name, hook_path in template.hooks.items():
+        if hook_path.suffix != ".py":
+            msg = f"Only Python hooks can be bundled, not {hook_path.name}"
+            raise BundleError(msg)
+        hooks[name] = {"filename": hook_path.name, "code": add_code(hook_path.read_text(encoding="utf-8"))}
+
+    include_dir = template.root / INCLUDE_DIR
+    includes = {}
+    for include in sorted(include_dir.rglob("*")) if include_dir.is_dir() else []:
+        if include.is_file():
+            name = include.relative_to(include_dir).as_posix()
+            includes[name] = add_code(include.read_text(encoding="utf-8"), name)
+
+    header = {
+        **_runtime(),
+        "root": str(template.root),
+        "commit": template.commit,
+        "source": template.source,
+        "project_template": template.project_template.name,
+        "config": template.config,
+        "name_code": add_code(template.project_template.name),
+        "files": files,
+        "hooks": hooks,
+        "includes": includes,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as out:
+        out.write(MAGIC + _LENGTH.pack(len(header_bytes)) + header_bytes)
+        out.writelines(blobs)
+    return path
+
+
+class _CompiledLoader(jinja2.BaseLoader):
+    """Loads the templates that files include from their compiled bytecode."""
+
+    def __init__(self, templates: dict[str, jinja2.Template]) -> None:
+        self.templates = templates
+
+    def load(
+        self, environment: jinja2.Environment, name: str, globals: MutableMapping[str, Any] | None = None
+    ) -> jinja2.Template:
+        if name not in self.templates:
+            raise jinja2.TemplateNotFound(name)
+        return self.templates[name]
+
+
+class BundledTemplate(Template):
+    """A `Template` loaded from a bundle file written by `compile_bundle`."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = len(MAGIC) + _LENGTH.size
+            try:
+                if data[: len(MAGIC)] != MAGIC:
+                    raise ValueError
+                (header_length,) = _LENGTH.unpack_from(data, len(MAGIC))
+                header = json.loads(data[start : start + header_length], object_pairs_hook=OrderedDict)
+            except (ValueError, struct.error):
+                msg = f"{path} is not a cookiecutter-uv bundle"
+                raise BundleError(msg) from None
+            runtime = _runtime()
+            if {key: header.get(key) for key in runtime} != runtime:
+                built = ", ".join(f"{key} {header.get(key)}" for key in runtime)
+                msg = f"{path} was compiled for {built}; recompile it with this Python and Jinja"
+                raise BundleError(msg)
+            # Release the view before the mmap closes, which fails while views of it are alive.
+            with memoryview(data)[start + header_length :] as blobs:
+                self._load(header, blobs)
+
+    def _load(self, header: dict[str, Any], blobs: memoryview) -> None:
+        def blob(location: list[int]) -> bytes:
+            offset, length = location
+            return bytes(blobs[offset : offset + length])
+
+        def template(location: list[int]) -> jinja2.Template:
+            code = marshal.loads(blobs[location[0] : location[0] + location[1]])
+            return self.env.template_class.from_code(self.env, code, self.env.make_globals(None))
+
+        self.root = Path(header["root"])
+        self.commit = header["commit"]
+        self.source = header["source"]
+        self.config = header["config"]
+        with extension_import_path(self.root):
+            self.env = StrictEnvironment(
+                context={"cookiecutter": self.config},
+                keep_trailing_newline=True,
+                auto_reload=False,
+                **self.config.get("_jinja2_env_vars", {}),
+            )
+        self.env.loader = _CompiledLoader({name: template(code) for name, code in header["includes"].items()})
+        self.project_template = self.root / header["project_template"]
+        self.files = tuple(TemplateFile(f["path"], f["mode"], f["binary"], f["newline"]) for f in header["files"])
+        self._path_templates = {f["path"]: template(f["path_code"]) for f in header["files"]}
+        self._templates = {f["path"]: template(f["content"]) for f in header["files"] if not f["binary"]}
+        self._binaries = {f["path"]: blob(f["content"]) for f in header["files"] if f["binary"]}
+        self._name_template = template(header["name_code"])
+        self._hook_templates = {
+            name: (hook["filename"], template(hook["code"])) for name, hook in header["hooks"].items()
+        }
+        self.hooks = {name: self.root / "hooks" / filename for name, (filename, _) in self._hook_templates.items()}
+
+    def _read_binary(self, f: TemplateFile) -> bytes:
+        return self._binaries[f.path]
@@ -0,0 +1,338 @@
+"""Render the cookiecutter-uv template in-process, loading and parsing it only once.
+
+A `Template` discovers the template tree, parses every Jinja template and builds the Jinja
+environment a single time; each call to `Template.generate` then only runs the pre-generation hook,
+in this process, and renders and writes files.
+`Template.dry_run` renders into a `VirtualProject` instead, which holds the files in memory and
+answers the same questions about them as a project on disk, without any disk I/O.
+
+The ``_manifest`` in cookiecutter.json is evaluated before rendering: paths the options exclude
+are never rendered or written, and relocated paths are written straight to their final location.
+Generated projects are identical to what `cookiecutter` (which renders everything and lets the
+post-generation hook apply the manifest afterwards) produces for the same context.
+
+Both also write a generation record, ``.cookiecutter-uv.json``, holding the template (the URL of its
+git remote, or its directory name) and its commit, the options the project was generated with and a hash of every generated file, from which
+`cookiecutter-uv/update.py` later updates the project to a newer template. The manifest and the record
+are implemented once, in `cookiecutter-uv/manifest.py`, which the hook imports as well.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import functools
+import json
+import os
+import sys
+import traceback
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+import jinja2
+import yaml
+from binaryornot.check import is_binary
+from cookiecutter.environment import StrictEnvironment
+from cookiecutter.exceptions import FailedHookException, OutputDirExistsException, UndefinedVariableInTemplate
+from cookiecutter.find import find_template
+from cookiecutter.generate import apply_overwrites_to_context
+from cookiecutter.hooks import run_script_with_context
+from cookiecutter.prompt import render_variable
+from cookiecutter.utils import rmtree
+from jinja2 import FileSystemLoader, UndefinedError
+from manifest import RECORD_FILE, FileManifest, file_hash, generation_record, template_commit, template_source
+
+TEMPLATE_ROOT = Path(__file__).resolve().parent.parent
+
+# The post-generation hook only applies the manifest and writes the generation record, which the
+# engine does while rendering.
+HOOKS = ("pre_gen_project",)
+
+# Templates that project files include, like the pre-resolved lockfiles. cookiecutter looks them up
+# in ``../templates``, relative to the project template.
+INCLUDE_DIR = "templates"
+
+
+@dataclass(frozen=True)
+class TemplateFile:
+    """A file of the project template, as discovered on disk."""
+
+    path: str
+    mode: int
+    binary: bool
+    newline: str
+
+
+@dataclass(frozen=True)
+class RenderedFile:
+    """A rendered file, with its path relative to the generated project directory."""
+
+    path: str
+    content: bytes
+    mode: int
+
+
+@contextlib.contextmanager
+def extension_import_path(root: Path) -> Iterator[None]:
+    """Make the template's local Jinja extensions (``_extensions``) importable, as cookiecutter does."""
+    sys.path.append(str(root))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(root))
+
+
+@dataclass
+class VirtualProject:
+    """A project rendered in memory: the content of each file by its path relative to the project directory.
+
+    Queries mirror those of a baked project on disk (``has_file``, ``read_file``, ...); paths use ``/``.
+    """
+
+    name: str
+    files: Mapping[str, bytes]
+    context: dict[str, Any]
+
+    @functools.cached_property
+    def dirs(self) -> frozenset[str]:
+        return frozenset(
+            parent for path in self.files for parent in map(str, PurePosixPath(path).parents) if parent != "."
+        )
+
+    def has_file(self, rel_path: str) -> bool:
+        return rel_path in self.files
+
+    def has_dir(self, rel_path: str) -> bool:
+        return rel_path.rstrip("/") in self.dirs
+
+    def read_file(self, rel_path: str) -> str:
+        if rel_path not in self.files:
+            msg = f"{self.name} has no file {rel_path}"
+            raise FileNotFoundError(msg)
+        # Translate newlines like reading the file in text mode does.
+        return self.files[rel_path].decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    def file_contains(self, rel_path: str, text: str) -> bool:
+        return text in self.read_file(rel_path)
+
+    def is_valid_yaml(self, rel_path: str) -> bool:
+        if rel_path not in self.files:
+            return False
+        try:
+            yaml.safe_load(self.files[rel_path])
+        except yaml.YAMLError:
+            return False
+        return True
+
+
+class VariableTemplates:
+    """Compiles each cookiecutter.json variable template once, for `cookiecutter.prompt.render_variable`.
+
+    cookiecutter compiles every variable again for each context,
+    which would dominate the cost of rendering a project in memory.
+    """
+
+    def __init__(self, env: StrictEnvironment) -> None:
+        self.env = env
+        self._templates: dict[str, jinja2.Template] = {}
+
+    def from_string(self, source: str) -> jinja2.Template:
+        template = self._templates.get(source)
+        if template is None:
+            template = self._templates[source] = self.env.from_string(source)
+        return template
+
+
+class Template:
+    """A cookiecutter template loaded once and rendered any number of times.
+
+    Rendering is thread-safe, so a single instance can serve a pool of workers.
+    """
+
+    def __init__(self, root: Path = TEMPLATE_ROOT) -> None:
+        self.root = root.resolve()
+        self.config = json.loads((self.root / "cookiecutter.json").read_text(), object_pairs_hook=OrderedDict)
+        with extension_import_path(self.root):
+            self.env = StrictEnvironment(
+                context={"cookiecutter": self.config},
+                keep_trailing_newline=True,
+                auto_reload=False,
+                **self.config.get("_jinja2_env_vars", {}),
+            )
+        self.project_template = find_template(self.root, self.env)
+        self.env.loader = FileSystemLoader([str(self.project_template), str(self.root / INCLUDE_DIR)])
+        self.files = tuple(self._discover())
+        self._path_templates = {f.path: self.env.from_string(f.path) for f in self.files}
+        self._templates = {f.path: self.env.get_template(f.path) for f in self.files if not f.binary}
+        self._name_template = self.env.from_string(self.project_template.name)
+        self.hooks = {
+            name: path for name in HOOKS for path in (self.root / "hooks").glob(f"{name}.*") if path.suffix != ".pyc"
+        }
+        self._hook_templates = {
+            name: (path.name, self.env.from_string(path.read_text(encoding="utf-8")))
+            for name, path in self.hooks.items()
+            if path.suffix == ".py"
+        }
+
+    def _discover(self) -> list[TemplateFile]:
+        files = []
+        for dirpath, dirnames, filenames in os.walk(self.project_template):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(dirpath, name)
+                rel_path = path.relative_to(self.project_template).as_posix()
+                binary = is_binary(str(path))
+                newline = "\n"
+                if not binary:
+                    with path.open(encoding="utf-8") as f:
+                        f.readline()
+                    # Match cookiecutter, which keeps the newline style of each template file's first line.
+                    newline = (f.newlines[0] if isinstance(f.newlines, tuple) else f.newlines) or "\n"
+                files.append(TemplateFile(rel_path, path.stat().st_mode, binary, newline))
+        return files
+
+    @functools.cached_property
+    def commit(self) -> str | None:
+        return template_commit(self.root)
+
+    @functools.cached_property
+    def source(self) -> str:
+        return template_source(self.root)
+
+    def context(self, extra_context: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Build the full cookiecutter context for ``extra_context``, as ``cookiecutter --no-input`` would."""
+        config = copy.deepcopy(self.config)
+        if extra_context:
+            apply_overwrites_to_context(config, extra_context)
+        context: dict[str, Any] = {"cookiecutter": config}
+        context["cookiecutter"] = self._resolve_variables(context)
+        context["cookiecutter"]["_template"] = str(self.root)
+        context["cookiecutter"]["_repo_dir"] = str(self.root)
+        return context
+
+    @functools.cached_property
+    def _variable_templates(self) -> VariableTemplates:
+        return VariableTemplates(self.env)
+
+    def _resolve_variables(self, context: dict[str, Any]) -> OrderedDict[str, Any]:
+        """Resolve the variables like ``cookiecutter.prompt.prompt_for_config(context, no_input=True)``."""
+        config = context["cookiecutter"]
+        config.pop("__prompts__", None)
+        resolved: OrderedDict[str, Any] = OrderedDict()
+
+        def render(key: str, raw: Any) -> Any:
+            try:
+                return render_variable(self._variable_templates, raw, resolved)
+            except UndefinedError as err:
+                msg = f"Unable to render variable '{key}'"
+                raise UndefinedVariableInTemplate(msg, err, context) from err
+
+        for key, raw in config.items():
+            if key.startswith("_") and not key.startswith("__"):
+                resolved[key] = raw
+            elif isinstance(raw, list) and not key.startswith("__"):
+                # A choice variable: cookiecutter renders every option and takes the first.
+                resolved[key] = render(key, raw)[0]
+            elif key.startswith("__") or not isinstance(raw, dict):
+                resolved[key] = render(key, raw)
+        # Dict variables are rendered last, so that they can refer to all the others.
+        for key, raw in config.items():
+            if isinstance(raw, dict) and not (key.startswith("_") and not key.startswith("__")):
+                resolved[key] = render(key, raw)
+        return resolved
+
+    def project_name(self, context: dict[str, Any]) -> str:
+        """Return the rendered name of the directory the project is generated into."""
+        return self._name_template.render(**context)
+
+    def render_text(self, path: str, context: dict[str, Any]) -> str:
+        """Render the text file at ``path`` of the project template for ``context``, wherever the manifest puts it."""
+        return self._templates[path].render(**context)
+
+    def render_files(self, context: dict[str, Any]) -> list[RenderedFile]:
+        """Render every file the manifest keeps for ``context``, and the generation record, without touching the disk."""
+        manifest = FileManifest(context, lambda path: self._variable_templates.from_string(path).render(**context))
+        rendered = []
+        for f in self.files:
+            path = manifest.resolve(self._path_templates[f.path].render(**context))
+            if path is None:
+                continue
+            if f.binary:
+                content = self._read_binary(f)
+            else:
+                text = self._templates[f.path].render(**context)
+                if f.newline != "\n":
+                    text = text.replace("\n", f.newline)
+                content = text.encode("utf-8")
+            rendered.append(RenderedFile(path, content, f.mode))
+        hashes = {f.path: file_hash(f.content) for f in rendered}
+        rendered.append(RenderedFile(RECORD_FILE, generation_record(context, self.source, self.commit, hashes), 0o644))
+        return rendered
+
+    def _read_binary(self, f: TemplateFile) -> bytes:
+        return (self.project_template / f.path).read_bytes()
+
+    def dry_run(self, extra_context: dict[str, Any] | None = None) -> VirtualProject:
+        """Render the project ``generate`` would write for ``extra_context`` into memory.
+
+        Hooks don't run, so an invalid project name is not rejected.
+        """
+        context = self.context(extra_context)
+        files = {f.path: f.content for f in self.render_files(context)}
+        return VirtualProject(self.project_name(context), files, context)
+
+    def generate(self, extra_context: dict[str, Any] | None, output_dir: Path, overwrite: bool = False) -> Path:
+        """Generate a project into ``output_dir`` and return its directory.
+
+        Raises the same exceptions as `cookiecutter.main.cookiecutter`, e.g. `FailedHookException`
+        when the pre-generation hook rejects the project name.
+        """
+        context = self.context(extra_context)
+        context["cookiecutter"]["_output_dir"] = str(Path(output_dir).resolve())
+        project_dir = Path(output_dir, self.project_name(context)).resolve()
+        created = not project_dir.exists()
+        try:
+            # Without ``overwrite`` creation must succeed, which also keeps concurrent generations apart.
+            project_dir.mkdir(parents=True, exist_ok=overwrite)
+        except FileExistsError:
+            msg = f'Error: "{project_dir}" directory already exists'
+            raise OutputDirExistsException(msg) from None
+        try:
+            self._run_hook("pre_gen_project", project_dir, context)
+            for f in self.render_files(context):
+                target = project_dir / f.path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(f.content)
+                os.chmod(target, f.mode)
+        except BaseException:
+            if created:
+                rmtree(project_dir)
+            raise
+        return project_dir
+
+    def _run_hook(self, name: str, project_dir: Path, context: dict[str, Any]) -> None:
+        """Run a hook, failing like cookiecutter does when the hook script exits non-zero.
+
+        Python hooks run in this process rather than in a subprocess per project, and therefore not
+        with ``project_dir`` as their working directory; other hooks run as cookiecutter runs them.
+        """
+        if name not in self._hook_templates:
+            if name in self.hooks:
+                run_script_with_context(self.hooks[name], project_dir, context)
+            return
+        filename, hook_template = self._hook_templates[name]
+        code = compile(hook_template.render(**context), str(self.root / "hooks" / filename), "exec")
+        try:
+            exec(code, {"__name__": "__main__", "__file__": str(self.root / "hooks" / filename)})
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                exit_status = e.code if isinstance(e.code, int) else 1
+                msg = f"Hook script failed (exit status: {exit_status})"
+                raise FailedHookException(msg) from None
+        except Exception as e:
+            traceback.print_exc()
+            msg = "Hook script failed (exit status: 1)"
+            raise FailedHookException(msg) from e
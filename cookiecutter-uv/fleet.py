@@ -0,0 +1,102 @@
+"""Generate a batch ("fleet") of projects from one manifest with a single, shared template load.
+
+A manifest lists one cookiecutter context per project, as JSON, TOML or CSV:
+
+- JSON: a list of objects, or ``{"defaults": {...}, "projects": [...]}``
+- TOML: an optional ``[defaults]`` table and one ``[[projects]]`` table per project
+- CSV: a header row of cookiecutter.json keys and one row per project
+
+Each project is generated on a bounded thread pool; a failing project is reported and does not
+abort the rest of the batch.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import statistics
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from engine import Template
+
+
+@dataclass
+class FleetResult:
+    """Outcome of generating one project of a fleet."""
+
+    context: dict[str, str]
+    project_dir: Path | None
+    error: str | None
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_manifest(path: Path) -> list[dict[str, str]]:
+    """Read the per-project cookiecutter contexts from a JSON, TOML or CSV manifest."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            return [{key: value for key, value in row.items() if value} for row in csv.DictReader(f)]
+    if suffix == ".toml":
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    elif suffix == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        msg = f"Unsupported manifest format '{path.suffix}', expected .json, .toml or .csv"
+        raise ValueError(msg)
+    if isinstance(data, list):
+        data = {"projects": data}
+    defaults = data.get("defaults", {})
+    return [{**defaults, **project} for project in data.get("projects", [])]
+
+
+def bake_fleet(
+    contexts: list[dict[str, str]],
+    output_dir: Path,
+    jobs: int | None = None,
+    overwrite: bool = False,
+    template: Template | None = None,
+) -> list[FleetResult]:
+    """Generate one project per context into ``output_dir``, at most ``jobs`` at a time.
+
+    Results are returned in manifest order.
+    """
+    template = template or Template()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def _bake(context: dict[str, str]) -> FleetResult:
+        start = time.perf_counter()
+        try:
+            project_dir = template.generate(context, output_dir, overwrite=overwrite)
+        except Exception as e:
+            return FleetResult(context, None, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+        return FleetResult(context, project_dir, None, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_bake, contexts))
+
+
+def format_summary(results: list[FleetResult], wall_seconds: float) -> str:
+    """Summarize failures and throughput of a fleet run."""
+    lines = []
+    for result in results:
+        if not result.ok:
+            name = result.context.get("project_name", "<default>")
+            lines.append(f"FAILED {name}: {result.error}")
+    succeeded = sum(result.ok for result in results)
+    lines.append(f"Generated {succeeded}/{len(results)} projects in {wall_seconds:.2f}s")
+    if results and wall_seconds > 0:
+        durations = sorted(result.seconds for result in results)
+        p95 = durations[min(len(durations) - 1, round(0.95 * (len(durations) - 1)))]
+        lines.append(
+            f"Throughput {len(results) / wall_seconds:.1f} projects/s, "
+            f"per project mean {statistics.fmean(durations) * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,223 @@
+"""Keep a pre-resolved ``uv.lock`` in the template for every dependency set a project can have.
+
+The dependencies of a generated project depend on a few options: ``zensical`` and ``deptry`` add dev
+dependencies, and so do ``benchmarks`` and ``mypyc``. The template keeps one lockfile per distinct
+dependency set in ``templates/uv-locks/``, outside the project template. For each combination of
+options, a ``uv.lock`` entry of the ``_manifest`` in cookiecutter.json names the ``lockfile`` of its
+set, and the project template's ``uv.lock`` includes the lockfile of the first entry that matches,
+so only that one is rendered. The first ``uv sync`` of a project then installs without resolving
+anything, and ``uv lock --locked`` passes from the start.
+
+`refresh_locks` re-resolves every lockfile in one batch (``make locks``). It finds the options that
+change the rendered dependencies, renders ``pyproject.toml`` for each combination of them, and runs
+``uv lock`` for each distinct set on a thread pool. Each run starts from the set's current lockfile,
+so pins only move for changed requirements, or for all of them with ``upgrade``. The lockfiles and
+their manifest entries are rewritten together. `check_locks` verifies offline that both still match
+the template.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import subprocess
+import tempfile
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from engine import INCLUDE_DIR, Template
+
+# Relative to the template's include directory, which is how uv.lock includes the lockfiles.
+LOCK_DIR = "uv-locks"
+
+# Lockfiles are resolved for a project of this name, which is then replaced by an expression for
+# the name uv writes into the lock: the project name normalized, i.e. lowercased with runs of "-"
+# collapsed (the pre-generation hook allows no other separators).
+PLACEHOLDER_NAME = "cookiecutter-uv-lock-placeholder"
+NAME_EXPRESSION = "{{ cookiecutter.project_name.lower().split('-') | select | join('-') }}"
+
+
+class LockError(Exception):
+    """A lockfile could not be resolved, or is out of date with the template."""
+
+
+@dataclass(frozen=True)
+class LockSet:
+    """A distinct dependency set, with the option combinations that produce it."""
+
+    name: str
+    when: tuple[dict[str, str], ...]
+    # pyproject.toml rendered for the first combination, with the placeholder project name.
+    pyproject: str
+
+    @property
+    def path(self) -> str:
+        """The lockfile's path in the template's include directory."""
+        return f"{LOCK_DIR}/{self.name}.lock"
+
+
+def lock_path(template: Template, lock_set: LockSet) -> Path:
+    """Return where the lockfile of ``lock_set`` is kept in ``template``."""
+    return template.root / INCLUDE_DIR / lock_set.path
+
+
+def _choices(template: Template) -> dict[str, list[str]]:
+    return {key: value for key, value in template.config.items() if isinstance(value, list) and not key.startswith("_")}
+
+
+def _render_pyproject(template: Template, options: dict[str, str]) -> str:
+    return template.render_text("pyproject.toml", template.context({**options, "project_name": PLACEHOLDER_NAME}))
+
+
+def _dependencies(pyproject: str) -> str:
+    """Return what uv.lock records of ``pyproject``, in a comparable form."""
+    data = tomllib.loads(pyproject)
+    project = data.get("project", {})
+    recorded = [
+        project.get("requires-python"),
+        project.get("dependencies", []),
+        project.get("optional-dependencies", {}),
+        data.get("dependency-groups", {}),
+    ]
+    return json.dumps(recorded, sort_keys=True)
+
+
+def dependency_options(template: Template) -> list[str]:
+    """Return the choice options that change the dependencies of a generated project.
+
+    Each option is varied on its own from the defaults, so an option that only matters in
+    combination with another one is not found.
+    """
+    default = _dependencies(_render_pyproject(template, {}))
+    return [
+        key
+        for key, values in _choices(template).items()
+        if any(_dependencies(_render_pyproject(template, {key: value})) != default for value in values[1:])
+    ]
+
+
+def _lock_name(options: dict[str, str]) -> str:
+    parts = [key if value == "y" else f"{key}-{value}" for key, value in options.items() if value != "n"]
+    return "-".join(parts) or "minimal"
+
+
+def lock_sets(template: Template) -> list[LockSet]:
+    """Group every combination of the dependency options by the dependency set it renders."""
+    choices = _choices(template)
+    options = dependency_options(template)
+    groups: dict[str, tuple[str, list[dict[str, str]]]] = {}
+    for values in itertools.product(*(choices[option] for option in options)):
+        when = dict(zip(options, values, strict=True))
+        pyproject = _render_pyproject(template, when)
+        groups.setdefault(_dependencies(pyproject), (pyproject, []))[1].append(when)
+    return [LockSet(_lock_name(when[0]), tuple(when), pyproject) for pyproject, when in groups.values()]
+
+
+def manifest_entries(sets: list[LockSet]) -> list[dict[str, object]]:
+    """Return the ``_manifest`` entries that select the lockfile ``uv.lock`` includes for each set's combinations."""
+    return [{"path": "uv.lock", "when": when, "lockfile": lock_set.path} for lock_set in sets for when in lock_set.when]
+
+
+def _to_template(lock: str) -> str:
+    line = f'name = "{PLACEHOLDER_NAME}"\n'
+    if lock.count(line) != 1:
+        msg = f"Expected the project {PLACEHOLDER_NAME} exactly once in the lockfile"
+        raise LockError(msg)
+    if any(marker in lock for marker in ("{{", "{%", "{#")):
+        msg = "The lockfile contains Jinja syntax and cannot be used as a template"
+        raise LockError(msg)
+    return lock.replace(line, f'name = "{NAME_EXPRESSION}"\n')
+
+
+def _from_template(source: str) -> str:
+    return source.replace(f'name = "{NAME_EXPRESSION}"\n', f'name = "{PLACEHOLDER_NAME}"\n')
+
+
+def _uv_lock(lock_set: LockSet, current: str | None, args: list[str]) -> str:
+    """Run ``uv lock`` for ``lock_set`` in a scratch project seeded with ``current``; return the lockfile."""
+    with tempfile.TemporaryDirectory(prefix="cookiecutter-uv-lock-") as scratch:
+        Path(scratch, "pyproject.toml").write_text(lock_set.pyproject, encoding="utf-8")
+        if current is not None:
+            Path(scratch, "uv.lock").write_text(current, encoding="utf-8", newline="\n")
+        result = subprocess.run(["uv", "lock", *args], cwd=scratch, capture_output=True, text=True)
+        if result.returncode != 0:
+            msg = f"uv lock failed for {lock_set.path}:\n{result.stderr.strip()}"
+            raise LockError(msg)
+        return Path(scratch, "uv.lock").read_text(encoding="utf-8")
+
+
+def _read_lock(template: Template, lock_set: LockSet) -> str | None:
+    path = lock_path(template, lock_set)
+    return _from_template(path.read_text(encoding="utf-8")) if path.is_file() else None
+
+
+def refresh_locks(template: Template | None = None, jobs: int | None = None, upgrade: bool = False) -> list[LockSet]:
+    """Re-resolve the lockfile of every dependency set, and rewrite the lockfiles and their manifest entries.
+
+    Sets whose requirements changed, and all of them with ``upgrade``, are resolved against the
+    package index. A `Template` loaded before the refresh still renders the previous lockfiles.
+    """
+    template = template or Template()
+    sets = lock_sets(template)
+    args = ["--upgrade"] if upgrade else []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        locks = list(
+            pool.map(lambda lock_set: _to_template(_uv_lock(lock_set, _read_lock(template, lock_set), args)), sets)
+        )
+
+    lock_dir = template.root / INCLUDE_DIR / LOCK_DIR
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    paths = {lock_path(template, lock_set) for lock_set in sets}
+    for stale in set(lock_dir.iterdir()) - paths:
+        stale.unlink()
+    for lock_set, lock in zip(sets, locks, strict=True):
+        path = lock_path(template, lock_set)
+        if not path.is_file() or path.read_text(encoding="utf-8") != lock:
+            path.write_text(lock, encoding="utf-8", newline="\n")
+
+    config_path = template.root / "cookiecutter.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    manifest = config["_manifest"]
+    previous = [i for i, entry in enumerate(manifest) if "lockfile" in entry]
+    manifest = [entry for entry in manifest if "lockfile" not in entry]
+    at = previous[0] if previous else len(manifest)
+    config["_manifest"] = manifest[:at] + manifest_entries(sets) + manifest[at:]
+    content = json.dumps(config, indent=2) + "\n"
+    if content != config_path.read_text(encoding="utf-8"):
+        config_path.write_text(content, encoding="utf-8", newline="\n")
+    return sets
+
+
+def check_locks(template: Template | None = None, jobs: int | None = None) -> list[str]:
+    """Return what is out of date about the lockfiles and their manifest entries; empty if nothing is.
+
+    Each lockfile is checked with ``uv lock --locked --offline``, which needs no network access.
+    """
+    template = template or Template()
+    sets = lock_sets(template)
+    problems = []
+    entries = [entry for entry in template.config["_manifest"] if "lockfile" in entry]
+    if entries != manifest_entries(sets):
+        problems.append("The lockfile entries of the _manifest in cookiecutter.json don't match the dependency sets")
+    lock_dir = template.root / INCLUDE_DIR / LOCK_DIR
+    expected = {lock_path(template, lock_set) for lock_set in sets}
+    problems.extend(
+        f"{INCLUDE_DIR}/{LOCK_DIR}/{path.name} belongs to no dependency set"
+        for path in sorted(set(lock_dir.glob("*")) - expected)
+    )
+
+    def check(lock_set: LockSet) -> str | None:
+        current = _read_lock(template, lock_set)
+        if current is None:
+            return f"{lock_set.path} is missing"
+        try:
+            _uv_lock(lock_set, current, ["--locked", "--offline"])
+        except LockError as e:
+            return str(e)
+        return None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        problems.extend(problem for problem in pool.map(check, sets) if problem is not None)
+    return problems
@@ -1,2 +1,186 @@
+"""Command line entry point for the cookiecutter-uv tooling.
+
+Usage:
+    uv run python cookiecutter-uv/main.py fleet services.toml --output-dir out/ --jobs 8
+    uv run python cookiecutter-uv/main.py compile --output template.bundle
+    uv run python cookiecutter-uv/main.py bake --bundle template.bundle project_name=my-service layout=flat
+    uv run python cookiecutter-uv/main.py update services/* --set profiling=y
+    uv run python cookiecutter-uv/main.py locks --upgrade
+    uv run python cookiecutter-uv/main.py serve --socket /run/cookiecutter-uv.sock --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bundle import BundledTemplate, BundleError, compile_bundle
+from cookiecutter.exceptions import CookiecutterException
+from engine import Template
+from fleet import bake_fleet, format_summary, load_manifest
+from locks import LockError, check_locks, refresh_locks
+from server import Scaffolder, make_server
+from update import format_update_summary, update_projects
+
+
+def _load_template(bundle: Path | None) -> Template:
+    return BundledTemplate(bundle) if bundle else Template()
+
+
+def _parse_options(options: list[str]) -> dict[str, str]:
+    context = {}
+    for option in options:
+        key, separator, value = option.partition("=")
+        if not separator:
+            msg = f"Expected key=value, got '{option}'"
+            raise SystemExit(msg)
+        context[key] = value
+    return context
+
+
+def _fleet(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    try:
+        contexts = load_manifest(args.manifest)
+        template = _load_template(args.bundle)
+    except (OSError, ValueError, BundleError) as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    results = bake_fleet(contexts, args.output_dir, jobs=args.jobs, overwrite=args.overwrite, template=template)
+    print(format_summary(results, time.perf_counter() - start))
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _compile(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    path = compile_bundle(Template(), args.output)
+    print(
+        f"Compiled the template into {path} ({path.stat().st_size / 1024:.0f} KiB) in {time.perf_counter() - start:.2f}s"
+    )
+    return 0
+
+
+def _bake(args: argparse.Namespace) -> int:
+    try:
+        project_dir = _load_template(args.bundle).generate(
+            _parse_options(args.options), args.output_dir, overwrite=args.overwrite
+        )
+    except (BundleError, CookiecutterException) as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    print(project_dir)
+    return 0
+
+
+def _update(args: argparse.Namespace) -> int:
+    options = _parse_options(args.set)
+    start = time.perf_counter()
+    results = update_projects(
+        args.projects, _load_template(args.bundle), jobs=args.jobs, options=options, dry_run=args.dry_run
+    )
+    print(format_update_summary(results))
+    print(
+        f"Checked {len(results)} projects in {time.perf_counter() - start:.2f}s{' (dry run)' if args.dry_run else ''}"
+    )
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _locks(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    if args.check:
+        problems = check_locks(jobs=args.jobs)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        if problems:
+            print("Run `make locks` to refresh the lockfiles", file=sys.stderr)
+            return 1
+        print(f"The lockfiles are up to date ({time.perf_counter() - start:.2f}s)")
+        return 0
+    try:
+        sets = refresh_locks(jobs=args.jobs, upgrade=args.upgrade)
+    except LockError as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    combinations = sum(len(lock_set.when) for lock_set in sets)
+    print(
+        f"Resolved {len(sets)} lockfiles for {combinations} option combinations in {time.perf_counter() - start:.2f}s"
+    )
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    scaffolder = Scaffolder(_load_template(args.bundle), jobs=args.jobs, max_queue=args.max_queue)
+    server = make_server(scaffolder, args.socket or (args.host, args.port))
+    where = f"the Unix socket {args.socket}" if args.socket else f"http://{args.host}:{args.port}"
+    print(f"Serving projects on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="cookiecutter-uv", description="Tooling for the cookiecutter-uv template.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    fleet_parser = subcommands.add_parser("fleet", help="Generate every project listed in a manifest.")
+    fleet_parser.add_argument("manifest", type=Path, help="JSON, TOML or CSV file with one context per project.")
+    fleet_parser.add_argument("-o", "--output-dir", type=Path, default=Path("."), help="Where to generate projects.")
+    fleet_parser.add_argument("-j", "--jobs", type=int, default=None, help="Maximum concurrent generations.")
+    fleet_parser.add_argument("--overwrite", action="store_true", help="Overwrite existing project directories.")
+    fleet_parser.add_argument("--bundle", type=Path, help="Render from this compiled bundle instead of the template.")
+    fleet_parser.set_defaults(handler=_fleet)
+
+    compile_parser = subcommands.add_parser("compile", help="Pack the template into a precompiled bundle file.")
+    compile_parser.add_argument(
+        "-o", "--output", type=Path, default=Path("template.bundle"), help="Bundle file to write."
+    )
+    compile_parser.set_defaults(handler=_compile)
+
+    bake_parser = subcommands.add_parser("bake", help="Generate one project, like cookiecutter --no-input.")
+    bake_parser.add_argument("options", nargs="*", metavar="key=value", help="Template options to override.")
+    bake_parser.add_argument("-o", "--output-dir", type=Path, default=Path("."), help="Where to generate the project.")
+    bake_parser.add_argument("--overwrite", action="store_true", help="Overwrite an existing project directory.")
+    bake_parser.add_argument("--bundle", type=Path, help="Render from this compiled bundle instead of the template.")
+    bake_parser.set_defaults(handler=_bake)
+
+    update_parser = subcommands.add_parser("update", help="Merge template changes into generated projects.")
+    update_parser.add_argument("projects", nargs="+", type=Path, help="Project directories to update.")
+    update_parser.add_argument("-j", "--jobs", type=int, default=None, help="Maximum concurrent updates.")
+    update_parser.add_argument(
+        "--set", action="append", default=[], metavar="key=value", help="Change a recorded template option."
+    )
+    update_parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+    update_parser.add_argument("--bundle", type=Path, help="Render from this compiled bundle instead of the template.")
+    update_parser.set_defaults(handler=_update)
+
+    locks_parser = subcommands.add_parser("locks", help="Re-resolve the uv.lock files shipped with generated projects.")
+    locks_parser.add_argument("-j", "--jobs", type=int, default=None, help="Maximum concurrent resolutions.")
+    locks_parser.add_argument("--upgrade", action="store_true", help="Upgrade every pin, not only changed ones.")
+    locks_parser.add_argument(
+        "--check", action="store_true", help="Only check, offline, that the lockfiles are current."
+    )
+    locks_parser.set_defaults(handler=_locks)
+
+    serve_parser = subcommands.add_parser("serve", help="Generate projects on request, with the template kept loaded.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    serve_parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP.")
+    serve_parser.add_argument("-j", "--jobs", type=int, default=4, help="Maximum concurrent generations.")
+    serve_parser.add_argument(
+        "--max-queue", type=int, default=64, help="Maximum requests waiting for a generation slot."
+    )
+    serve_parser.add_argument("--bundle", type=Path, help="Render from this compiled bundle instead of the template.")
+    serve_parser.set_defaults(handler=_serve)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
 if __name__ == "__main__":
-    pass
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""The file manifest and the generation record, shared by the engine and the post-generation hook.
+
+`engine.Template` evaluates the manifest while rendering, and ``hooks/post_gen_project.py`` applies
+it to the project plain ``cookiecutter`` generated; both then write the generation record,
+``.cookiecutter-uv.json``, from which `cookiecutter-uv/update.py` later updates the project.
+
+The hook imports this module from the template checkout with the Python running cookiecutter, so it
+only uses the standard library.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+RECORD_FILE = ".cookiecutter-uv.json"
+
+
+def file_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def template_commit(root: Path) -> str | None:
+    """Return the commit checked out in the template's git repository, if it is one."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def template_source(root: Path) -> str:
+    """Return a stable name for the template: the URL of its ``origin`` remote, or else its directory name.
+
+    Unlike the path it was loaded from, the name is the same wherever the template is checked out.
+    """
+    try:
+        result = subprocess.run(["git", "remote", "get-url", "origin"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return root.name
+    url = result.stdout.strip() if result.returncode == 0 else ""
+    # Credentials in an https URL stay out of the record.
+    return re.sub(r"^(https?://)[^/@]*@", r"\1", url) or root.name
+
+
+def generation_record(context: dict[str, Any], source: str, commit: str | None, hashes: dict[str, str]) -> bytes:
+    """Serialize the generation record."""
+    options = context["cookiecutter"]
+    record = {
+        "template": source,
+        "commit": commit,
+        "context": {key: value for key, value in sorted(options.items()) if not key.startswith("_")},
+        "files": dict(sorted(hashes.items())),
+    }
+    return (json.dumps(record, indent=2) + "\n").encode("utf-8")
+
+
+def project_hashes(project_dir: Path) -> dict[str, str]:
+    """Hash every file of a generated project, by its path relative to ``project_dir``.
+
+    The record itself, git metadata and virtual environments (which an overwritten output directory
+    may already hold) are left out.
+    """
+    hashes = {}
+    for dirpath, dirnames, filenames in os.walk(project_dir):
+        dirnames[:] = [
+            name
+            for name in dirnames
+            if name != ".git" and not os.path.isfile(os.path.join(dirpath, name, "pyvenv.cfg"))
+        ]
+        for name in filenames:
+            path = Path(dirpath, name)
+            rel_path = path.relative_to(project_dir).as_posix()
+            if rel_path != RECORD_FILE and path.is_file():
+                hashes[rel_path] = file_hash(path.read_bytes())
+    return hashes
+
+
+class FileManifest:
+    """The ``_manifest`` entries of a context, resolving where (and whether) each path is written.
+
+    Each entry names a ``path`` (a file or a directory), a ``when`` mapping of options it requires,
+    and optionally the ``target`` path to write it to instead. A path that has entries is kept only if
+    one of them matches; paths without entries are always kept. Other keys, like the ``lockfile`` of
+    the ``uv.lock`` entries, are read by the templates themselves.
+
+    cookiecutter copies the ``_manifest`` unrendered, so ``path`` and ``target`` strings that are
+    templates (like ``{{cookiecutter.project_slug}}``) are rendered here with ``render``.
+    """
+
+    def __init__(self, context: dict[str, Any], render: Callable[[str], str]) -> None:
+        options = context["cookiecutter"]
+        self.entries: dict[str, list[dict[str, Any]]] = {}
+        self.matches: dict[str, dict[str, Any] | None] = {}
+        for entry in options.get("_manifest", []):
+            entry = {
+                key: render(value) if key in ("path", "target") and "{" in value else value
+                for key, value in entry.items()
+            }
+            self.entries.setdefault(entry["path"], []).append(entry)
+        for path, entries in self.entries.items():
+            self.matches[path] = next(
+                (e for e in entries if all(options.get(k) == v for k, v in e.get("when", {}).items())), None
+            )
+
+    def resolve(self, path: str) -> str | None:
+        """Return where ``path`` is written, or None if the options exclude it or one of its parents."""
+        resolved = path
+        parts = path.split("/")
+        for depth in range(1, len(parts) + 1):
+            prefix = "/".join(parts[:depth])
+            if prefix not in self.matches:
+                continue
+            match = self.matches[prefix]
+            if match is None:
+                return None
+            if "target" in match:
+                resolved = "/".join([match["target"], *parts[depth:]])
+        return resolved
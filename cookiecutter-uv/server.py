@@ -0,0 +1,270 @@
+"""Serve project generation over localhost HTTP or a Unix socket, from a template kept loaded in memory.
+
+A `Scaffolder` loads the template (or a compiled bundle) once. For each request it resolves the
+context, checks the project name and slug in-process with the regular expressions of
+``hooks/pre_gen_project.py`` instead of running the hook, renders the project with
+`Template.render_files` without touching the disk, and packs it into a tar archive of the project
+directory. At most ``jobs`` projects render at once; up to ``max_queue`` more requests wait for a
+slot, and requests beyond that are turned away at once, so a burst cannot pile up without bound.
+
+`make_server` serves a `Scaffolder` over HTTP/1.1, on a ``(host, port)`` address or a Unix socket path:
+
+- ``POST /projects`` with a JSON object of template options, like cookiecutter's extra context, returns
+  the project as ``application/x-tar``, with its directory name in the ``X-Project-Name`` header.
+  Rejected options get 400 and a full queue gets 503, each with a JSON ``error``.
+- ``GET /stats`` returns request counts, the current queue depth and latency percentiles as JSON.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import re
+import socketserver
+import stat
+import tarfile
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from cookiecutter.exceptions import CookiecutterException
+from engine import RenderedFile, Template
+
+# The checks of hooks/pre_gen_project.py (tests/test_server.py keeps them in sync). They are applied
+# with re.fullmatch: the hook sees the name inside a Python string literal, where a trailing newline,
+# which "$" would let through, is a syntax error.
+PROJECT_NAME_REGEX = r"^[-a-zA-Z][-a-zA-Z0-9]+$"
+PROJECT_SLUG_REGEX = r"^[_a-zA-Z][_a-zA-Z0-9]+$"
+
+MAX_REQUEST_BYTES = 64 * 1024
+# Latency percentiles are computed over this many of the latest generated projects.
+LATENCY_WINDOW = 1024
+
+
+class InvalidProjectError(Exception):
+    """The options of a request are rejected, as cookiecutter or the pre-generation hook would reject them."""
+
+
+class ServerBusyError(Exception):
+    """Every render slot is taken and the queue of waiting requests is full."""
+
+
+def validate(options: dict[str, Any]) -> None:
+    """Check the project name and slug of the resolved ``options`` like hooks/pre_gen_project.py does."""
+    project_name = str(options["project_name"])
+    if not re.fullmatch(PROJECT_NAME_REGEX, project_name):
+        msg = f"The project name {project_name} is not a valid Python module name. Please do not use a _ and use - instead"
+        raise InvalidProjectError(msg)
+    project_slug = str(options["project_slug"])
+    if not re.fullmatch(PROJECT_SLUG_REGEX, project_slug):
+        msg = f"The project slug {project_slug} is not a valid Python module name. Please do not use a - and use _ instead"
+        raise InvalidProjectError(msg)
+
+
+def pack(name: str, files: list[RenderedFile], mtime: float | None = None) -> bytes:
+    """Return a tar archive of ``files`` in the directory ``name``."""
+    mtime = time.time() if mtime is None else mtime
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for f in files:
+            info = tarfile.TarInfo(f"{name}/{f.path}")
+            info.size = len(f.content)
+            info.mode = stat.S_IMODE(f.mode)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(f.content))
+    return buffer.getvalue()
+
+
+def _percentile(durations: list[float], fraction: float) -> float:
+    return durations[min(len(durations) - 1, round(fraction * (len(durations) - 1)))]
+
+
+class Scaffolder:
+    """Generates projects from one loaded template for concurrent requests, and keeps their statistics.
+
+    ``jobs`` bounds the projects rendered at once and ``max_queue`` the requests waiting for a slot.
+    """
+
+    def __init__(self, template: Template | None = None, jobs: int = 4, max_queue: int = 64) -> None:
+        self.template = template or Template()
+        self.jobs = jobs
+        self.max_queue = max_queue
+        self._condition = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        self._counts = {"generated": 0, "rejected": 0, "busy": 0, "failed": 0}
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.monotonic()
+
+    def generate(self, options: dict[str, str]) -> tuple[str, bytes]:
+        """Return the directory name and the tar archive of the project for ``options``.
+
+        Raises `InvalidProjectError` for options cookiecutter or the pre-generation hook would
+        reject, and `ServerBusyError` when the queue is full.
+        """
+        start = time.perf_counter()
+        with self._condition:
+            if self._active >= self.jobs and self._queued >= self.max_queue:
+                self._counts["busy"] += 1
+                msg = f"{self._queued} requests are already waiting for one of {self.jobs} render slots"
+                raise ServerBusyError(msg)
+            self._queued += 1
+            self._condition.wait_for(lambda: self._active < self.jobs)
+            self._queued -= 1
+            self._active += 1
+        outcome = "failed"
+        try:
+            name, archive = self._render(options)
+            outcome = "generated"
+        except InvalidProjectError:
+            outcome = "rejected"
+            raise
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._counts[outcome] += 1
+                if outcome == "generated":
+                    self._latencies.append(time.perf_counter() - start)
+                self._condition.notify()
+        return name, archive
+
+    def _render(self, options: dict[str, str]) -> tuple[str, bytes]:
+        try:
+            context = self.template.context(options)
+        except (CookiecutterException, ValueError) as e:
+            # E.g. a value that is not one of a choice variable's options.
+            raise InvalidProjectError(str(e)) from e
+        validate(context["cookiecutter"])
+        name = self.template.project_name(context)
+        return name, pack(name, self.template.render_files(context))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the request counts, the current load and the latency of recent projects, queueing included."""
+        with self._condition:
+            stats: dict[str, Any] = {
+                "uptime_seconds": round(time.monotonic() - self._started, 3),
+                "jobs": self.jobs,
+                "active": self._active,
+                "queued": self._queued,
+                "max_queue": self.max_queue,
+                **self._counts,
+            }
+            latencies = sorted(self._latencies)
+        latency_ms: dict[str, Any] = {"window": len(latencies)}
+        if latencies:
+            seconds = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+                "max": latencies[-1],
+            }
+            latency_ms.update({key: round(value * 1000, 3) for key, value in seconds.items()})
+        stats["latency_ms"] = latency_ms
+        return stats
+
+
+class ScaffoldHandler(BaseHTTPRequestHandler):
+    """Handles the requests of `ScaffoldHTTPServer` and `ScaffoldUnixServer`."""
+
+    protocol_version = "HTTP/1.1"
+    server: ScaffoldHTTPServer | ScaffoldUnixServer
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._send_json(HTTPStatus.OK, self.server.scaffolder.stats())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No such resource: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/projects":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No such resource: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_REQUEST_BYTES:
+            # The body is left unread, so the connection cannot be reused.
+            self.close_connection = True
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Expected a body of at most {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            options = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            options = None
+        if not isinstance(options, dict) or not all(isinstance(value, str) for value in options.values()):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Expected a JSON object of template options (strings)"})
+            return
+
+        try:
+            name, archive = self.server.scaffolder.generate(options)
+        except InvalidProjectError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except ServerBusyError as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {"Retry-After": "1"})
+            return
+        except Exception as e:
+            self.log_error("Generating %r failed: %s: %s", options, type(e).__name__, e)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-tar")
+        self.send_header("Content-Length", str(len(archive)))
+        self.send_header("Content-Disposition", f'attachment; filename="{name}.tar"')
+        self.send_header("X-Project-Name", name)
+        self.end_headers()
+        self.wfile.write(archive)
+
+    def _send_json(self, status: HTTPStatus, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        content = (json.dumps(body) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class ScaffoldHTTPServer(ThreadingHTTPServer):
+    """Serves a `Scaffolder` on a TCP address, one thread per connection."""
+
+    def __init__(self, address: tuple[str, int], scaffolder: Scaffolder) -> None:
+        self.scaffolder = scaffolder
+        super().__init__(address, ScaffoldHandler)
+
+
+class ScaffoldUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves a `Scaffolder` on a Unix socket, one thread per connection; the socket file is removed on close."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, scaffolder: Scaffolder) -> None:
+        self.scaffolder = scaffolder
+        self.path = path
+        # A socket file left behind by a server that did not shut down cleanly.
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        super().__init__(path, ScaffoldHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def make_server(scaffolder: Scaffolder, address: str | tuple[str, int]) -> ScaffoldHTTPServer | ScaffoldUnixServer:
+    """Bind a server for ``scaffolder`` to a Unix socket path or a ``(host, port)`` address; port 0 picks a free one."""
+    if isinstance(address, str):
+        return ScaffoldUnixServer(address, scaffolder)
+    return ScaffoldHTTPServer(address, scaffolder)
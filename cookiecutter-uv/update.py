@@ -0,0 +1,244 @@
+"""Update generated projects to the current template with a three-way merge.
+
+Every generated project carries a generation record (``.cookiecutter-uv.json``, see
+`manifest.generation_record`) with the template commit and options it was generated from and a hash
+of every generated file. `update_project` renders the current template with the recorded options and
+compares the hashes of that render with the recorded ones, so files whose rendered output did not
+change are skipped without being opened. Only for changed files does it read the project's copy and
+render the recorded commit again, as the base of a three-way merge:
+
+- a file the project left as generated is replaced by the new render, or deleted if the template no
+  longer generates it,
+- a file changed in both the project and the template is merged with ``git merge-file``; conflicts
+  are left in the file between conflict markers and reported. Lockfiles are not merged: a ``uv.lock``
+  the project re-locked is kept, and ``uv lock`` brings it up to date with the new ``pyproject.toml``.
+
+The record is then rewritten for the new commit, so that the next update starts from this one. A
+project whose record already names the template's commit is not rendered at all, so commit template
+changes before rolling them out.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from engine import Template
+from manifest import RECORD_FILE, file_hash, generation_record
+
+# Files that are resolved rather than written, which a line-based merge would only corrupt.
+UNMERGED_FILES = frozenset({"uv.lock"})
+
+
+class UpdateError(Exception):
+    """A project cannot be updated, e.g. because it has no generation record."""
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of updating one project; paths are relative to the project directory."""
+
+    project_dir: Path
+    updated: list[str] = field(default_factory=list)
+    merged: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Changed in the template, but deleted, or changed and no longer generated, in the project; or a
+    # lockfile changed in both.
+    kept: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.conflicts
+
+
+class TemplateHistory:
+    """The template at earlier commits of its git repository, each checked out and loaded once."""
+
+    def __init__(self, template: Template) -> None:
+        self.template = template
+        self._templates: dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self._checkouts = tempfile.TemporaryDirectory(prefix="cookiecutter-uv-history-")
+
+    def at(self, commit: str) -> Template:
+        if commit == self.template.commit:
+            return self.template
+        with self._lock:
+            if commit not in self._templates:
+                archive = subprocess.run(
+                    ["git", "archive", "--format=tar", commit], cwd=self.template.root, capture_output=True
+                )
+                if archive.returncode != 0:
+                    msg = f"Template commit {commit} is not in {self.template.root}: {archive.stderr.decode().strip()}"
+                    raise UpdateError(msg)
+                checkout = Path(self._checkouts.name, commit)
+                with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+                    tar.extractall(checkout, filter="data")
+                self._templates[commit] = Template(checkout)
+            return self._templates[commit]
+
+    def close(self) -> None:
+        self._checkouts.cleanup()
+
+    def __enter__(self) -> TemplateHistory:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def read_record(project_dir: Path) -> dict[str, Any]:
+    path = project_dir / RECORD_FILE
+    if not path.is_file():
+        msg = f"{project_dir} has no {RECORD_FILE}; it was not generated by cookiecutter-uv"
+        raise UpdateError(msg)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def merge_file(current: bytes, base: bytes, new: bytes, labels: tuple[str, str, str]) -> tuple[bytes, bool]:
+    """Merge the template's change from ``base`` to ``new`` into ``current``; return the result and whether it conflicts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, content in (("current", current), ("base", base), ("new", new)):
+            path = Path(tmp, name)
+            path.write_bytes(content)
+            paths.append(str(path))
+        labels_args = [arg for label in labels for arg in ("-L", label)]
+        result = subprocess.run(["git", "merge-file", "-p", *labels_args, *paths], capture_output=True)
+    # The exit status is the number of conflicts, or negative (255) when the merge failed.
+    if result.returncode >= 128:
+        msg = f"git merge-file failed: {result.stderr.decode().strip()}"
+        raise UpdateError(msg)
+    return result.stdout, result.returncode > 0
+
+
+def update_project(
+    project_dir: Path,
+    template: Template,
+    history: TemplateHistory,
+    options: dict[str, str] | None = None,
+    dry_run: bool = False,
+) -> UpdateResult:
+    """Bring ``project_dir`` up to date with ``template``, changing only files whose render changed.
+
+    ``options`` overrides recorded options, e.g. to enable an option the project was generated without.
+    With ``dry_run``, the result describes the update but no file is written.
+    """
+    record = read_record(project_dir)
+    result = UpdateResult(project_dir)
+    old_hashes: dict[str, str] = record["files"]
+    if template.commit is not None and record["commit"] == template.commit and not options:
+        result.unchanged = len(old_hashes)
+        return result
+
+    context = template.context({**record["context"], **(options or {})})
+    rendered = {f.path: f for f in template.render_files(context) if f.path != RECORD_FILE}
+    new_hashes = {path: file_hash(f.content) for path, f in rendered.items()}
+    changed = sorted(
+        path for path in new_hashes.keys() | old_hashes.keys() if new_hashes.get(path) != old_hashes.get(path)
+    )
+    result.unchanged = len(new_hashes) - sum(path in new_hashes for path in changed)
+
+    base: dict[str, bytes] | None = None
+    labels = ("project", f"template {record['commit']}", f"template {template.commit}")
+
+    def base_content(path: str) -> bytes:
+        nonlocal base
+        if base is None:
+            base = {}
+            if record["commit"] is not None:
+                old = history.at(record["commit"])
+                base = {f.path: f.content for f in old.render_files(old.context(record["context"]))}
+        return base.get(path, b"")
+
+    def write(path: str, content: bytes, mode: int) -> None:
+        if not dry_run:
+            target = project_dir / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            os.chmod(target, mode)
+
+    for path in changed:
+        target = project_dir / path
+        current = target.read_bytes() if target.is_file() else None
+        new = rendered.get(path)
+        if new is None:
+            if current is None:
+                continue
+            if file_hash(current) == old_hashes[path]:
+                result.removed.append(path)
+                if not dry_run:
+                    target.unlink()
+            else:
+                result.kept.append(path)
+        elif current is None:
+            if path in old_hashes:
+                result.kept.append(path)
+            else:
+                result.updated.append(path)
+                write(path, new.content, new.mode)
+        elif current == new.content:
+            continue
+        elif path in old_hashes and file_hash(current) == old_hashes[path]:
+            result.updated.append(path)
+            write(path, new.content, new.mode)
+        elif path in UNMERGED_FILES:
+            result.kept.append(path)
+        else:
+            merged, conflicts = merge_file(current, base_content(path), new.content, labels)
+            (result.conflicts if conflicts else result.merged).append(path)
+            write(path, merged, new.mode)
+
+    if not dry_run:
+        (project_dir / RECORD_FILE).write_bytes(
+            generation_record(context, template.source, template.commit, new_hashes)
+        )
+    return result
+
+
+def update_projects(
+    project_dirs: list[Path],
+    template: Template | None = None,
+    jobs: int | None = None,
+    options: dict[str, str] | None = None,
+    dry_run: bool = False,
+) -> list[UpdateResult]:
+    """Update every project with one template load, at most ``jobs`` at a time; results keep the input order."""
+    template = template or Template()
+
+    def _update(project_dir: Path) -> UpdateResult:
+        try:
+            return update_project(project_dir, template, history, options=options, dry_run=dry_run)
+        except Exception as e:
+            return UpdateResult(project_dir, error=f"{type(e).__name__}: {e}")
+
+    with TemplateHistory(template) as history, ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_update, project_dirs))
+
+
+def format_update_summary(results: list[UpdateResult]) -> str:
+    """Describe what changed in each project, listing conflicts and errors."""
+    lines = []
+    for result in results:
+        if result.error:
+            lines.append(f"FAILED {result.project_dir}: {result.error}")
+            continue
+        lines.append(
+            f"{result.project_dir}: {len(result.updated)} updated, {len(result.merged)} merged, "
+            f"{len(result.conflicts)} conflicts, {len(result.removed)} removed, {result.unchanged} unchanged"
+        )
+        lines.extend(f"  CONFLICT {path}" for path in result.conflicts)
+        lines.extend(f"  KEPT {path} (changed locally, changed or removed in the template)" for path in result.kept)
+    return "\n".join(lines)
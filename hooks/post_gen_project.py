@@ -1,87 +1,81 @@
+"""Shape the generated project according to the ``_manifest`` file manifest in cookiecutter.json.
+
+Plain ``cookiecutter`` renders every template file, so this hook removes the paths that the chosen
+options exclude and moves relocated paths (the selected license, the ``src`` layout) into place.
+It then writes the generation record (the template, its commit, the options and a hash of every
+generated file) that ``cookiecutter-uv/update.py`` updates the project from.
+
+The manifest and the record are implemented in ``cookiecutter-uv/manifest.py``, which this hook
+imports from the template checkout. The in-process renderer in ``cookiecutter-uv/engine.py``
+evaluates the same manifest before rendering, never writes excluded paths, writes the same record,
+and therefore does not run this hook.
+"""
+
 from __future__ import annotations
 
+import json
 import os
 import shutil
+import sys
+from pathlib import Path
+
+import jinja2
 
 PROJECT_DIRECTORY = os.path.realpath(os.path.curdir)
+CONTEXT = json.loads(r"""{{ cookiecutter | jsonify }}""")
+TEMPLATE_DIR = Path(r"""{{ template_dir() }}""")
 
+sys.path.insert(0, str(TEMPLATE_DIR / "cookiecutter-uv"))
+from manifest import (  # noqa: E402
+    RECORD_FILE,
+    FileManifest,
+    generation_record,
+    project_hashes,
+    template_commit,
+    template_source,
+)
 
-def remove_file(filepath: str) -> None:
-    os.remove(os.path.join(PROJECT_DIRECTORY, filepath))
 
+def remove_path(path: str) -> None:
+    full_path = os.path.join(PROJECT_DIRECTORY, path)
+    if os.path.isdir(full_path):
+        shutil.rmtree(full_path)
+    else:
+        os.remove(full_path)
 
-def remove_dir(filepath: str) -> None:
-    shutil.rmtree(os.path.join(PROJECT_DIRECTORY, filepath))
 
+def move_path(src: str, target: str) -> None:
+    target_path = os.path.join(PROJECT_DIRECTORY, target)
+    if os.path.lexists(target_path):
+        remove_path(target)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    shutil.move(os.path.join(PROJECT_DIRECTORY, src), target_path)
 
-def move_file(filepath: str, target: str) -> None:
-    os.rename(
-        os.path.join(PROJECT_DIRECTORY, filepath),
-        os.path.join(PROJECT_DIRECTORY, target),
-    )
+
+def render_path(path: str) -> str:
+    return jinja2.Environment(undefined=jinja2.StrictUndefined).from_string(path).render(cookiecutter=CONTEXT)
 
 
-def move_dir(src: str, target: str) -> None:
-    shutil.move(os.path.join(PROJECT_DIRECTORY, src), os.path.join(PROJECT_DIRECTORY, target))
+def apply_manifest(match_by_path: dict[str, dict | None]) -> None:
+    # Parents before children, so that entries inside a removed directory are skipped, and every
+    # removal before any move, so that entries inside a relocated directory are still found in place.
+    ordered = sorted(match_by_path, key=lambda p: p.count("/"))
+    for path in ordered:
+        if match_by_path[path] is None and os.path.lexists(os.path.join(PROJECT_DIRECTORY, path)):
+            remove_path(path)
+    for path in ordered:
+        match = match_by_path[path]
+        if match is not None and "target" in match and os.path.lexists(os.path.join(PROJECT_DIRECTORY, path)):
+            move_path(path, match["target"])
 
 
 if __name__ == "__main__":
-    if "{{cookiecutter.include_github_actions}}" != "y":
-        remove_dir(".github")
-
-    if "{{cookiecutter.publish_to_pypi}}" != "y":
-        if "{{cookiecutter.include_github_actions}}" == "y":
-            remove_file(os.path.join(".github", "workflows", "publish.yml"))
-
-    if "{{cookiecutter.zensical}}" != "y":
-        remove_dir("docs")
-        remove_file("zensical.toml")
-        if "{{cookiecutter.include_github_actions}}" == "y":
-            remove_file(os.path.join(".github", "workflows", "docs.yml"))
-
-    if "{{cookiecutter.open_source_license}}" == "MIT license":
-        move_file("LICENSE_MIT", "LICENSE")
-        remove_file("LICENSE_BSD")
-        remove_file("LICENSE_ISC")
-        remove_file("LICENSE_APACHE")
-        remove_file("LICENSE_GPL")
-
-    if "{{cookiecutter.open_source_license}}" == "BSD license":
-        move_file("LICENSE_BSD", "LICENSE")
-        remove_file("LICENSE_MIT")
-        remove_file("LICENSE_ISC")
-        remove_file("LICENSE_APACHE")
-        remove_file("LICENSE_GPL")
-
-    if "{{cookiecutter.open_source_license}}" == "ISC license":
-        move_file("LICENSE_ISC", "LICENSE")
-        remove_file("LICENSE_MIT")
-        remove_file("LICENSE_BSD")
-        remove_file("LICENSE_APACHE")
-        remove_file("LICENSE_GPL")
-
-    if "{{cookiecutter.open_source_license}}" == "Apache Software License 2.0":
-        move_file("LICENSE_APACHE", "LICENSE")
-        remove_file("LICENSE_MIT")
-        remove_file("LICENSE_BSD")
-        remove_file("LICENSE_ISC")
-        remove_file("LICENSE_GPL")
-
-    if "{{cookiecutter.open_source_license}}" == "GNU General Public License v3":
-        move_file("LICENSE_GPL", "LICENSE")
-        remove_file("LICENSE_MIT")
-        remove_file("LICENSE_BSD")
-        remove_file("LICENSE_ISC")
-        remove_file("LICENSE_APACHE")
-
-    if "{{cookiecutter.open_source_license}}" == "Not open source":
-        remove_file("LICENSE_GPL")
-        remove_file("LICENSE_MIT")
-        remove_file("LICENSE_BSD")
-        remove_file("LICENSE_ISC")
-        remove_file("LICENSE_APACHE")
-
-    if "{{cookiecutter.layout}}" == "src":
-        if os.path.isdir("src"):
-            remove_dir("src")
-        move_dir("{{cookiecutter.project_slug}}", os.path.join("src", "{{cookiecutter.project_slug}}"))
+    apply_manifest(FileManifest({"cookiecutter": CONTEXT}, render_path).matches)
+    # A template that is not a git checkout is recorded without a commit.
+    record = generation_record(
+        {"cookiecutter": CONTEXT},
+        template_source(TEMPLATE_DIR),
+        template_commit(TEMPLATE_DIR),
+        project_hashes(Path(PROJECT_DIRECTORY)),
+    )
+    Path(PROJECT_DIRECTORY, RECORD_FILE).write_bytes(record)
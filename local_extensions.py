@@ -0,0 +1,25 @@
+"""Jinja extensions that cookiecutter loads from the template, as listed in ``_extensions`` in cookiecutter.json."""
+
+from __future__ import annotations
+
+import os
+
+from jinja2 import Environment
+from jinja2.ext import Extension
+
+
+def template_dir() -> str:
+    """Return the absolute path of the template being generated from.
+
+    cookiecutter renders the hooks from within the template directory, however it was given the
+    template (a relative path, or a repository it cloned), so this is only meaningful in hooks.
+    """
+    return os.path.realpath(os.curdir)
+
+
+class TemplateDirExtension(Extension):
+    """Provide ``template_dir()``, with which the post-generation hook finds the template's tooling."""
+
+    def __init__(self, environment: Environment) -> None:
+        super().__init__(environment)
+        environment.globals["template_dir"] = template_dir
@@ -0,0 +1,164 @@
+"""On-disk store of baked template projects, shared by every process of a pytest run.
+
+Projects are keyed by a hash of the normalized options and the template content, rendered by
+`engine.Template` in a process pool under a lock per option set and published atomically, so that
+pytest-xdist workers attach to finished trees instead of re-rendering the same combinations.
+"""
+
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from pathlib import Path
+
+import cookiecutter
+from engine import Template
+
+TEMPLATE_ROOT = Path(__file__).parent.parent
+COOKIECUTTER_CONFIG = json.loads((TEMPLATE_ROOT / "cookiecutter.json").read_text())
+
+# Paths (relative to the template root) whose content determines the baked output.
+TEMPLATE_INPUTS = (
+    "cookiecutter.json",
+    "local_extensions.py",
+    "hooks",
+    "templates",
+    "cookiecutter-uv",
+    "{{cookiecutter.project_name}}",
+)
+
+OptionsKey = tuple[tuple[str, str], ...]
+
+
+def normalize_options(options: dict[str, str]) -> OptionsKey:
+    """Return a hashable key for ``options`` with unset choices resolved to their cookiecutter.json default."""
+    defaults = {
+        key: value[0] if isinstance(value, list) else value
+        for key, value in COOKIECUTTER_CONFIG.items()
+        if not key.startswith("_")
+    }
+    return tuple(sorted({**defaults, **options}.items()))
+
+
+def template_digest(template: Path) -> str:
+    """Hash every template input file, together with the cookiecutter version the engine builds on."""
+    digest = hashlib.sha256(cookiecutter.__version__.encode())
+    for name in TEMPLATE_INPUTS:
+        root = template / name
+        paths = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+        for path in paths:
+            if "__pycache__" in path.parts:
+                continue
+            digest.update(path.relative_to(template).as_posix().encode() + b"\0")
+            digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(path: Path) -> Generator[None]:
+    """Hold an exclusive lock on ``path`` (created if needed), blocking other processes until released."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+@functools.cache
+def load_template(template: str) -> Template:
+    """Load ``template`` once per process."""
+    return Template(Path(template))
+
+
+def bake_into(template: str, options: dict[str, str], output_dir: Path) -> Path:
+    """Render ``template`` with ``options`` into ``output_dir``; runs in pool worker processes."""
+    return load_template(template).generate(options, output_dir)
+
+
+class ProjectStore:
+    """Lock-protected directory of baked projects, one ``<key>/<project_name>`` entry per option set."""
+
+    def __init__(self, root: Path, template: str) -> None:
+        self.root = root
+        self.template = str(Path(template).resolve())
+        self.digest = template_digest(Path(self.template))
+        self.staging = root / ".staging"
+
+    def key(self, options: dict[str, str]) -> str:
+        payload = json.dumps([self.digest, normalize_options(options)])
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    def lock(self, key: str | None = None) -> AbstractContextManager[None]:
+        """Hold the exclusive lock of the entry ``key``, or the store-wide one, blocking other processes until released.
+
+        Baking an entry only holds its own lock, so processes bake different option sets concurrently; the
+        store-wide lock only covers publishing.
+        """
+        return file_lock(self.root / (f".{key}.lock" if key is not None else ".lock"))
+
+    def get(self, options: dict[str, str]) -> Path | None:
+        """Return the published project for ``options``, or None if it has not been baked yet."""
+        entry = self.root / self.key(options)
+        if not entry.is_dir():
+            return None
+        return next(entry.iterdir())
+
+    def bake(self, options: dict[str, str]) -> Path:
+        """Return the project for ``options``, rendering and publishing it first if needed.
+
+        Generation errors (e.g. a failing pre-generation hook) propagate and are not stored.
+        """
+        project = self.get(options)
+        if project is not None:
+            return project
+        key = self.key(options)
+        with self.lock(key):
+            project = self.get(options)
+            if project is None:
+                bake_into(self.template, options, self._staging_dir(key))
+                project = self._publish(key)
+        return project
+
+    def prebake(self, option_sets: Iterable[dict[str, str]], workers: int | None = None) -> None:
+        """Render every missing option set concurrently in a process pool.
+
+        Option sets that fail to generate are skipped; the test that bakes them sees the error.
+        """
+        with ExitStack() as locks:
+            missing = {}
+            # Sorted, so that processes pre-baking the same option sets take their locks in the same order.
+            for key, options in sorted({self.key(options): options for options in option_sets}.items()):
+                if self.get(options) is None:
+                    locks.enter_context(self.lock(key))
+                    if self.get(options) is None:
+                        missing[key] = options
+            if not missing:
+                return
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(bake_into, self.template, options, self._staging_dir(key)): key
+                    for key, options in missing.items()
+                }
+                for future in as_completed(futures):
+                    if future.exception() is None:
+                        self._publish(futures[future])
+
+    def _staging_dir(self, key: str) -> Path:
+        staging_dir = self.staging / key
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        staging_dir.mkdir(parents=True)
+        return staging_dir
+
+    def _publish(self, key: str) -> Path:
+        # A directory rename is atomic, so readers never observe a half-written project.
+        entry = self.root / key
+        with self.lock():
+            os.replace(self.staging / key, entry)
+        return next(entry.iterdir())
@@ -0,0 +1,93 @@
+"""Content-addressed cache of passing ``run_check`` results, stored in the pytest cache directory.
+
+A project whose file manifest and tool versions match an earlier passing run skips its checks
+entirely. Otherwise every prek hook whose inputs (the files it reads plus its prek.toml entry)
+match an earlier pass is handed to prek through ``SKIP``, so only the hooks whose inputs changed
+run again. The auto-fixing hooks rewrite each file independently of the others, so a hook's
+inputs after fixing are determined by its inputs before fixing, which is what the digests cover.
+
+Generated projects ship a ``uv.lock`` that pins the exact version of every tool and dependency the
+checks install, so the project digest covers those versions, and the hooks that read the installed
+packages (ty, deptry) count ``uv.lock`` among their inputs. Run pytest with ``--cache-clear`` (or
+``--no-check-cache``) to re-check anyway.
+"""
+
+import hashlib
+import json
+import subprocess
+import sys
+import tomllib
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+CACHE_PREFIX = "cookiecutter-uv/check"
+
+# Files read by each hook of the generated prek.toml; hooks not listed here are assumed to read everything.
+HOOK_INPUTS = {
+    "check-toml": ("*.toml",),
+    "check-yaml": ("*.yml", "*.yaml"),
+    "check-json": ("*.json",),
+    "pretty-format-json": ("*.json",),
+    "ruff-check": ("*.py", "*.pyi", "pyproject.toml"),
+    "ruff-format": ("*.py", "*.pyi", "pyproject.toml"),
+    "ty": ("*.py", "*.pyi", "pyproject.toml", "uv.lock"),
+    "deptry": ("*.py", "pyproject.toml", "uv.lock"),
+    "commitizen": ("pyproject.toml",),
+}
+
+
+def prek_hooks(project_path: Path) -> dict[str, dict]:
+    """Map the id of every hook in the project's prek.toml to its repo and hook configuration."""
+    config = tomllib.loads((project_path / "prek.toml").read_text())
+    hooks = {}
+    for repo in config.get("repos", []):
+        for hook in repo.get("hooks", []):
+            hooks[hook["id"]] = {"repo": repo.get("repo"), "rev": repo.get("rev"), "hook": hook}
+    return hooks
+
+
+class CheckCache:
+    """Records which generated trees and which hook inputs have passed ``run_check``."""
+
+    def __init__(self, cache: pytest.Cache) -> None:
+        self.cache = cache
+        uv_version = subprocess.run(["uv", "--version"], capture_output=True, text=True, check=True).stdout
+        self.tool_versions = [uv_version.strip(), sys.version]
+
+    def _digest(self, payload: object) -> str:
+        return hashlib.sha256(json.dumps([self.tool_versions, payload], sort_keys=True).encode()).hexdigest()
+
+    def tree_key(self, manifest: dict[str, tuple[int, str]]) -> str:
+        return self._digest(manifest)
+
+    def hook_keys(self, project_path: Path, manifest: dict[str, tuple[int, str]]) -> dict[str, str]:
+        """Digest the configuration and input files of every hook in the project's prek.toml."""
+        keys = {}
+        for hook_id, config in prek_hooks(project_path).items():
+            patterns = HOOK_INPUTS.get(hook_id, ("*",))
+            inputs = {
+                path: entry
+                for path, entry in manifest.items()
+                if any(fnmatch(PurePosixPath(path).name, pattern) for pattern in patterns)
+            }
+            keys[hook_id] = self._digest([config, inputs])
+        return keys
+
+    def tree_passed(self, tree_key: str) -> bool:
+        return self.cache.get(f"{CACHE_PREFIX}/trees/{tree_key}", False)
+
+    def passed_hooks(self, hook_keys: dict[str, str]) -> list[str]:
+        """Return the ids of the hooks whose current inputs already passed in an earlier run."""
+        return sorted(
+            hook_id
+            for hook_id, key in hook_keys.items()
+            if self.cache.get(f"{CACHE_PREFIX}/hooks/{hook_id}/{key}", False)
+        )
+
+    def record_pass(self, tree_key: str, hook_keys: dict[str, str]) -> None:
+        # One cache entry per result, so concurrent xdist workers never overwrite each other's records.
+        self.cache.set(f"{CACHE_PREFIX}/trees/{tree_key}", True)
+        for hook_id, key in hook_keys.items():
+            self.cache.set(f"{CACHE_PREFIX}/hooks/{hook_id}/{key}", True)
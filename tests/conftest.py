@@ -1,12 +1,54 @@
+import datetime
+import fcntl
+import functools
+import hashlib
+import json
 import os
 import shlex
+import shutil
 import subprocess
+import tempfile
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import pytest
 import yaml
+from bakery import ProjectStore, normalize_options
+from check_cache import CheckCache
+from engine import Template, VirtualProject
+from option_matrix import MODES as MATRIX_MODES
+from warm_cache import MODES, WarmCache
+
+REQUESTED_OPTIONS = pytest.StashKey[list[dict[str, str]]]()
+
+# Directories that tools create inside a project and that are never part of a snapshot.
+SNAPSHOT_IGNORED_DIRS = {".git", ".venv", "__pycache__", ".pytest_cache", ".ruff_cache"}
+# Files rendered with the current year (`{% now %}`), normalized so snapshots don't expire.
+SNAPSHOT_DATED_FILES = {"LICENSE"}
+# The generation record names the template checkout and commit, normalized so snapshots don't depend on them.
+SNAPSHOT_RECORD_FILE = ".cookiecutter-uv.json"
+
+Manifest = dict[str, tuple[int, str]]
+
+# Rendered projects the `render` fixture keeps per process (a few hundred KB each), least recently used first out.
+RENDER_CACHE_SIZE = 32
+
+# Variables the running pytest session sets for itself, which nested pytest runs must not inherit.
+OUTER_PYTEST_ENV = ("PYTEST_XDIST_", "PYTEST_CURRENT_TEST")
+
+# Linux FICLONE ioctl: share file extents between source and clone (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> None:
+    """Copy ``src`` to ``dst`` as a copy-on-write reflink where the filesystem supports it."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copymode(src, dst)
 
 
 @dataclass
@@ -17,11 +59,27 @@ class BakedProject:
     exit_code: int
     exception: Exception | None
     options: dict[str, str] = field(default_factory=dict)
+    read_only: bool = False
+    scratch_dir: Path | None = None
+    warm_cache: WarmCache | None = None
+    check_cache: CheckCache | None = None
 
     @property
     def path(self) -> Path:
         return self.project_path
 
+    def make_writable(self) -> None:
+        """Swap a shared, read-only project for a private copy-on-write clone before mutating it."""
+        if not self.read_only:
+            return
+        if self.scratch_dir is None:
+            raise RuntimeError(f"Cannot mutate shared baked project {self.path} without a scratch directory")
+        # A directory of its own, so that clones of same-named projects in one test don't collide.
+        clone_path = Path(tempfile.mkdtemp(dir=self.scratch_dir)) / self.path.name
+        shutil.copytree(self.path, clone_path, copy_function=_clone_file)
+        self.project_path = clone_path
+        self.read_only = False
+
     def has_file(self, rel_path: str) -> bool:
         return (self.path / rel_path).is_file()
 
@@ -45,17 +103,69 @@ class BakedProject:
             return False
         return True
 
-    def run(self, command: str, check: bool = False) -> subprocess.CompletedProcess:
-        # Strip VIRTUAL_ENV so the outer test environment doesn't leak
-        # into the baked project's subprocess.
-        env = {k: v for k, v in os.environ.items() if k != "VIRTUAL_ENV"}
+    def manifest(self) -> Manifest:
+        """Walk the project once, mapping each relative file path to its size and BLAKE2 digest."""
+        year = str(datetime.date.today().year).encode()
+        manifest = {}
+        for root, dirs, files in os.walk(self.path):
+            dirs[:] = [d for d in dirs if d not in SNAPSHOT_IGNORED_DIRS]
+            for name in files:
+                path = Path(root, name)
+                rel_path = path.relative_to(self.path).as_posix()
+                if rel_path in SNAPSHOT_DATED_FILES:
+                    content = path.read_bytes().replace(year, b"YYYY")
+                    manifest[rel_path] = (len(content), hashlib.blake2b(content, digest_size=16).hexdigest())
+                    continue
+                if rel_path == SNAPSHOT_RECORD_FILE:
+                    record = json.loads(path.read_text())
+                    record.update(template="<template>", commit="<commit>")
+                    record["files"].update(
+                        (dated, "<dated>") for dated in SNAPSHOT_DATED_FILES & record["files"].keys()
+                    )
+                    content = (json.dumps(record, indent=2) + "\n").encode()
+                    manifest[rel_path] = (len(content), hashlib.blake2b(content, digest_size=16).hexdigest())
+                    continue
+                with path.open("rb") as f:
+                    digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16))
+                manifest[rel_path] = (path.stat().st_size, digest.hexdigest())
+        return dict(sorted(manifest.items()))
+
+    def assert_matches_snapshot(self, snapshot_path: Path, update: bool = False) -> None:
+        """Compare the project's manifest to a golden snapshot, or rewrite the snapshot when ``update`` is set."""
+        actual = self.manifest()
+        if update:
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            snapshot_path.write_text(json.dumps(actual, indent=2) + "\n")
+            return
+        assert snapshot_path.is_file(), f"Missing snapshot {snapshot_path}; run pytest with --update-snapshots"
+        expected = {path: tuple(entry) for path, entry in json.loads(snapshot_path.read_text()).items()}
+        diff = [f"+ {path}" for path in actual.keys() - expected.keys()]
+        diff += [f"- {path}" for path in expected.keys() - actual.keys()]
+        diff += [
+            f"~ {path} ({expected[path][0]} -> {actual[path][0]} bytes)"
+            for path in actual.keys() & expected.keys()
+            if actual[path] != expected[path]
+        ]
+        assert not diff, f"Project differs from {snapshot_path.name} (run with --update-snapshots to accept):\n" + (
+            "\n".join(sorted(diff, key=lambda line: line[2:]))
+        )
+
+    def run(self, command: str, check: bool = False, env: dict[str, str] | None = None) -> subprocess.CompletedProcess:
+        self.make_writable()
+        # Strip VIRTUAL_ENV and the xdist worker variables so the outer test environment doesn't leak
+        # into the baked project's subprocess (pytest-benchmark, e.g., disables itself under xdist).
+        run_env = {k: v for k, v in os.environ.items() if k != "VIRTUAL_ENV" and not k.startswith(OUTER_PYTEST_ENV)}
+        if self.warm_cache is not None:
+            self.warm_cache.ensure_warm()
+            run_env.update(self.warm_cache.env())
+        run_env.update(env or {})
         result = subprocess.run(
             shlex.split(command),
             cwd=self.path,
             capture_output=True,
             text=True,
             check=check,
-            env=env,
+            env=run_env,
         )
         return result
 
@@ -75,21 +185,131 @@ class BakedProject:
             raise RuntimeError(f"Command failed: uv run make test\nstdout:\n{result.stdout}\nstderr:\n{result.stderr}")
 
     def run_check(self) -> None:
+        env = None
+        if self.check_cache is not None:
+            manifest = self.manifest()
+            tree_key = self.check_cache.tree_key(manifest)
+            if self.check_cache.tree_passed(tree_key):
+                return
+            hook_keys = self.check_cache.hook_keys(self.path, manifest)
+            skip = self.check_cache.passed_hooks(hook_keys)
+            env = {"SKIP": ",".join(skip)} if skip else None
+
         if not (self.path / ".git").is_dir():
             self.git_init()
 
         # Run pre-commit once to auto-fix formatting issues from Jinja2 rendering
         # (e.g. end-of-file-fixer), then re-stage and run the real check.
-        self.run("uv run prek run -a")
+        self.run("uv run prek run -a", env=env)
         self.run("git add .", check=True)
-        result = self.run("uv run make check")
+        result = self.run("uv run make check", env=env)
         assert result.returncode == 0, f"make check failed:\n{result.stdout}\n{result.stderr}"
+        if self.check_cache is not None:
+            self.check_cache.record_pass(tree_key, hook_keys)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--bake-workers",
+        type=int,
+        default=None,
+        help="Processes used to pre-render parametrized option sets at session start (default: CPU count, 0 disables)",
+    )
+    parser.addoption(
+        "--update-snapshots",
+        action="store_true",
+        default=False,
+        help="Rewrite the golden tree snapshots in tests/snapshots instead of comparing against them",
+    )
+    parser.addoption(
+        "--option-matrix",
+        default="pairwise",
+        metavar="|".join(MATRIX_MODES),
+        help="Option sets for the structural combination tests: every combination of the choices in "
+        "cookiecutter.json ('full'), or a covering array of every combination of N options (default: 'pairwise')",
+    )
+    parser.addoption(
+        "--no-check-cache",
+        action="store_true",
+        default=False,
+        help="Always run every check in baked projects instead of reusing passing results from the pytest cache",
+    )
+    parser.addoption(
+        "--warm-cache",
+        choices=MODES,
+        default="off",
+        help="Install baked projects offline from caches warmed once per dependency pin set: "
+        "'hardlink' links each project's .venv into the shared uv cache, 'shared-venv' reuses one venv per worker",
+    )
+    parser.addoption(
+        "--warm-cache-dir",
+        type=Path,
+        default=None,
+        help="Directory of the warmed caches, e.g. restored from CI (default: inside the pytest cache directory)",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Record the option sets of the selected tests that bake, so they can be pre-rendered together."""
+    requested = {}
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        options = callspec.params.get("options") if callspec is not None else None
+        if isinstance(options, dict) and "bake" in getattr(item, "fixturenames", ()):
+            requested[normalize_options(options)] = options
+    config.stash[REQUESTED_OPTIONS] = list(requested.values())
+
+
+@pytest.fixture(scope="session")
+def bake_store(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> ProjectStore:
+    """Project store shared by all processes of this run, pre-filled with every requested option set."""
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        # Each xdist worker gets its own basetemp below a common per-run directory.
+        root = root.parent
+    store = ProjectStore(root / "bake-store", request.config.option.template)
+    workers = request.config.option.bake_workers
+    if workers != 0:
+        store.prebake(request.config.stash.get(REQUESTED_OPTIONS, []), workers=workers)
+    return store
+
+
+@pytest.fixture(scope="session")
+def warm_cache(request: pytest.FixtureRequest, bake_store: ProjectStore) -> WarmCache | None:
+    """Shared offline caches for installing baked projects, or None unless ``--warm-cache`` is given."""
+    mode = request.config.option.warm_cache
+    if mode == "off":
+        return None
+    root = request.config.option.warm_cache_dir
+    if root is None:
+        cache = getattr(request.config, "cache", None)
+        # Without the cacheprovider plugin (``-p no:cacheprovider``) the caches only last for this run.
+        root = cache.mkdir("warm-cache") if cache is not None else bake_store.root.parent / "warm-cache"
+    return WarmCache(root, bake_store, mode)
+
+
+@pytest.fixture(scope="session")
+def check_cache(request: pytest.FixtureRequest) -> CheckCache | None:
+    """Passing ``run_check`` results from earlier runs, or None if disabled or pytest's cache is unavailable.
+
+    Without a check cache, ``run_check`` simply runs every check.
+    """
+    cache = getattr(request.config, "cache", None)
+    if request.config.option.no_check_cache or cache is None:
+        return None
+    return CheckCache(cache)
 
 
 @pytest.fixture
-def bake(cookies) -> Callable[..., BakedProject]:
+def bake(
+    bake_store: ProjectStore, warm_cache: WarmCache | None, check_cache: CheckCache | None, tmp_path: Path
+) -> Callable[..., BakedProject]:
     """Fixture factory that bakes a cookiecutter project and returns a BakedProject.
 
+    Each distinct option set is rendered once per run into the shared ``bake_store`` and handed out
+    read-only; running commands in the project transparently switches to a private clone.
+
     Usage:
         def test_something(bake):
             project = bake(zensical="n")
@@ -97,19 +317,39 @@ def bake(cookies) -> Callable[..., BakedProject]:
     """
 
     def _bake(**options) -> BakedProject:
-        result = cookies.bake(extra_context=options)
-        project = BakedProject(
-            project_path=result.project_path,
-            exit_code=result.exit_code,
-            exception=result.exception,
+        return BakedProject(
+            project_path=bake_store.bake(options),
+            exit_code=0,
+            exception=None,
             options=options,
+            read_only=True,
+            scratch_dir=tmp_path,
+            warm_cache=warm_cache,
+            check_cache=check_cache,
         )
-        # Fail immediately on generation errors to avoid downstream confusion
-        if project.exception is not None and project.exit_code != 0:
-            raise project.exception
-        # Validate path exists before returning
-        if project.path is None or not project.path.exists():
-            raise ValueError(f"Baked project path is invalid: {project.path}")
-        return project
 
     return _bake
+
+
+@pytest.fixture(scope="session")
+def render(request: pytest.FixtureRequest) -> Callable[..., VirtualProject]:
+    """Fixture factory that renders a project in memory and returns it as a VirtualProject.
+
+    For tests that only inspect generated files: nothing is written to disk, and the projects of the
+    last RENDER_CACHE_SIZE distinct option sets are kept for reuse. Use ``bake`` to install or run the project.
+
+    Usage:
+        def test_something(render):
+            project = render(zensical="n")
+            assert project.has_file("pyproject.toml")
+    """
+    template = Template(Path(request.config.option.template))
+
+    @functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def _render_set(key: frozenset[tuple[str, str]]) -> VirtualProject:
+        return template.dry_run(dict(key))
+
+    def _render(**options) -> VirtualProject:
+        return _render_set(frozenset(options.items()))
+
+    return _render
@@ -0,0 +1,74 @@
+"""Option sets to test, derived from the choice variables of cookiecutter.json.
+
+``full`` is every combination of choices. ``N-wise`` (``pairwise`` is ``2-wise``) is a covering
+array: far fewer option sets, in which every combination of values of any N options still occurs
+at least once, which catches the interactions between up to N options. Interactions of more options
+are rarer; run the full matrix to rule them out.
+
+The covering array is built greedily and deterministically, so test ids are stable between runs:
+each option set starts from the smallest value combination that is not covered yet, then every
+other option takes the value that covers the most uncovered combinations.
+"""
+
+import itertools
+import re
+
+MODES = ("full", "pairwise", "N-wise")
+_N_WISE = re.compile(r"(?P<strength>[1-9][0-9]*)-wise")
+
+
+def option_choices(config: dict) -> dict[str, list[str]]:
+    """Map each choice variable of cookiecutter.json to its values; private ``_`` variables are skipped."""
+    return {key: list(value) for key, value in config.items() if isinstance(value, list) and not key.startswith("_")}
+
+
+def full_matrix(choices: dict[str, list[str]]) -> list[dict[str, str]]:
+    return [dict(zip(choices, values)) for values in itertools.product(*choices.values())]
+
+
+def covering_array(choices: dict[str, list[str]], strength: int = 2) -> list[dict[str, str]]:
+    """Option sets covering every combination of values of any ``strength`` options."""
+    names = list(choices)
+    strength = min(strength, len(names))
+    groups = list(itertools.combinations(names, strength))
+    groups_with = {name: [group for group in groups if name in group] for name in names}
+    uncovered = {
+        (group, values) for group in groups for values in itertools.product(*(choices[name] for name in group))
+    }
+
+    def gain(row: dict[str, str], name: str) -> int:
+        return sum(
+            (group, tuple(row[member] for member in group)) in uncovered
+            for group in groups_with[name]
+            if all(member in row for member in group)
+        )
+
+    rows = []
+    while uncovered:
+        group, values = min(uncovered)
+        row = dict(zip(group, values))
+        for name in names:
+            if name not in row:
+                row[name] = max(choices[name], key=lambda value, name=name: gain({**row, name: value}, name))
+        uncovered -= {(group, tuple(row[member] for member in group)) for group in groups}
+        rows.append({name: row[name] for name in names})
+    return rows
+
+
+def option_matrix(config: dict, mode: str = "pairwise") -> list[dict[str, str]]:
+    """The option sets of ``mode`` (one of `MODES`) for the template configuration ``config``."""
+    choices = option_choices(config)
+    if mode == "full":
+        return full_matrix(choices)
+    if mode == "pairwise":
+        return covering_array(choices, 2)
+    match = _N_WISE.fullmatch(mode)
+    if match is None:
+        msg = f"Unknown option matrix {mode!r}; expected 'full', 'pairwise' or 'N-wise', e.g. '3-wise'"
+        raise ValueError(msg)
+    return covering_array(choices, int(match["strength"]))
+
+
+def matrix_id(options: dict[str, str]) -> str:
+    """A short, readable test id: the chosen values in cookiecutter.json order."""
+    return "-".join(value.split()[0] for value in options.values())
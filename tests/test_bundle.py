@@ -0,0 +1,80 @@
+"""Test generating projects from a compiled template bundle."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import jinja2
+import pytest
+from bundle import MAGIC, BundledTemplate, BundleError, compile_bundle
+from conftest import BakedProject
+from cookiecutter.exceptions import FailedHookException
+from engine import Template
+from main import main
+from test_combinations import COMBINATIONS, SNAPSHOT_DIR
+
+
+@pytest.fixture(scope="module")
+def bundle_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return compile_bundle(Template(), tmp_path_factory.mktemp("bundle") / "template.bundle")
+
+
+@pytest.fixture(scope="module")
+def bundled(bundle_path: Path) -> BundledTemplate:
+    return BundledTemplate(bundle_path)
+
+
+@pytest.mark.parametrize("options", COMBINATIONS)
+def test_bundle_matches_cookiecutter_output(
+    bundled: BundledTemplate, options: dict[str, str], tmp_path: Path, request: pytest.FixtureRequest
+) -> None:
+    """Projects generated from the bundle are identical to the cookiecutter-baked snapshots."""
+    project_dir = bundled.generate(options, tmp_path)
+    project = BakedProject(project_path=project_dir, exit_code=0, exception=None, options=options)
+    project.assert_matches_snapshot(SNAPSHOT_DIR / f"{request.node.callspec.id}.json")
+
+
+def test_bundle_runs_the_pre_generation_hook(bundled: BundledTemplate, tmp_path: Path) -> None:
+    with pytest.raises(FailedHookException, match="exit status: 1"):
+        bundled.generate({"project_name": "bad_name"}, tmp_path)
+    assert not (tmp_path / "bad_name").exists()
+
+
+def test_bundle_loads_without_reading_or_parsing_templates(bundle_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args: Any, **kwargs: Any) -> None:
+        pytest.fail("Loading a bundle read a template file or parsed Jinja source")
+
+    monkeypatch.setattr(Path, "read_text", fail)
+    monkeypatch.setattr(Path, "read_bytes", fail)
+    monkeypatch.setattr(jinja2.Environment, "_parse", fail)
+    bundled = BundledTemplate(bundle_path)
+    monkeypatch.undo()
+
+    assert [f.path for f in bundled.files] == [f.path for f in Template().files]
+
+
+def test_invalid_bundles_are_rejected(bundle_path: Path, tmp_path: Path) -> None:
+    not_a_bundle = tmp_path / "not.bundle"
+    not_a_bundle.write_bytes(b"definitely not a bundle")
+    with pytest.raises(BundleError, match="not a cookiecutter-uv bundle"):
+        BundledTemplate(not_a_bundle)
+
+    data = bundle_path.read_bytes()
+    header_length = int.from_bytes(data[len(MAGIC) : len(MAGIC) + 4], "big")
+    start = len(MAGIC) + 4
+    header = json.loads(data[start : start + header_length])
+    header["jinja2"] = "0.0"
+    header_bytes = json.dumps(header).encode()
+    stale = tmp_path / "stale.bundle"
+    stale.write_bytes(MAGIC + len(header_bytes).to_bytes(4, "big") + header_bytes + data[start + header_length :])
+    with pytest.raises(BundleError, match="recompile"):
+        BundledTemplate(stale)
+
+
+def test_compile_and_bake_commands(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    bundle_path = tmp_path / "template.bundle"
+    assert main(["compile", "--output", str(bundle_path)]) == 0
+    assert main(["bake", "--bundle", str(bundle_path), "-o", str(tmp_path), "project_name=svc-a", "layout=flat"]) == 0
+    assert (tmp_path / "svc-a" / "svc_a" / "main.py").is_file()
+    assert main(["bake", "--bundle", str(bundle_path), "-o", str(tmp_path), "project_name=bad_name"]) == 1
+    assert "FailedHookException" in capsys.readouterr().err
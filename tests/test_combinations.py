@@ -1,12 +1,20 @@
-"""Test cookiecutter template across multiple option combinations."""
+"""Test cookiecutter template across multiple option combinations.
+
+The structural checks of `TestCombinations` run over an option matrix derived from cookiecutter.json
+(see tests/option_matrix.py; ``--option-matrix`` selects it), on in-memory renders. The hand-picked
+`COMBINATIONS` are baked with `engine.Template` and compared with their golden snapshots.
+"""
 
 import json
+import re
 import tomllib
 from pathlib import Path
 from typing import Callable
 
 import pytest
 from conftest import BakedProject
+from engine import VirtualProject
+from option_matrix import matrix_id, option_matrix
 
 # Defaults from cookiecutter.json (first item in each list)
 DEFAULTS = {
@@ -16,13 +24,20 @@ DEFAULTS = {
     "zensical": "y",
     "open_source_license": "MIT license",
     "include_github_actions": "y",
+    "benchmarks": "n",
+    "profiling": "n",
+    "mypyc": "n",
+    "test_scheduling": "n",
+    "concurrency": "none",
+    "instrumentation": "n",
 }
 
 COOKIECUTTER_CONFIG = json.loads((Path(__file__).parent.parent / "cookiecutter.json").read_text())
 DEFAULT_PROJECT_NAME = COOKIECUTTER_CONFIG["project_name"]
 DEFAULT_PROJECT_SLUG = DEFAULT_PROJECT_NAME.lower().replace("-", "_")
+SNAPSHOT_DIR = Path(__file__).parent / "snapshots"
 
-# Define meaningful option combinations to test
+# Meaningful option combinations, baked and snapshotted
 COMBINATIONS = [
     pytest.param({}, id="all-defaults"),
     pytest.param({"layout": "flat"}, id="flat-layout"),
@@ -40,6 +55,25 @@ COMBINATIONS = [
     pytest.param({"layout": "flat", "deptry": "n"}, id="flat-no-deptry"),
     pytest.param({"include_github_actions": "n"}, id="no-github-actions"),
     pytest.param({"include_github_actions": "y"}, id="with-github-actions"),
+    pytest.param({"benchmarks": "y"}, id="with-benchmarks"),
+    pytest.param({"layout": "flat", "benchmarks": "y", "deptry": "n"}, id="flat-with-benchmarks-no-deptry"),
+    pytest.param({"profiling": "y"}, id="with-profiling"),
+    pytest.param({"layout": "flat", "profiling": "y"}, id="flat-with-profiling"),
+    pytest.param({"mypyc": "y", "profiling": "y"}, id="with-mypyc"),
+    pytest.param({"layout": "flat", "mypyc": "y"}, id="flat-with-mypyc"),
+    pytest.param({"test_scheduling": "y"}, id="with-test-scheduling"),
+    pytest.param(
+        {"layout": "flat", "test_scheduling": "y", "include_github_actions": "n"}, id="flat-with-test-scheduling-no-ci"
+    ),
+    pytest.param({"concurrency": "asyncio"}, id="with-asyncio"),
+    pytest.param({"concurrency": "threads", "benchmarks": "y"}, id="with-threads-and-benchmarks"),
+    pytest.param(
+        {"layout": "flat", "concurrency": "processes", "benchmarks": "y"}, id="flat-with-processes-and-benchmarks"
+    ),
+    pytest.param({"instrumentation": "y"}, id="with-instrumentation"),
+    pytest.param(
+        {"layout": "flat", "concurrency": "asyncio", "instrumentation": "y"}, id="flat-with-asyncio-and-instrumentation"
+    ),
 ]
 
 
@@ -48,11 +82,32 @@ def resolve_options(options: dict[str, str]) -> dict[str, str]:
     return {**DEFAULTS, **options}
 
 
-@pytest.mark.parametrize("options", COMBINATIONS)
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if metafunc.cls is TestCombinations:
+        matrix = option_matrix(COOKIECUTTER_CONFIG, metafunc.config.option.option_matrix)
+        metafunc.parametrize("options", matrix, ids=matrix_id)
+
+
 class TestCombinations:
-    """Validate file presence/absence for each option combination."""
+    """Validate file presence/absence for each option set of the option matrix.
+
+    Each option set is one test that renders the project once and runs every `check_*` method on it,
+    reporting all the checks that fail rather than only the first.
+    """
 
-    def test_always_present_files(self, bake: Callable[..., BakedProject], options: dict[str, str]) -> None:
+    def test_option_set(self, render: Callable[..., VirtualProject], options: dict[str, str]) -> None:
+        project = render(**options)
+        effective = resolve_options(options)
+        failures = []
+        for name in dir(self):
+            if name.startswith("check_"):
+                try:
+                    getattr(self, name)(project, effective)
+                except AssertionError as error:
+                    failures.append(f"{name}: {error}")
+        assert not failures, "\n".join(failures)
+
+    def check_always_present_files(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Core files should always be present regardless of options."""
         EXPECTED_FILES = [
             "pyproject.toml",
@@ -61,14 +116,11 @@ class TestCombinations:
             ".gitignore",
             "tests",
         ]
-        project = bake(**options)
         for rel_path in EXPECTED_FILES:
-            assert (project.path / rel_path).exists(), f"Expected {rel_path} to exist"
+            assert project.has_file(rel_path) or project.has_dir(rel_path), f"Expected {rel_path} to exist"
 
-    def test_license_files(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_license_files(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify correct license file is selected."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         license_mapping = {
             "MIT license": "LICENSE",
@@ -85,10 +137,8 @@ class TestCombinations:
             # "Not open source" case
             assert not project.has_file("LICENSE"), "Expected no LICENSE file for non-open source"
 
-    def test_documentation_layout(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_documentation_layout(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify docs directory is present/absent based on zensical option."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["zensical"] == "y":
             assert project.has_dir("docs"), "Expected docs/ when zensical='y'"
@@ -97,10 +147,8 @@ class TestCombinations:
             assert not project.has_dir("docs"), "Expected no docs/ when zensical='n'"
             assert not project.has_file("zensical.toml"), "Expected no zensical.toml when zensical='n'"
 
-    def test_source_layout(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_source_layout(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify correct directory layout based on layout option."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["layout"] == "src":
             assert project.has_dir("src"), "Expected src/ directory for src layout"
@@ -113,9 +161,8 @@ class TestCombinations:
             assert project.has_dir(DEFAULT_PROJECT_SLUG), f"Expected {DEFAULT_PROJECT_SLUG}/ in root for flat layout"
             assert not project.has_dir("src"), "Expected no src/ for flat layout"
 
-    def test_pyproject_metadata(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_pyproject_metadata(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify pyproject.toml contains correct metadata."""
-        project = bake(**options)
         content = project.read_file("pyproject.toml")
         pyproject = tomllib.loads(content)
 
@@ -123,10 +170,8 @@ class TestCombinations:
         assert pyproject["project"]["name"] == "my-project", f"Unexpected name: {pyproject['project']['name']}"
         assert "version" in pyproject["project"], "Missing version field"
 
-    def test_deptry_configuration(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_deptry_configuration(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify deptry is configured when deptry='y' and absent when 'n'."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         pyproject_content = project.read_file("pyproject.toml")
         prek_content = project.read_file("prek.toml")
@@ -141,10 +186,8 @@ class TestCombinations:
             assert "deptry" not in prek_content, "Expected no deptry hook in prek.toml when deptry='n'"
             assert "deptry" not in makefile_content, "Expected no deptry in Makefile when deptry='n'"
 
-    def test_github_actions(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_github_actions(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify .github/workflows/ci.yml is present/absent based on include_github_actions option."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["include_github_actions"] == "y":
             assert project.has_dir(".github"), "Expected .github/ when include_github_actions='y'"
@@ -166,10 +209,8 @@ class TestCombinations:
         else:
             assert not project.has_dir(".github"), "Expected no .github/ when include_github_actions='n'"
 
-    def test_publish_workflow(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_publish_workflow(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify publish.yml is present/absent based on publish_to_pypi and include_github_actions options."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["include_github_actions"] == "y" and effective["publish_to_pypi"] == "y":
             assert project.has_file(".github/workflows/publish.yml"), (
@@ -189,10 +230,8 @@ class TestCombinations:
                 "Expected no .github/workflows/publish.yml when publish_to_pypi='n' or include_github_actions='n'"
             )
 
-    def test_readme_pypi_section(self, bake: Callable[..., BakedProject], options: dict[str, str]):
+    def check_readme_pypi_section(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify README contains PyPI section only when publish_to_pypi='y'."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["publish_to_pypi"] == "y":
             assert project.file_contains("README.md", "PYPI_TOKEN"), (
@@ -206,9 +245,8 @@ class TestCombinations:
                 "Expected no PYPI_TOKEN in README when publish_to_pypi='n'"
             )
 
-    def test_commitizen_config(self, bake: Callable[..., BakedProject], options: dict[str, str]) -> None:
+    def check_commitizen_config(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify commitizen is configured correctly."""
-        project = bake(**options)
 
         content = project.read_file("pyproject.toml")
         assert "[tool.commitizen]" in content, "Expected [tool.commitizen] section in pyproject.toml"
@@ -222,10 +260,8 @@ class TestCombinations:
         assert "cz commit" in makefile, "Expected 'cz commit' in Makefile"
         assert "cz bump" in makefile, "Expected 'cz bump' in Makefile"
 
-    def test_pr_title_workflow(self, bake: Callable[..., BakedProject], options: dict[str, str]) -> None:
+    def check_pr_title_workflow(self, project: VirtualProject, effective: dict[str, str]) -> None:
         """Verify pr-title.yml is present/absent based on include_github_actions option."""
-        project = bake(**options)
-        effective = resolve_options(options)
 
         if effective["include_github_actions"] == "y":
             assert project.has_file(".github/workflows/pr-title.yml"), (
@@ -238,3 +274,163 @@ class TestCombinations:
             assert not project.has_file(".github/workflows/pr-title.yml"), (
                 "Expected no .github/workflows/pr-title.yml when include_github_actions='n'"
             )
+
+    def check_benchmarks(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the benchmark suite, make targets and CI job are present/absent based on benchmarks option."""
+
+        pyproject = tomllib.loads(project.read_file("pyproject.toml"))
+        makefile = project.read_file("Makefile")
+
+        if effective["benchmarks"] == "y":
+            assert project.has_file("benchmarks/test_benchmarks.py"), "Expected benchmarks/ when benchmarks='y'"
+            assert project.file_contains(
+                "benchmarks/test_benchmarks.py", f"from {DEFAULT_PROJECT_SLUG}.main import main"
+            )
+            assert any(dep.startswith("pytest-benchmark") for dep in pyproject["dependency-groups"]["dev"])
+            for target in ("bench:", "bench-save:", "bench-compare:"):
+                assert target in makefile, f"Expected '{target}' target in Makefile when benchmarks='y'"
+            assert project.file_contains(".gitignore", ".benchmarks/")
+            if effective["deptry"] == "y":
+                assert pyproject["tool"]["deptry"]["extend_exclude"] == ["benchmarks"]
+            if effective["include_github_actions"] == "y":
+                ci = project.read_file(".github/workflows/ci.yml")
+                assert "make bench-compare" in ci, "Expected benchmarks CI job when benchmarks='y'"
+                assert "BENCH_THRESHOLD: ${{ vars.BENCH_THRESHOLD }}" in ci, (
+                    "Expected the CI comparison to fail by the BENCH_THRESHOLD repository variable"
+                )
+        else:
+            assert not project.has_dir("benchmarks"), "Expected no benchmarks/ when benchmarks='n'"
+            assert "pytest-benchmark" not in project.read_file("pyproject.toml")
+            assert "bench:" not in makefile, "Expected no bench target in Makefile when benchmarks='n'"
+            assert "deptry" not in pyproject.get("tool", {})
+
+    def check_profiling(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the profiling module and make targets are present/absent based on profiling option."""
+        package = f"src/{DEFAULT_PROJECT_SLUG}" if effective["layout"] == "src" else DEFAULT_PROJECT_SLUG
+        makefile = project.read_file("Makefile")
+
+        if effective["profiling"] == "y":
+            assert project.has_file(f"{package}/profiling.py"), "Expected profiling module when profiling='y'"
+            assert project.has_file("tests/test_profiling.py"), "Expected profiling tests when profiling='y'"
+            assert f"python -m {DEFAULT_PROJECT_SLUG}.profiling cpu" in makefile, "Expected profile target"
+            assert f"python -m {DEFAULT_PROJECT_SLUG}.profiling memory" in makefile, "Expected memprofile target"
+            assert project.file_contains(".gitignore", ".profiles/")
+        else:
+            assert not project.has_file(f"{package}/profiling.py"), "Expected no profiling module when profiling='n'"
+            assert not project.has_file("tests/test_profiling.py"), "Expected no profiling tests when profiling='n'"
+            assert "profile:" not in makefile, "Expected no profile targets in Makefile when profiling='n'"
+
+    def check_lazy_package(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the package exports names lazily and ships an import-time budget test."""
+        package = f"src/{DEFAULT_PROJECT_SLUG}" if effective["layout"] == "src" else DEFAULT_PROJECT_SLUG
+
+        init = project.read_file(f"{package}/__init__.py")
+        for name in ("def __getattr__(", "def __dir__(", "_EXPORTS", "__all__", "if TYPE_CHECKING:"):
+            assert name in init, f"Expected {name} in {package}/__init__.py"
+        assert project.file_contains("tests/test_import_time.py", f'cold_import_ms("{DEFAULT_PROJECT_SLUG}")')
+
+    def check_mypyc(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the build backend, setup.py and compiled-wheel targets follow the mypyc option."""
+        pyproject = project.read_file("pyproject.toml")
+        makefile = project.read_file("Makefile")
+
+        if effective["mypyc"] == "y":
+            assert project.has_file("setup.py"), "Expected setup.py when mypyc='y'"
+            assert project.has_file("tests/test_compiled.py"), "Expected compiled-wheel test when mypyc='y'"
+            assert 'build-backend = "setuptools.build_meta"' in pyproject
+            assert "[tool.uv.build-backend]" not in pyproject
+            package_dir = (
+                f'Path("src") / "{DEFAULT_PROJECT_SLUG}"'
+                if effective["layout"] == "src"
+                else f'Path("{DEFAULT_PROJECT_SLUG}")'
+            )
+            assert project.file_contains("setup.py", f"PACKAGE_DIR = {package_dir}")
+            if effective["layout"] == "src":
+                assert 'where = ["src"]' in pyproject
+            else:
+                assert f'include = ["{DEFAULT_PROJECT_SLUG}*"]' in pyproject
+            for target in ("build-pure:", "test-wheel:", "PURE_PYTHON=1", "EXPECT_COMPILED=1"):
+                assert target in makefile, f"Expected {target} in Makefile"
+        else:
+            assert not project.has_file("setup.py"), "Expected no setup.py when mypyc='n'"
+            assert not project.has_file("tests/test_compiled.py")
+            assert 'build-backend = "uv_build"' in pyproject
+            assert "build-pure:" not in makefile, "Expected no build-pure target when mypyc='n'"
+
+    def check_test_scheduling(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the scheduling plugin, make targets and CI step follow the test_scheduling option."""
+        makefile = project.read_file("Makefile")
+
+        if effective["test_scheduling"] == "y":
+            assert project.has_file("tests/conftest.py"), "Expected scheduling plugin when test_scheduling='y'"
+            assert project.has_file("tests/test_scheduling.py"), "Expected scheduling tests when test_scheduling='y'"
+            for target in ("test-parallel:", "test-fast:", "--workers=", "--changed-first", "--num-shards="):
+                assert target in makefile, f"Expected {target} in Makefile"
+            assert project.file_contains(".gitignore", ".test-durations.json")
+            if effective["include_github_actions"] == "y":
+                assert project.file_contains(".github/workflows/ci.yml", "make test-parallel")
+        else:
+            assert not project.has_file("tests/conftest.py"), "Expected no conftest.py when test_scheduling='n'"
+            assert not project.has_file("tests/test_scheduling.py")
+            assert "test-parallel:" not in makefile, "Expected no test-parallel target when test_scheduling='n'"
+
+    def check_lockfile(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the project ships the pre-resolved lockfile of its dependency set."""
+
+        assert not project.has_dir("uv-locks"), "Expected only the selected lockfile, as uv.lock"
+        lock = tomllib.loads(project.read_file("uv.lock"))
+        [root] = [package for package in lock["package"] if package.get("source") == {"editable": "."}]
+        assert root["name"] == DEFAULT_PROJECT_NAME
+        dev = tomllib.loads(project.read_file("pyproject.toml"))["dependency-groups"]["dev"]
+        locked = {requirement["name"] for requirement in root["metadata"]["requires-dev"]["dev"]}
+        assert locked == {re.split(r"[<>=~!\[ ]", requirement, maxsplit=1)[0] for requirement in dev}
+
+    def check_concurrency(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the worker pipeline, its tests and its benchmark follow the concurrency option."""
+        package = f"src/{DEFAULT_PROJECT_SLUG}" if effective["layout"] == "src" else DEFAULT_PROJECT_SLUG
+        main = project.read_file(f"{package}/main.py")
+
+        if effective["concurrency"] != "none":
+            assert "class Pipeline:" in main, "Expected a Pipeline in main.py when concurrency is set"
+            assert "def main(bar: str) -> str:" in main
+            marker = {"asyncio": "asyncio.Queue(", "threads": "queue.Queue(", "processes": "ProcessPoolExecutor("}
+            assert marker[effective["concurrency"]] in main
+            assert project.file_contains("tests/test_pipeline.py", f"from {DEFAULT_PROJECT_SLUG}.main import Pipeline")
+            if effective["benchmarks"] == "y":
+                assert project.file_contains("benchmarks/test_pipeline_throughput.py", "def test_pipeline_throughput(")
+            else:
+                assert not project.has_dir("benchmarks")
+        else:
+            assert "Pipeline" not in main, "Expected the plain main module when concurrency='none'"
+            assert not project.has_file("tests/test_pipeline.py"), "Expected no pipeline tests when concurrency='none'"
+            assert not project.has_file("benchmarks/test_pipeline_throughput.py")
+
+    def check_instrumentation(self, project: VirtualProject, effective: dict[str, str]) -> None:
+        """Verify the metrics module, its tests and the timed main follow the instrumentation option."""
+        package = f"src/{DEFAULT_PROJECT_SLUG}" if effective["layout"] == "src" else DEFAULT_PROJECT_SLUG
+        main = project.read_file(f"{package}/main.py")
+
+        if effective["instrumentation"] == "y":
+            assert project.has_file(f"{package}/instrumentation.py"), "Expected metrics when instrumentation='y'"
+            assert project.has_file("tests/test_instrumentation.py"), "Expected metrics tests when instrumentation='y'"
+            assert re.search(rf"^from {DEFAULT_PROJECT_SLUG}\.instrumentation import .*\btimed\b", main, re.MULTILINE)
+            if effective["concurrency"] == "processes":
+                assert "REGISTRY.merge(metrics)" in main, "Expected the workers' metrics to be merged into the parent's"
+            assert '@timed("main_seconds"' in main, "Expected main to be timed when instrumentation='y'"
+        else:
+            assert not project.has_file(f"{package}/instrumentation.py"), "Expected no metrics module by default"
+            assert not project.has_file("tests/test_instrumentation.py")
+            assert "timed" not in main, "Expected the plain main module when instrumentation='n'"
+
+
+@pytest.mark.parametrize("options", COMBINATIONS)
+def test_snapshot(bake: Callable[..., BakedProject], options: dict[str, str], request: pytest.FixtureRequest) -> None:
+    """Verify the whole generated tree against the golden snapshot for this combination.
+
+    Baking with cookiecutter itself also keeps the in-memory renderer of the structural tests honest.
+    """
+    project = bake(**options)
+    project.assert_matches_snapshot(
+        SNAPSHOT_DIR / f"{request.node.callspec.id}.json",
+        update=request.config.option.update_snapshots,
+    )
@@ -20,6 +20,52 @@ def test_deptry_runs_in_generated_project(bake: BakeFixture) -> None:
     assert result.returncode == 0, f"deptry failed:\n{result.stdout}\n{result.stderr}"
 
 
+def test_benchmarks_run_in_generated_project(bake: BakeFixture) -> None:
+    """Verify the generated benchmark suite runs and compares against a saved baseline."""
+    project = bake(benchmarks="y", layout="flat")
+    project.install()
+    result = project.run("uv run make bench-save")
+    assert result.returncode == 0, f"make bench-save failed:\n{result.stdout}\n{result.stderr}"
+    # The template's main() is a no-op, so only check the comparison runs, not that timings are stable.
+    result = project.run("uv run make bench-compare BENCH_THRESHOLD=1000%")
+    assert result.returncode == 0, f"make bench-compare failed:\n{result.stdout}\n{result.stderr}"
+
+
+def test_profiling_runs_in_generated_project(bake: BakeFixture) -> None:
+    """Verify the generated profiling targets write their reports to .profiles/."""
+    project = bake(profiling="y")
+    project.install()
+    result = project.run("uv run make test")
+    assert result.returncode == 0, f"make test failed:\n{result.stdout}\n{result.stderr}"
+    for target in ("profile", "memprofile"):
+        result = project.run(f"uv run make {target} TARGET=my_project.main")
+        assert result.returncode == 0, f"make {target} failed:\n{result.stdout}\n{result.stderr}"
+    for name in ("cpu.txt", "cpu.collapsed", "memory.txt", "memory.collapsed"):
+        assert project.has_file(f".profiles/{name}"), f"Expected .profiles/{name}"
+
+
+def test_mypyc_wheels_build_in_generated_project(bake: BakeFixture) -> None:
+    """Verify the tests pass against the compiled wheel and the pure-Python build stays available."""
+    project = bake(mypyc="y")
+    project.install()
+    result = project.run("uv run make test-wheel")
+    assert result.returncode == 0, f"make test-wheel failed:\n{result.stdout}\n{result.stderr}"
+    assert "skipped" not in result.stdout, "Expected the compiled-module test to run against the wheel"
+    result = project.run("uv run make build-pure")
+    assert result.returncode == 0, f"make build-pure failed:\n{result.stdout}\n{result.stderr}"
+    assert project.has_file("dist/my_project-0.0.1-py3-none-any.whl"), "Expected a pure-Python wheel"
+
+
+def test_test_scheduling_runs_in_generated_project(bake: BakeFixture) -> None:
+    """Verify the parallel and changed-first test targets pass and record test durations."""
+    project = bake(test_scheduling="y")
+    project.install()
+    for target in ("test-parallel WORKERS=2", "test-fast", "test NUM_SHARDS=2 SHARD_ID=1"):
+        result = project.run(f"uv run make {target}")
+        assert result.returncode == 0, f"make {target} failed:\n{result.stdout}\n{result.stderr}"
+    assert project.has_file(".test-durations.json"), "Expected recorded test durations"
+
+
 @pytest.mark.parametrize(
     "project_name, generated_slug",
     [("my-project", "my_project"), ("MyProject", "myproject"), ("a-b-c-123", "a_b_c_123"), ("a-b", "a_b")],
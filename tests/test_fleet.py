@@ -0,0 +1,155 @@
+"""Test batch generation through the cookiecutter-uv fleet API."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from conftest import BakedProject
+import engine
+from engine import Template
+from fleet import bake_fleet, load_manifest
+from main import main
+from test_combinations import COMBINATIONS, SNAPSHOT_DIR
+
+
+@pytest.fixture(scope="module")
+def template() -> Template:
+    return Template()
+
+
+@pytest.mark.parametrize("options", COMBINATIONS)
+def test_fleet_matches_cookiecutter_output(
+    template: Template, options: dict[str, str], tmp_path: Path, request: pytest.FixtureRequest
+) -> None:
+    """Projects generated by the fleet are identical to the cookiecutter-baked snapshots."""
+    [result] = bake_fleet([options], tmp_path, template=template)
+    assert result.ok, result.error
+    assert result.project_dir is not None
+    project = BakedProject(project_path=result.project_dir, exit_code=0, exception=None, options=options)
+    project.assert_matches_snapshot(SNAPSHOT_DIR / f"{request.node.callspec.id}.json")
+
+
+def test_failures_do_not_abort_batch(template: Template, tmp_path: Path) -> None:
+    contexts = [{"project_name": "first-service"}, {"project_name": "bad_name"}, {"project_name": "second-service"}]
+    results = bake_fleet(contexts, tmp_path, jobs=2, template=template)
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert "FailedHookException" in (results[1].error or "")
+    assert not (tmp_path / "bad_name").exists()
+    assert (tmp_path / "second-service" / "pyproject.toml").is_file()
+
+
+def test_pre_generation_hook_runs_in_process(
+    template: Template, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail(*args: Any, **kwargs: Any) -> None:
+        pytest.fail("The pre-generation hook ran as a subprocess")
+
+    monkeypatch.setattr(engine, "run_script_with_context", fail)
+    results = bake_fleet([{"project_name": "good-service"}, {"project_name": "bad_name"}], tmp_path, template=template)
+
+    assert [result.ok for result in results] == [True, False]
+    assert "FailedHookException" in (results[1].error or "")
+
+
+def test_cli_reports_a_bad_manifest(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (tmp_path / "fleet.json").write_text("{not json")
+    (tmp_path / "fleet.yaml").write_text("")
+    (tmp_path / "empty.json").write_text("[]")
+    (tmp_path / "not.bundle").write_bytes(b"not a bundle")
+
+    assert main(["fleet", str(tmp_path / "fleet.json"), "-o", str(tmp_path)]) == 1
+    assert main(["fleet", str(tmp_path / "fleet.yaml"), "-o", str(tmp_path)]) == 1
+    assert main(["fleet", str(tmp_path / "missing.toml"), "-o", str(tmp_path)]) == 1
+    assert main(["fleet", str(tmp_path / "empty.json"), "--bundle", str(tmp_path / "not.bundle")]) == 1
+    errors = capsys.readouterr().err.splitlines()
+    assert [error.split(":")[0] for error in errors] == [
+        "JSONDecodeError",
+        "ValueError",
+        "FileNotFoundError",
+        "BundleError",
+    ]
+
+
+def test_existing_project_is_reported(template: Template, tmp_path: Path) -> None:
+    (tmp_path / "taken").mkdir()
+    [result] = bake_fleet([{"project_name": "taken"}], tmp_path, template=template)
+    assert "OutputDirExistsException" in (result.error or "")
+
+
+def test_manifest_formats(tmp_path: Path) -> None:
+    expected = [
+        {"author": "Platform Team", "project_name": "svc-a"},
+        {"author": "Platform Team", "project_name": "svc-b", "layout": "flat"},
+    ]
+    (tmp_path / "fleet.json").write_text(
+        json.dumps({"defaults": {"author": "Platform Team"}, "projects": [{"project_name": "svc-a"}, expected[1]]})
+    )
+    (tmp_path / "fleet.toml").write_text(
+        '[defaults]\nauthor = "Platform Team"\n\n'
+        '[[projects]]\nproject_name = "svc-a"\n\n'
+        '[[projects]]\nproject_name = "svc-b"\nlayout = "flat"\n'
+    )
+    (tmp_path / "fleet.csv").write_text("author,project_name,layout\nPlatform Team,svc-a,\nPlatform Team,svc-b,flat\n")
+
+    for name in ("fleet.json", "fleet.toml", "fleet.csv"):
+        assert load_manifest(tmp_path / name) == expected, name
+
+
+class RecordingTemplate:
+    """Stand-in for a parsed Jinja template that logs which template files get rendered."""
+
+    def __init__(self, path: str, wrapped: Any, log: list[str]) -> None:
+        self.path, self.wrapped, self.log = path, wrapped, log
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        self.log.append(self.path)
+        return self.wrapped.render(*args, **kwargs)
+
+
+def test_excluded_paths_are_never_rendered(template: Template, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The manifest is applied before rendering, so excluded template files are not even rendered."""
+    rendered: list[str] = []
+    recording = {path: RecordingTemplate(path, t, rendered) for path, t in template._templates.items()}
+    monkeypatch.setattr(template, "_templates", recording)
+
+    context = template.context({"zensical": "n", "include_github_actions": "n", "layout": "src"})
+    files = {f.path for f in template.render_files(context)}
+
+    assert not [path for path in rendered if path.startswith((".github/", "docs/", "LICENSE_B", "LICENSE_I"))]
+    assert "zensical.toml" not in rendered
+    assert {"LICENSE", "src/my_project/main.py", "pyproject.toml"} <= files
+    assert "my_project/main.py" not in files
+
+
+def test_dry_run_renders_the_generated_tree_in_memory(
+    template: Template, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A dry run holds exactly the files ``generate`` writes, and answers queries without touching the disk."""
+    options = {"layout": "src", "include_github_actions": "y", "zensical": "n"}
+    project_dir = template.generate(options, tmp_path)
+    on_disk = {
+        path.relative_to(project_dir).as_posix(): path.read_bytes() for path in project_dir.rglob("*") if path.is_file()
+    }
+
+    def fail(*args: Any, **kwargs: Any) -> None:
+        pytest.fail("A dry run wrote to the disk")
+
+    monkeypatch.setattr(Path, "write_bytes", fail)
+    monkeypatch.setattr(Path, "mkdir", fail)
+    project = template.dry_run(options)
+    monkeypatch.undo()
+
+    assert project.name == project_dir.name
+    assert project.files == on_disk
+    assert project.has_file("src/my_project/main.py")
+    assert project.has_dir("src/my_project")
+    assert project.has_dir("src/")
+    assert not project.has_dir("my_project")
+    assert not project.has_dir("docs")
+    assert project.file_contains("pyproject.toml", 'name = "my-project"')
+    assert project.is_valid_yaml(".github/workflows/ci.yml")
+    assert not project.is_valid_yaml("missing.yml")
+    with pytest.raises(FileNotFoundError):
+        project.read_file("missing.txt")
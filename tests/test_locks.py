@@ -0,0 +1,82 @@
+"""Test the pre-resolved lockfiles that generated projects ship with."""
+
+import json
+import shutil
+import tomllib
+from pathlib import Path
+from typing import Any
+
+import jinja2
+import pytest
+from cookiecutter.main import cookiecutter
+from engine import INCLUDE_DIR, TEMPLATE_ROOT, Template
+from locks import LOCK_DIR, check_locks, dependency_options, lock_sets, refresh_locks
+
+PROJECT_TEMPLATE = "{{cookiecutter.project_name}}"
+
+
+@pytest.fixture(scope="module")
+def template() -> Template:
+    return Template()
+
+
+def test_dependency_options(template: Template) -> None:
+    assert dependency_options(template) == ["deptry", "zensical", "benchmarks", "mypyc"]
+
+
+def test_lockfiles_are_up_to_date(template: Template) -> None:
+    """Every dependency set has a current lockfile and a manifest entry; run `make locks` if not."""
+    assert check_locks(template) == []
+
+
+def test_each_combination_gets_the_lockfile_of_its_dependency_set(template: Template) -> None:
+    for lock_set in lock_sets(template):
+        for when in lock_set.when:
+            project = template.dry_run({**when, "project_name": "My--Service"})
+            assert not project.has_dir(LOCK_DIR)
+            lock = tomllib.loads(project.read_file("uv.lock"))
+            [root] = [package for package in lock["package"] if package.get("source") == {"editable": "."}]
+            assert root["name"] == "my-service"
+            dev = tomllib.loads(project.read_file("pyproject.toml"))["dependency-groups"]["dev"]
+            assert len(root["metadata"]["requires-dev"]["dev"]) == len(dev), lock_set.path
+
+
+def test_cookiecutter_renders_only_the_selected_lockfile(
+    template: Template, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Plain cookiecutter includes the same lockfile as the engine, and renders no other."""
+    options = {"deptry": "n", "zensical": "n", "benchmarks": "y", "mypyc": "n"}
+    loaded: list[str] = []
+    get_template = jinja2.Environment.get_template
+
+    def recording_get_template(self: jinja2.Environment, name: str, *args: Any, **kwargs: Any) -> jinja2.Template:
+        loaded.append(str(name))
+        return get_template(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(jinja2.Environment, "get_template", recording_get_template)
+    project = Path(cookiecutter(str(TEMPLATE_ROOT), no_input=True, output_dir=str(tmp_path), extra_context=options))
+
+    assert [name for name in loaded if name.startswith(LOCK_DIR)] == [f"{LOCK_DIR}/benchmarks.lock"]
+    assert (project / "uv.lock").read_text() == template.dry_run(options).read_file("uv.lock")
+
+
+def test_refresh_rewrites_manifest_entries_and_drops_stale_lockfiles(tmp_path: Path) -> None:
+    root = tmp_path / "template"
+    root.mkdir()
+    shutil.copy(TEMPLATE_ROOT / "cookiecutter.json", root)
+    shutil.copy(TEMPLATE_ROOT / "local_extensions.py", root)
+    shutil.copytree(TEMPLATE_ROOT / PROJECT_TEMPLATE, root / PROJECT_TEMPLATE)
+    shutil.copytree(TEMPLATE_ROOT / INCLUDE_DIR, root / INCLUDE_DIR)
+    config = json.loads((root / "cookiecutter.json").read_text())
+    config["_manifest"] = [entry for entry in config["_manifest"] if "lockfile" not in entry]
+    (root / "cookiecutter.json").write_text(json.dumps(config, indent=2) + "\n")
+    (root / INCLUDE_DIR / LOCK_DIR / "retired.lock").write_text("")
+    template = Template(root)
+    assert len(check_locks(template)) == 2
+
+    # The lockfiles are current, so uv only validates them and this needs no network access.
+    refresh_locks(template)
+
+    assert (root / "cookiecutter.json").read_text() == (TEMPLATE_ROOT / "cookiecutter.json").read_text()
+    assert not (root / INCLUDE_DIR / LOCK_DIR / "retired.lock").exists()
+    assert check_locks(Template(root)) == []
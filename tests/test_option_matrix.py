@@ -0,0 +1,45 @@
+"""Test the option matrix generator."""
+
+import itertools
+import math
+
+import pytest
+from option_matrix import covering_array, matrix_id, option_choices, option_matrix
+from test_combinations import COOKIECUTTER_CONFIG
+
+CHOICES = option_choices(COOKIECUTTER_CONFIG)
+
+
+def test_choices_come_from_cookiecutter_json() -> None:
+    assert CHOICES["layout"] == ["src", "flat"]
+    assert len(CHOICES["open_source_license"]) == 6
+    assert not any(name.startswith("_") for name in CHOICES)
+    assert "project_name" not in CHOICES
+
+
+def test_full_matrix_is_every_combination() -> None:
+    matrix = option_matrix(COOKIECUTTER_CONFIG, "full")
+    assert len(matrix) == math.prod(len(values) for values in CHOICES.values())
+    assert len({tuple(options.values()) for options in matrix}) == len(matrix)
+
+
+@pytest.mark.parametrize("strength", [1, 2, 3])
+def test_covering_array_covers_every_combination(strength: int) -> None:
+    rows = covering_array(CHOICES, strength)
+    for group in itertools.combinations(CHOICES, strength):
+        covered = {tuple(row[name] for name in group) for row in rows}
+        assert covered == set(itertools.product(*(CHOICES[name] for name in group))), group
+    assert all(list(row) == list(CHOICES) for row in rows)
+
+
+def test_pairwise_is_small_and_stable() -> None:
+    pairwise = option_matrix(COOKIECUTTER_CONFIG)
+    # Every license must be paired with each concurrency model: at least 6 * 4 rows.
+    assert 24 <= len(pairwise) <= 30
+    assert pairwise == option_matrix(COOKIECUTTER_CONFIG, "2-wise")
+    assert len({matrix_id(options) for options in pairwise}) == len(pairwise)
+
+
+def test_unknown_mode() -> None:
+    with pytest.raises(ValueError, match="Unknown option matrix"):
+        option_matrix(COOKIECUTTER_CONFIG, "triplewise")
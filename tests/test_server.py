@@ -0,0 +1,204 @@
+"""Test the scaffolding server: in-process validation, tar responses, queueing and statistics."""
+
+import ast
+import http.client
+import io
+import json
+import socket
+import stat
+import tarfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+from cookiecutter.exceptions import FailedHookException
+from engine import TEMPLATE_ROOT, Template
+from server import (
+    PROJECT_NAME_REGEX,
+    PROJECT_SLUG_REGEX,
+    InvalidProjectError,
+    Scaffolder,
+    ScaffoldHTTPServer,
+    ScaffoldUnixServer,
+    make_server,
+    validate,
+)
+
+
+@pytest.fixture(scope="module")
+def template() -> Template:
+    return Template()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost", timeout=30)
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@contextmanager
+def serving(scaffolder: Scaffolder, address: str | tuple[str, int] = ("127.0.0.1", 0)) -> Iterator[Any]:
+    server = make_server(scaffolder, address)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def request(
+    server: ScaffoldHTTPServer | ScaffoldUnixServer, method: str, path: str, body: bytes | None = None
+) -> tuple[int, http.client.HTTPResponse, bytes]:
+    if isinstance(server, ScaffoldUnixServer):
+        connection: http.client.HTTPConnection = UnixHTTPConnection(server.path)
+    else:
+        host, port = server.server_address[:2]
+        connection = http.client.HTTPConnection(str(host), int(port), timeout=30)
+    with closing(connection):
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, response, response.read()
+
+
+def post(
+    server: ScaffoldHTTPServer | ScaffoldUnixServer, options: object
+) -> tuple[int, http.client.HTTPResponse, bytes]:
+    return request(server, "POST", "/projects", json.dumps(options).encode())
+
+
+def stats(server: ScaffoldHTTPServer | ScaffoldUnixServer) -> dict[str, Any]:
+    return json.loads(request(server, "GET", "/stats")[2])
+
+
+def untar(archive: bytes) -> dict[str, tuple[bytes, int]]:
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        for member in tar.getmembers():
+            content = tar.extractfile(member)
+            assert content is not None, member.name
+            files[member.name] = (content.read(), member.mode)
+    return files
+
+
+def test_validation_matches_the_pre_gen_hook(template: Template, tmp_path: Path) -> None:
+    """The server accepts exactly the project names and slugs the pre-generation hook accepts."""
+    hook = ast.parse((TEMPLATE_ROOT / "hooks" / "pre_gen_project.py").read_text())
+    regexes = {
+        target.id: node.value.value
+        for node in hook.body
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+        for target in node.targets
+        if isinstance(target, ast.Name) and target.id.endswith("_REGEX")
+    }
+    assert regexes == {"PROJECT_NAME_REGEX": PROJECT_NAME_REGEX, "PROJECT_SLUG_REGEX": PROJECT_SLUG_REGEX}
+
+    cases = [
+        {"project_name": "my-service"},
+        {"project_name": "MyService2"},
+        {"project_name": "bad_name"},
+        {"project_name": "2fast"},
+        {"project_name": "x"},
+        {"project_name": "my-service", "project_slug": "my-service"},
+        {"project_name": "my-service", "project_slug": "_private"},
+    ]
+    for i, options in enumerate(cases):
+        try:
+            validate(template.context(options)["cookiecutter"])
+            accepted = True
+        except InvalidProjectError:
+            accepted = False
+        try:
+            template.generate(options, tmp_path / str(i))
+            hook_accepted = True
+        except FailedHookException:
+            hook_accepted = False
+        assert accepted == hook_accepted, options
+
+
+def test_generated_archive_matches_the_rendered_project(template: Template) -> None:
+    options = {"project_name": "billing-service", "layout": "flat", "instrumentation": "y"}
+    with serving(Scaffolder(template)) as server:
+        status, response, body = post(server, options)
+
+    assert status == 200
+    assert response.getheader("Content-Type") == "application/x-tar"
+    assert response.getheader("X-Project-Name") == "billing-service"
+    rendered = template.render_files(template.context(options))
+    assert untar(body) == {f"billing-service/{f.path}": (f.content, stat.S_IMODE(f.mode)) for f in rendered}
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+def test_serves_on_a_unix_socket(template: Template, tmp_path: Path) -> None:
+    address = str(tmp_path / "scaffold.sock")
+    with serving(Scaffolder(template), address) as server:
+        status, _, body = post(server, {})
+        assert status == 200
+        assert "my-project/pyproject.toml" in untar(body)
+        assert stats(server)["generated"] == 1
+    assert not Path(address).exists()
+
+
+def test_rejected_requests(template: Template) -> None:
+    with serving(Scaffolder(template)) as server:
+        status, _, body = post(server, {"project_name": "bad_name"})
+        assert status == 400
+        assert "not a valid Python module name" in json.loads(body)["error"]
+        assert post(server, {"layout": "nested"})[0] == 400
+        assert post(server, ["project_name"])[0] == 400
+        assert post(server, {"benchmarks": True})[0] == 400
+        assert request(server, "POST", "/projects", b"{not json")[0] == 400
+        assert request(server, "GET", "/projects")[0] == 404
+
+        counts = stats(server)
+    assert (counts["generated"], counts["rejected"], counts["failed"]) == (0, 2, 0)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def test_requests_queue_for_a_render_slot(template: Template, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Requests beyond the free render slots wait in the queue, and beyond the queue get 503."""
+    release = threading.Event()
+    render_files = template.render_files
+
+    def blocking_render_files(context: dict[str, Any]) -> Any:
+        release.wait(10)
+        return render_files(context)
+
+    monkeypatch.setattr(template, "render_files", blocking_render_files)
+    with serving(Scaffolder(template, jobs=1, max_queue=1)) as server:
+        statuses: list[int] = []
+        clients = [threading.Thread(target=lambda: statuses.append(post(server, {})[0])) for _ in range(2)]
+        for client in clients:
+            client.start()
+        wait_for(lambda: stats(server).items() >= {"active": 1, "queued": 1}.items())
+
+        status, response, _ = post(server, {})
+        assert status == 503
+        assert response.getheader("Retry-After") == "1"
+
+        release.set()
+        for client in clients:
+            client.join()
+        after = stats(server)
+
+    assert statuses == [200, 200]
+    assert (after["generated"], after["busy"], after["active"], after["queued"]) == (2, 1, 0, 0)
+    latency = after["latency_ms"]
+    assert latency["window"] == 2
+    assert 0 < latency["p50"] <= latency["p95"] <= latency["max"]
@@ -0,0 +1,113 @@
+"""Shared uv and prek caches that let baked projects install without network access.
+
+The first project that installs or runs its checks warms a cache directory, keyed by the template's
+dependency pins and pre-resolved lockfiles: it syncs one project of every dependency set the
+template can produce (the sets of cookiecutter-uv/locks.py) into a private uv cache (the wheelhouse)
+and installs the prek hook environments into a private ``PREK_HOME``. Every later command runs with ``UV_OFFLINE`` against those caches, either installing
+each project's ``.venv`` through hardlinks into the cache or, in ``shared-venv`` mode, re-syncing a
+single environment per worker through ``UV_PROJECT_ENVIRONMENT``.
+
+A warmed directory is complete once it contains a ``.ready`` marker, so it can be restored from a
+CI cache and reused on hosts without network access.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import re
+import shlex
+import shutil
+import subprocess
+from pathlib import Path
+
+from bakery import ProjectStore, file_lock
+from engine import Template
+from locks import lock_path, lock_sets
+
+MODES = ("off", "hardlink", "shared-venv")
+
+WARM_COMMANDS = ("git init", "git add .", "uv sync", "uv run prek install-hooks")
+
+REQUIREMENT = re.compile(r'"([A-Za-z0-9][A-Za-z0-9._-]*(?:\[[^\]]*\])?\s*(?:===|[<>=!~]=?)[^"]*)"')
+HOOK_REPO = re.compile(r'^(?:repo|rev) = "([^"]+)"', re.MULTILINE)
+
+
+def dependency_pins(template: Path) -> list[str]:
+    """Return every requirement of the template's pyproject.toml and every hook repo and rev of its prek.toml."""
+    project = template / "{{cookiecutter.project_name}}"
+    pins = REQUIREMENT.findall((project / "pyproject.toml").read_text())
+    pins += HOOK_REPO.findall((project / "prek.toml").read_text())
+    return pins
+
+
+def warm_option_sets(template: Path) -> list[dict[str, str]]:
+    """Return one option set per dependency set, so that together they install every locked package."""
+    return [lock_set.when[0] for lock_set in lock_sets(Template(template))]
+
+
+def lockfiles_digest(template: Path) -> str:
+    """Hash the template's pre-resolved lockfiles, whose pins are the packages a warmed cache must hold."""
+    loaded = Template(template)
+    digest = hashlib.sha256()
+    for lock_set in lock_sets(loaded):
+        digest.update(lock_path(loaded, lock_set).read_bytes())
+    return digest.hexdigest()
+
+
+class WarmCache:
+    """A cache directory holding the uv cache, prek home and shared venvs for one set of dependency pins."""
+
+    def __init__(self, root: Path, store: ProjectStore, mode: str = "hardlink") -> None:
+        uv_version = subprocess.run(["uv", "--version"], capture_output=True, text=True, check=True).stdout
+        template = Path(store.template)
+        payload = json.dumps(
+            [dependency_pins(template), lockfiles_digest(template), uv_version, platform.system(), platform.machine()]
+        )
+        self.key = hashlib.sha256(payload.encode()).hexdigest()[:24]
+        self.root = root / self.key
+        self.store = store
+        self.mode = mode
+
+    @property
+    def ready(self) -> bool:
+        return (self.root / ".ready").is_file()
+
+    def env(self, offline: bool = True) -> dict[str, str]:
+        """Environment variables that point uv and prek at the shared caches."""
+        env = {
+            "UV_CACHE_DIR": str(self.root / "uv"),
+            "UV_LINK_MODE": "hardlink",
+            "PREK_HOME": str(self.root / "prek"),
+        }
+        if offline:
+            env["UV_OFFLINE"] = "1"
+        if self.mode == "shared-venv":
+            # Projects re-point the environment's editable install on sync, so workers can't share one.
+            worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+            env["UV_PROJECT_ENVIRONMENT"] = str(self.root / f"venv-{worker}")
+        return env
+
+    def ensure_warm(self) -> None:
+        """Fill the caches from the network unless a previous run (or process) already has."""
+        if self.ready:
+            return
+        with file_lock(self.root / ".lock"):
+            if self.ready:
+                return
+            env = {k: v for k, v in os.environ.items() if k not in ("VIRTUAL_ENV", "UV_OFFLINE")}
+            env.update(self.env(offline=False))
+            env.pop("UV_PROJECT_ENVIRONMENT", None)
+            workspace = self.root / "workspace"
+            for options in warm_option_sets(Path(self.store.template)):
+                shutil.rmtree(workspace, ignore_errors=True)
+                shutil.copytree(self.store.bake(options), workspace)
+                for command in WARM_COMMANDS:
+                    result = subprocess.run(
+                        shlex.split(command), cwd=workspace, capture_output=True, text=True, env=env
+                    )
+                    if result.returncode != 0:
+                        msg = f"Warming {self.root} for {options} failed at '{command}':\n{result.stdout}\n{result.stderr}"
+                        raise RuntimeError(msg)
+            shutil.rmtree(workspace)
+            (self.root / ".ready").write_text("\n".join(dependency_pins(Path(self.store.template))) + "\n")
@@ -0,0 +1,10 @@
+"""Benchmarks for {{cookiecutter.project_name}}."""
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from {{cookiecutter.project_slug}}.main import main
+
+
+def test_main(benchmark: BenchmarkFixture) -> None:
+    """Benchmark `main` with a representative input."""
+    assert benchmark(main, "bar") == "bar"
@@ -0,0 +1,23 @@
+"""Throughput benchmark for the worker pipeline of {{cookiecutter.project_name}}."""
+
+{% if cookiecutter.concurrency == "asyncio" -%}
+import asyncio
+
+{% endif -%}
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from {{cookiecutter.project_slug}}.main import run
+
+ITEMS = [str(i) for i in range(100_000)]
+
+
+def test_pipeline_throughput(benchmark: BenchmarkFixture) -> None:
+    """Push `ITEMS` through `run`, pipeline start-up and shutdown included; items per second go in extra_info."""
+{%- if cookiecutter.concurrency == "asyncio" %}
+    results = benchmark.pedantic(lambda: asyncio.run(run(ITEMS)), rounds=5, warmup_rounds=1)
+{%- else %}
+    results = benchmark.pedantic(run, args=(ITEMS,), rounds=5, warmup_rounds=1)
+{%- endif %}
+    assert len(results) == len(ITEMS)
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        benchmark.extra_info["items_per_second"] = round(len(ITEMS) / benchmark.stats.stats.mean)
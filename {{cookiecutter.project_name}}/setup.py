@@ -0,0 +1,41 @@
+"""Build {{cookiecutter.project_name}}, compiling its modules to C extensions with mypyc.
+
+The project metadata lives in pyproject.toml; this file only adds the compiled modules. Wheels fall
+back to the pure-Python package when:
+
+- ``PURE_PYTHON=1`` is set (``make build-pure``),
+- the build is an editable install (``uv sync``), so the tests and debugger see the source, or
+- no C compiler is available: the extensions are optional, so a failed compile only drops them.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from setuptools import setup
+
+{% if cookiecutter.layout == "src" -%}
+PACKAGE_DIR = Path("src") / "{{cookiecutter.project_slug}}"
+{%- else -%}
+PACKAGE_DIR = Path("{{cookiecutter.project_slug}}")
+{%- endif %}
+# The lazy package entry point rewrites its own globals and the profiler inspects live frames,
+# which compiled modules don't support; both stay interpreted.
+PURE_MODULES = {"__init__.py", "profiling.py"}
+
+
+def compiled_modules() -> list:
+    """Return the mypyc extensions for every module of the package, or none for a pure build."""
+    if os.environ.get("PURE_PYTHON") or "editable_wheel" in sys.argv:
+        return []
+
+    from mypyc.build import mypycify
+
+    sources = [str(path) for path in sorted(PACKAGE_DIR.rglob("*.py")) if path.name not in PURE_MODULES]
+    extensions = mypycify(sources, opt_level="3")
+    for extension in extensions:
+        extension.optional = True
+    return extensions
+
+
+setup(ext_modules=compiled_modules())
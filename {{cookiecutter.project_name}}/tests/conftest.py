@@ -0,0 +1,309 @@
+"""Duration-aware scheduling for the {{cookiecutter.project_name}} test suite.
+
+Every run records how long each test took (setup, call and teardown) in ``.test-durations.json``,
+and those durations split the suite into shards of about equal length:
+
+- ``--num-shards N --shard-id I`` runs one of N shards, e.g. one per CI job (``make test``).
+- ``--workers N`` (or ``auto``, one per CPU) runs the selected tests in N local processes, one shard
+  each, and reports their results as a single session (``make test-parallel``).
+- ``--changed-first`` runs the tests that failed last time first, then the tests affected by
+  uncommitted changes, then the rest (``make test-fast``).
+
+Tests without a recorded duration are assumed to take the average of the known durations.
+"""
+
+import ast
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+DURATIONS_FILE = ".test-durations.json"
+# A change to any of these files may affect every test.
+GLOBAL_INPUTS = {"conftest.py", "pyproject.toml", "uv.lock"}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the scheduling options."""
+    group = parser.getgroup("scheduling", "duration-aware test scheduling")
+    group.addoption(
+        "--durations-file",
+        default=DURATIONS_FILE,
+        help="recorded test durations, relative to the root directory (default: %(default)s)",
+    )
+    group.addoption(
+        "--num-shards", type=int, default=1, help="split the tests into this many shards of about equal duration"
+    )
+    group.addoption("--shard-id", type=int, default=0, help="run the shard with this index, from 0 to --num-shards - 1")
+    group.addoption(
+        "--workers", default="1", help="run the selected tests in this many local processes, or 'auto' for one per CPU"
+    )
+    group.addoption(
+        "--changed-first",
+        action="store_true",
+        help="run the last failed tests, then the tests affected by uncommitted changes, first",
+    )
+    group.addoption("--worker-reports", help="internal: file a --workers process reads this worker's reports from")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Validate the scheduling options and register the scheduler."""
+    workers = config.getoption("workers")
+    try:
+        workers = (os.cpu_count() or 1) if workers == "auto" else int(workers)
+    except ValueError:
+        msg = f"--workers must be a number or 'auto', not {workers!r}"
+        raise pytest.UsageError(msg) from None
+    num_shards, shard_id = config.getoption("num_shards"), config.getoption("shard_id")
+    if workers < 1 or num_shards < 1 or not 0 <= shard_id < num_shards:
+        msg = "--workers and --num-shards must be at least 1, and --shard-id below --num-shards"
+        raise pytest.UsageError(msg)
+    config.pluginmanager.register(DurationScheduler(config, workers), "duration-scheduler")
+
+
+def load_durations(path: Path) -> dict[str, float]:
+    """Read recorded durations, or none if the file is missing or unreadable."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def store_durations(path: Path, durations: dict[str, float], root: Path) -> None:
+    """Merge ``durations`` into the file at ``path``, dropping the tests of files that no longer exist."""
+    merged = {**load_durations(path), **durations}
+    merged = {
+        nodeid: round(seconds, 4) for nodeid, seconds in merged.items() if (root / nodeid.split("::")[0]).exists()
+    }
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+    tmp.replace(path)
+
+
+def estimated_durations(nodeids: list[str], recorded: dict[str, float]) -> dict[str, float]:
+    """Return the recorded duration of each test, or the average recorded duration for new tests."""
+    known = [recorded[nodeid] for nodeid in nodeids if nodeid in recorded]
+    default = sum(known) / len(known) if known else 1.0
+    return {nodeid: recorded.get(nodeid, default) for nodeid in nodeids}
+
+
+def pack_shards(durations: dict[str, float], num_shards: int) -> list[list[str]]:
+    """Split test ids into ``num_shards`` shards of about equal total duration.
+
+    Longest processing time first: every test, longest first, goes to the shard with the smallest total
+    so far. The longest shard then takes at most 4/3 of the shortest possible time.
+    """
+    shards: list[list[str]] = [[] for _ in range(num_shards)]
+    totals = [(0.0, index) for index in range(num_shards)]
+    for nodeid in sorted(durations, key=durations.__getitem__, reverse=True):
+        total, index = heapq.heappop(totals)
+        shards[index].append(nodeid)
+        heapq.heappush(totals, (total + durations[nodeid], index))
+    return shards
+
+
+def changed_paths(root: Path) -> set[Path]:
+    """Return the files under ``root`` that differ from the last commit, including untracked ones."""
+    commands = (
+        ["git", "diff", "--name-only", "--relative", "HEAD"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    )
+    changed = set()
+    for command in commands:
+        result = subprocess.run(command, cwd=root, capture_output=True, text=True)  # noqa: S603
+        if result.returncode == 0:
+            changed.update(root / line for line in result.stdout.splitlines())
+    return changed
+
+
+def module_name(path: Path) -> str | None:
+    """Return the dotted module name of a Python file, following the ``__init__.py`` files above it."""
+    if path.suffix != ".py":
+        return None
+    parts = [] if path.stem == "__init__" else [path.stem]
+    parent = path.parent
+    while (parent / "__init__.py").exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    return ".".join(parts) or None
+
+
+def imported_modules(path: Path) -> set[str]:
+    """Return the modules a Python file imports, counting ``from a import b`` as both ``a`` and ``a.b``."""
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module)
+            modules.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return modules
+
+
+def _related(a: str, b: str) -> bool:
+    return a == b or a.startswith(f"{b}.") or b.startswith(f"{a}.")
+
+
+class Worker:
+    """A pytest process that runs one shard and writes its test reports to a file."""
+
+    def __init__(self, config: pytest.Config, shard_id: int, num_shards: int, directory: Path) -> None:
+        """Start the process for shard ``shard_id``, keeping its reports and output in ``directory``."""
+        self.shard_id = shard_id
+        self.reports = directory / f"shard-{shard_id}.jsonl"
+        self.reports.touch()
+        self.output = directory / f"shard-{shard_id}.log"
+        self._offset = 0
+        command = [
+            sys.executable,
+            "-m",
+            "pytest",
+            *config.invocation_params.args,
+            "--workers=1",
+            f"--num-shards={num_shards}",
+            f"--shard-id={shard_id}",
+            f"--worker-reports={self.reports}",
+        ]
+        with self.output.open("w") as output:
+            self.process = subprocess.Popen(  # noqa: S603
+                command, cwd=config.invocation_params.dir, stdout=output, stderr=subprocess.STDOUT
+            )
+
+    def new_reports(self) -> list[dict[str, Any]]:
+        """Return the reports written since the last call."""
+        with self.reports.open("rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        return [json.loads(line) for line in complete.splitlines()]
+
+
+class DurationScheduler:
+    """Records test durations and uses them to select, order and distribute the tests."""
+
+    def __init__(self, config: pytest.Config, workers: int) -> None:
+        """Load the recorded durations for a session running in ``workers`` processes."""
+        self.config = config
+        self.workers = workers
+        self.path = config.rootpath / config.getoption("durations_file")
+        self.recorded = load_durations(self.path)
+        self.durations: defaultdict[str, float] = defaultdict(float)
+        worker_reports = config.getoption("worker_reports")
+        self.worker_reports = Path(worker_reports) if worker_reports else None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: pytest.Config, items: list[pytest.Item]) -> None:
+        """Keep the shards of this session, then put failed and affected tests first if asked to."""
+        # A session with N workers runs N consecutive shards of num_shards * N, one per worker.
+        num_shards = config.getoption("num_shards") * self.workers
+        if num_shards > 1:
+            first = config.getoption("shard_id") * self.workers
+            shards = pack_shards(estimated_durations([item.nodeid for item in items], self.recorded), num_shards)
+            selected = {nodeid for shard in shards[first : first + self.workers] for nodeid in shard}
+            config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+            items[:] = [item for item in items if item.nodeid in selected]
+        if config.getoption("changed_first"):
+            items[:] = self.changed_first(items)
+
+    def changed_first(self, items: list[pytest.Item]) -> list[pytest.Item]:
+        """Order the last failed tests first, then the tests affected by uncommitted changes."""
+        has_cache = self.config.pluginmanager.has_plugin("cacheprovider")
+        lastfailed = self.config.cache.get("cache/lastfailed", {}) if has_cache else {}
+        changed = changed_paths(self.config.rootpath)
+        changes_everything = any(path.name in GLOBAL_INPUTS for path in changed)
+        changed_modules = {name for path in changed if (name := module_name(path))}
+        imports: dict[Path, set[str]] = {}
+
+        def rank(item: pytest.Item) -> int:
+            if item.nodeid in lastfailed:
+                return 0
+            if changes_everything or item.path in changed:
+                return 1
+            if item.path not in imports:
+                imports[item.path] = imported_modules(item.path)
+            return 1 if any(_related(a, b) for a in imports[item.path] for b in changed_modules) else 2
+
+        return sorted(items, key=rank)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session: pytest.Session) -> bool | None:
+        """Run the tests in worker processes when there is more than one worker."""
+        if self.workers == 1 or session.config.option.collectonly or not session.items:
+            return None
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            # Let pytest's own loop report the collection errors.
+            return None
+        self.run_workers(session)
+        return True
+
+    def run_workers(self, session: pytest.Session) -> None:
+        """Run one worker per shard and replay their reports in this session as they arrive."""
+        config = session.config
+        num_shards = config.getoption("num_shards") * self.workers
+        first = config.getoption("shard_id") * self.workers
+        with tempfile.TemporaryDirectory() as directory:
+            workers = [
+                Worker(config, shard, num_shards, Path(directory)) for shard in range(first, first + self.workers)
+            ]
+            running = list(workers)
+            while running:
+                for worker in list(running):
+                    exited = worker.process.poll() is not None
+                    for data in worker.new_reports():
+                        self.replay(data)
+                    if exited:
+                        running.remove(worker)
+                time.sleep(0.05)
+
+            crashed = [
+                worker
+                for worker in workers
+                if worker.process.returncode
+                not in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED, pytest.ExitCode.NO_TESTS_COLLECTED)
+            ]
+            terminal = config.pluginmanager.get_plugin("terminalreporter")
+            for worker in crashed:
+                if terminal:
+                    terminal.write_sep(
+                        "=", f"worker for shard {worker.shard_id} exited with {worker.process.returncode}"
+                    )
+                    terminal.write(worker.output.read_text())
+            if crashed:
+                msg = f"{len(crashed)} worker(s) did not finish their tests"
+                raise session.Failed(msg)
+
+    def replay(self, data: dict[str, Any]) -> None:
+        """Report a worker's test report as if the test ran in this process."""
+        hook = self.config.hook
+        report = hook.pytest_report_from_serializable(config=self.config, data=data)
+        if report.when == "setup":
+            hook.pytest_runtest_logstart(nodeid=report.nodeid, location=report.location)
+        hook.pytest_runtest_logreport(report=report)
+        if report.when == "teardown":
+            hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=report.location)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Add up each test's phases, and pass the report on when running as a worker."""
+        self.durations[report.nodeid] += report.duration
+        if self.worker_reports:
+            data = self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+            with self.worker_reports.open("a") as f:
+                f.write(json.dumps(data) + "\n")
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Store the durations of this session; workers leave that to the process they report to."""
+        if self.durations and not self.worker_reports:
+            store_durations(self.path, self.durations, session.config.rootpath)
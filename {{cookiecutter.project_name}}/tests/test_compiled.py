@@ -0,0 +1,19 @@
+"""Checks that the wheel built by `make build` ships {{cookiecutter.project_name}} compiled with mypyc."""
+
+import importlib
+import importlib.machinery
+import os
+
+import pytest
+
+# Set by `make test-wheel`, which runs the whole suite against the built wheel instead of the editable install.
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("EXPECT_COMPILED"), reason="only runs against the compiled wheel (make test-wheel)"
+)
+
+
+@pytest.mark.parametrize("module", ["{{cookiecutter.project_slug}}.main"])
+def test_module_is_compiled(module: str) -> None:
+    """The module was loaded from a C extension, not from its Python source."""
+    path = importlib.import_module(module).__file__ or ""
+    assert path.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)), f"{module} imported from {path}"
@@ -1,5 +1,5 @@
 """Tests for {{cookiecutter.project_name}}."""
 
-def example_test():
+def test_example():
     """Validate the test runner setup."""
     assert 1 == 1
@@ -0,0 +1,56 @@
+"""Import-time budget and lazy exports of {{cookiecutter.project_name}}."""
+
+import os
+import subprocess
+import sys
+
+import {{cookiecutter.project_slug}}
+
+# Budget for a cold `import {{cookiecutter.project_slug}}`, as a multiple of a cold import of BASELINE_MODULE measured the same
+# way, so that it holds on slow and busy machines alike. Overridable via IMPORT_TIME_BUDGET.
+BASELINE_MODULE = "json"
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "10"))
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Run ``code`` in a fresh interpreter, so that nothing is imported yet."""
+    command = [sys.executable, *options, "-c", code]
+    return subprocess.run(command, capture_output=True, text=True, check=True)  # noqa: S603
+
+
+def cold_import_ms(module: str, runs: int = 3) -> float:
+    """Return the best cumulative `python -X importtime` measurement of ``module`` over ``runs`` runs."""
+    timings = []
+    for _ in range(runs):
+        stderr = run_python(f"import {module}", "-X", "importtime").stderr
+        # Lines read "import time: <self us> | <cumulative us> | <indented module name>".
+        for line in stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative, name = line.split("|")
+            if name.strip() == module:
+                timings.append(int(cumulative) / 1000)
+    return min(timings)
+
+
+def test_import_time_budget() -> None:
+    """A cold import of the package takes at most IMPORT_TIME_BUDGET times a cold import of BASELINE_MODULE."""
+    baseline = cold_import_ms(BASELINE_MODULE)
+    elapsed = cold_import_ms("{{cookiecutter.project_slug}}")
+    assert elapsed <= IMPORT_TIME_BUDGET * baseline, (
+        f"Importing took {elapsed:.1f}ms, {elapsed / baseline:.1f} times `import {BASELINE_MODULE}` ({baseline:.1f}ms); "
+        f"the budget is {IMPORT_TIME_BUDGET:g} times"
+    )
+
+
+def test_exports_are_lazy() -> None:
+    """Importing the package does not import the modules behind its exports."""
+    code = "import sys, {{cookiecutter.project_slug}}; print('{{cookiecutter.project_slug}}.main' in sys.modules)"
+    assert run_python(code).stdout.strip() == "False"
+
+
+def test_exports_are_declared() -> None:
+    """Every export in __all__ resolves and is listed by dir()."""
+    for name in {{cookiecutter.project_slug}}.__all__:
+        assert getattr({{cookiecutter.project_slug}}, name) is not None
+        assert name in dir({{cookiecutter.project_slug}})
@@ -0,0 +1,242 @@
+"""Tests for the runtime metrics of {{cookiecutter.project_name}}."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import timeit
+from contextlib import nullcontext
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.instrumentation import ENV_VAR, Registry
+
+# A disabled metric may cost at most this many times an empty call of the same shape.
+DISABLED_OVERHEAD_FACTOR = 3
+
+
+def per_call_seconds(statement: str, **namespace: object) -> float:
+    """Return the best time of ``statement`` over a few repeats, per execution."""
+    number = 100_000
+    return min(timeit.repeat(statement, globals=namespace, number=number, repeat=5)) / number
+
+
+def test_counter_and_histogram_record_values() -> None:
+    """Counters add up and histograms count each value in the first bucket that holds it."""
+    registry = Registry()
+    requests = registry.counter("requests")
+    sizes = registry.histogram("sizes", buckets=(1, 10))
+    requests.inc()
+    requests.inc(2)
+    for value in (0.5, 1, 5, 100):
+        sizes.observe(value)
+
+    assert registry.snapshot() == {
+        "requests": 3,
+        "sizes": {"buckets": [1.0, 10.0], "counts": [2, 1, 1], "sum": 106.5},
+    }
+    assert registry.counter("requests") is requests
+    with pytest.raises(TypeError, match="not a histogram"):
+        registry.histogram("requests")
+
+
+def test_timed_observes_functions_coroutines_and_blocks() -> None:
+    """Each call of a timed function or coroutine, and each timed block, is one observation."""
+    registry = Registry()
+
+    @registry.timed("work_seconds")
+    def work(value: int) -> int:
+        return value * 2
+
+    @registry.timed("async_work_seconds")
+    async def async_work(value: int) -> int:
+        return value * 2
+
+    assert work(2) == 4
+    assert asyncio.run(async_work(2)) == 4
+    with registry.histogram("block_seconds").time():
+        pass
+
+    snapshot = registry.snapshot()
+    for name in ("work_seconds", "async_work_seconds", "block_seconds"):
+        assert sum(snapshot[name]["counts"]) == 1
+
+
+def test_disabled_registry_records_nothing_and_leaves_functions_alone() -> None:
+    """A disabled registry hands out no-op metrics and returns decorated functions unchanged."""
+    registry = Registry(enabled=False)
+
+    def work() -> None:
+        pass
+
+    assert registry.timed("work_seconds")(work) is work
+    registry.counter("requests").inc()
+    registry.histogram("sizes").observe(1)
+    with registry.histogram("block_seconds").time():
+        pass
+    assert registry.snapshot()["requests"] == 0
+    assert sum(registry.snapshot()["sizes"]["counts"]) == 0
+
+
+def test_disabled_overhead_stays_bounded() -> None:
+    """Disabled metrics cost about as much as calling an empty function."""
+    registry = Registry(enabled=False)
+    requests = registry.counter("requests")
+    latency = registry.histogram("latency_seconds")
+
+    def inc(amount: float = 1) -> None:
+        pass
+
+    baseline = per_call_seconds("inc()", inc=inc)
+    assert per_call_seconds("requests.inc()", requests=requests) <= DISABLED_OVERHEAD_FACTOR * baseline
+    assert per_call_seconds("latency.observe(0.1)", latency=latency) <= DISABLED_OVERHEAD_FACTOR * baseline
+
+    block_baseline = per_call_seconds("with null: pass", null=nullcontext())
+    block = per_call_seconds("with latency.time(): pass", latency=latency)
+    assert block <= DISABLED_OVERHEAD_FACTOR * block_baseline
+
+
+def test_metrics_are_thread_safe() -> None:
+    """Concurrent updates from many threads are all counted."""
+    registry = Registry()
+    requests = registry.counter("requests")
+    latency = registry.histogram("latency_seconds")
+
+    def hammer() -> None:
+        for _ in range(10_000):
+            requests.inc()
+            latency.observe(0.001)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert requests.value == 80_000
+    assert sum(latency.counts()[0]) == 80_000
+
+
+def test_prometheus_export() -> None:
+    """The Prometheus text format has cumulative buckets, a sum and a count, labelled with the process."""
+    registry = Registry()
+    registry.counter("requests", "Requests handled").inc(3)
+    latency = registry.histogram("latency_seconds", buckets=(0.1, 1))
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    labels = f'service="{{cookiecutter.project_slug}}",pid="{os.getpid()}"'
+    assert registry.export("prometheus").splitlines() == [
+        "# HELP requests_total Requests handled",
+        "# TYPE requests_total counter",
+        "requests_total{" + labels + "} 3.0",
+        "# TYPE latency_seconds histogram",
+        "latency_seconds_bucket{" + labels + ',le="0.1"} 1',
+        "latency_seconds_bucket{" + labels + ',le="1.0"} 2',
+        "latency_seconds_bucket{" + labels + ',le="+Inf"} 2',
+        "latency_seconds_sum{" + labels + "} 0.55",
+        "latency_seconds_count{" + labels + "} 2",
+    ]
+
+
+def test_write_appends_json_lines_and_replaces_prometheus_files(tmp_path: Path) -> None:
+    """JSON lines accumulate in the file; a Prometheus file holds the latest snapshot only."""
+    registry = Registry()
+    registry.counter("requests").inc()
+    registry.write(tmp_path / "metrics.jsonl")
+    registry.write(tmp_path / "metrics.jsonl")
+    registry.write(tmp_path / "metrics.prom", "prometheus")
+    registry.write(tmp_path / "metrics.prom", "prometheus")
+
+    lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [(line["name"], line["type"], line["value"]) for line in lines] == [("requests", "counter", 1)] * 2
+    assert (tmp_path / "metrics.prom").read_text() == registry.export("prometheus")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["metrics.jsonl", "metrics.prom"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+def test_send_to_a_unix_socket(tmp_path: Path) -> None:
+    """A snapshot sent to a Unix socket arrives as JSON lines."""
+    registry = Registry()
+    registry.counter("requests").inc()
+    address = str(tmp_path / "metrics.sock")
+    received = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(address)
+        server.listen()
+
+        def receive() -> None:
+            connection, _ = server.accept()
+            with connection:
+                received.append(connection.makefile("rb").read())
+
+        receiver = threading.Thread(target=receive)
+        receiver.start()
+        registry.send(address)
+        receiver.join()
+    assert json.loads(received[0])["value"] == 1
+
+
+def test_drain_hands_values_over_to_merge() -> None:
+    """Draining resets the metrics, and merging the drained values adds them to another registry."""
+    worker = Registry()
+    worker.counter("requests").inc(2)
+    worker.histogram("sizes", buckets=(1, 10)).observe(5)
+    parent = Registry()
+    parent.counter("requests").inc()
+
+    parent.merge(worker.drain())
+    parent.merge(worker.drain())
+
+    assert parent.snapshot() == {
+        "requests": 3,
+        "sizes": {"buckets": [1.0, 10.0], "counts": [0, 1, 0], "sum": 5.0},
+    }
+    assert worker.snapshot() == {"requests": 0, "sizes": {"buckets": [1.0, 10.0], "counts": [0, 0, 0], "sum": 0.0}}
+    assert Registry(enabled=False).drain() == {}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_forked_child_starts_from_zero() -> None:
+    """A forked process doesn't report the values its parent recorded before the fork."""
+    registry = Registry()
+    registry.counter("requests").inc(5)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        os.write(write, str(registry.snapshot()["requests"]).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 64) == b"0.0"
+    assert registry.snapshot()["requests"] == 5
+
+
+def test_main_is_timed_when_metrics_are_enabled() -> None:
+    """With the environment variable set, every call of main is observed."""
+    code = (
+        "from {{cookiecutter.project_slug}}.instrumentation import REGISTRY\n"
+        "from {{cookiecutter.project_slug}}.main import main\n"
+        "main('bar')\n"
+        "print(sum(REGISTRY.snapshot()['main_seconds']['counts']))"
+    )
+    env = {**os.environ, ENV_VAR: "1"}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)  # noqa: S603
+    assert result.stdout.strip() == "1"
+{%- if cookiecutter.concurrency == "processes" %}
+
+
+def test_pipeline_merges_the_metrics_of_its_workers() -> None:
+    """The calls of main in the pipeline's worker processes are observed in the parent's registry."""
+    code = (
+        "from {{cookiecutter.project_slug}}.instrumentation import REGISTRY\n"
+        "from {{cookiecutter.project_slug}}.main import run\n"
+        "run([str(i) for i in range(100)], workers=2, batch_size=8)\n"
+        "print(sum(REGISTRY.snapshot()['main_seconds']['counts']))"
+    )
+    env = {**os.environ, ENV_VAR: "1"}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)  # noqa: S603
+    assert result.stdout.strip() == "100"
+{%- endif %}
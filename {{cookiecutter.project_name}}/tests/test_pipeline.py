@@ -0,0 +1,281 @@
+{% if cookiecutter.concurrency == "threads" -%}
+"""Tests for the worker pipeline in {{cookiecutter.project_slug}}.main."""
+
+import queue
+import threading
+import time
+
+import pytest
+
+from {{cookiecutter.project_slug}}.main import Pipeline, process_batch, run
+
+
+def test_run_processes_every_item() -> None:
+    """Every item is processed exactly once."""
+    items = [str(i) for i in range(1000)]
+    assert sorted(run(items, workers=3, batch_size=16)) == sorted(process_batch(items))
+
+
+def test_items_are_processed_in_batches() -> None:
+    """Waiting items are handed to the handler together, up to batch_size at a time."""
+    sizes: list[int] = []
+    release = threading.Event()
+
+    def handler(batch: list[str]) -> list[str]:
+        release.wait()
+        sizes.append(len(batch))
+        return batch
+
+    with Pipeline(handler, workers=1, batch_size=10, batch_timeout=0.01) as pipeline:
+        pipeline.submit("first")
+        for i in range(25):
+            pipeline.submit(str(i))
+        release.set()
+    assert sum(sizes) == 26
+    assert max(sizes) == 10
+    assert len(sizes) <= 4
+
+
+def test_submit_blocks_when_the_queue_is_full() -> None:
+    """Producers get backpressure instead of an ever-growing queue."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def handler(batch: list[str]) -> list[str]:
+        started.set()
+        release.wait()
+        return batch
+
+    with Pipeline(handler, workers=1, max_pending=2, batch_size=1) as pipeline:
+        pipeline.submit("in progress")
+        started.wait()
+        pipeline.submit("waiting 1")
+        pipeline.submit("waiting 2")
+        with pytest.raises(queue.Full):
+            pipeline.submit("one too many", timeout=0.05)
+        release.set()
+    assert pipeline.processed == 3
+
+
+def test_close_finishes_submitted_items() -> None:
+    """Closing drains the queue before the workers stop, and later submissions are refused."""
+    results: list[str] = []
+    pipeline = Pipeline(sink=results.extend, workers=2, batch_size=4)
+    for i in range(100):
+        pipeline.submit(str(i))
+    pipeline.close()
+    assert len(results) == pipeline.processed == 100
+    with pytest.raises(RuntimeError, match="closed"):
+        pipeline.submit("late")
+
+
+def test_close_waits_for_blocked_submissions() -> None:
+    """An item still waiting for room when the pipeline closes is processed before the workers stop."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def handler(batch: list[str]) -> list[str]:
+        started.set()
+        release.wait()
+        return batch
+
+    pipeline = Pipeline(handler, workers=1, max_pending=1, batch_size=1)
+    pipeline.submit("in progress")
+    started.wait()
+    pipeline.submit("waiting")
+    producer = threading.Thread(target=pipeline.submit, args=("blocked",))
+    producer.start()
+    closer = threading.Thread(target=pipeline.close)
+    time.sleep(0.05)
+    closer.start()
+    time.sleep(0.05)
+    release.set()
+    producer.join()
+    closer.join()
+    assert pipeline.processed == 3
+
+
+def test_failed_batches_do_not_stop_the_workers(caplog: pytest.LogCaptureFixture) -> None:
+    """A batch that raises is logged and counted, and the pipeline keeps going."""
+
+    def handler(batch: list[str]) -> list[str]:
+        if "bad" in batch:
+            msg = "bad item"
+            raise ValueError(msg)
+        return batch
+
+    with Pipeline(handler, workers=1, batch_size=1) as pipeline:
+        for item in ["good", "bad", "good"]:
+            pipeline.submit(item)
+    assert (pipeline.processed, pipeline.failed) == (2, 1)
+    assert "Failed to process a batch" in caplog.text
+{% elif cookiecutter.concurrency == "asyncio" -%}
+"""Tests for the worker pipeline in {{cookiecutter.project_slug}}.main."""
+
+import asyncio
+
+import pytest
+
+from {{cookiecutter.project_slug}}.main import Pipeline, process_batch, run
+
+
+def test_run_processes_every_item() -> None:
+    """Every item is processed exactly once."""
+    items = [str(i) for i in range(1000)]
+    assert sorted(asyncio.run(run(items, workers=3, batch_size=16))) == sorted(asyncio.run(process_batch(items)))
+
+
+def test_items_are_processed_in_batches() -> None:
+    """Waiting items are handed to the handler together, up to batch_size at a time."""
+    sizes: list[int] = []
+
+    async def handler(batch: list[str]) -> list[str]:
+        sizes.append(len(batch))
+        return batch
+
+    async def scenario() -> None:
+        async with Pipeline(handler, workers=1, batch_size=10) as pipeline:
+            for i in range(25):
+                await pipeline.submit(str(i))
+
+    asyncio.run(scenario())
+    assert sizes == [10, 10, 5]
+
+
+def test_submit_waits_when_the_queue_is_full() -> None:
+    """Producers get backpressure instead of an ever-growing queue."""
+
+    async def scenario() -> int:
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def handler(batch: list[str]) -> list[str]:
+            started.set()
+            await release.wait()
+            return batch
+
+        async with Pipeline(handler, workers=1, max_pending=2, batch_size=1) as pipeline:
+            await pipeline.submit("in progress")
+            await started.wait()
+            await pipeline.submit("waiting 1")
+            await pipeline.submit("waiting 2")
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(pipeline.submit("one too many"), timeout=0.05)
+            release.set()
+        return pipeline.processed
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_close_finishes_submitted_items() -> None:
+    """Closing drains the queue before the workers stop, and later submissions are refused."""
+
+    async def scenario() -> tuple[list[str], Pipeline]:
+        results: list[str] = []
+        pipeline = Pipeline(sink=results.extend, workers=2, batch_size=4)
+        pipeline.start()
+        for i in range(100):
+            await pipeline.submit(str(i))
+        await pipeline.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            await pipeline.submit("late")
+        return results, pipeline
+
+    results, pipeline = asyncio.run(scenario())
+    assert len(results) == pipeline.processed == 100
+
+
+def test_failed_batches_do_not_stop_the_workers(caplog: pytest.LogCaptureFixture) -> None:
+    """A batch that raises is logged and counted, and the pipeline keeps going."""
+
+    async def handler(batch: list[str]) -> list[str]:
+        if "bad" in batch:
+            msg = "bad item"
+            raise ValueError(msg)
+        return batch
+
+    async def scenario() -> Pipeline:
+        async with Pipeline(handler, workers=1, batch_size=1) as pipeline:
+            for item in ["good", "bad", "good"]:
+                await pipeline.submit(item)
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+    assert (pipeline.processed, pipeline.failed) == (2, 1)
+    assert "Failed to process a batch" in caplog.text
+{% elif cookiecutter.concurrency == "processes" -%}
+"""Tests for the worker pipeline in {{cookiecutter.project_slug}}.main."""
+
+import queue
+import time
+
+import pytest
+
+from {{cookiecutter.project_slug}}.main import Pipeline, process_batch, run
+
+
+def record_batch(batch: list[str]) -> list[str]:
+    """Return the size of the batch as the result of each item."""
+    return [str(len(batch))] * len(batch)
+
+
+def slow_batch(batch: list[str]) -> list[str]:
+    """Take long enough to keep a worker busy."""
+    time.sleep(0.5)
+    return batch
+
+
+def failing_batch(batch: list[str]) -> list[str]:
+    """Fail on batches with a bad item."""
+    if "bad" in batch:
+        msg = "bad item"
+        raise ValueError(msg)
+    return batch
+
+
+def test_run_processes_every_item() -> None:
+    """Every item is processed exactly once."""
+    items = [str(i) for i in range(1000)]
+    assert sorted(run(items, workers=2, batch_size=64)) == sorted(process_batch(items))
+
+
+def test_items_are_processed_in_batches() -> None:
+    """Items are sent to the workers batch_size at a time; close sends the partial batch."""
+    results: list[str] = []
+    with Pipeline(record_batch, results.extend, workers=1, batch_size=10) as pipeline:
+        for i in range(25):
+            pipeline.submit(str(i))
+    assert sorted(results) == sorted(["10"] * 20 + ["5"] * 5)
+
+
+def test_submit_blocks_while_max_pending_items_are_in_flight() -> None:
+    """Producers get backpressure instead of an ever-growing backlog."""
+    with Pipeline(slow_batch, workers=1, max_pending=2, batch_size=2) as pipeline:
+        pipeline.submit("a")
+        pipeline.submit("b")
+        pipeline.submit("c")
+        with pytest.raises(queue.Full):
+            pipeline.submit("d", timeout=0.05)
+    assert pipeline.processed == 4
+
+
+def test_close_finishes_submitted_items() -> None:
+    """Closing processes every submitted item, and later submissions are refused."""
+    results: list[str] = []
+    pipeline = Pipeline(sink=results.extend, workers=2, batch_size=8)
+    for i in range(100):
+        pipeline.submit(str(i))
+    pipeline.close()
+    assert len(results) == pipeline.processed == 100
+    with pytest.raises(RuntimeError, match="closed"):
+        pipeline.submit("late")
+
+
+def test_failed_batches_do_not_stop_the_workers(caplog: pytest.LogCaptureFixture) -> None:
+    """A batch that raises is logged and counted, and the pipeline keeps going."""
+    with Pipeline(failing_batch, workers=1, batch_size=1) as pipeline:
+        for item in ["good", "bad", "good"]:
+            pipeline.submit(item)
+    assert (pipeline.processed, pipeline.failed) == (2, 1)
+    assert "Failed to process a batch" in caplog.text
+{% endif -%}
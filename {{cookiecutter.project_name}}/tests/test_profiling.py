@@ -0,0 +1,34 @@
+"""Tests for the profiling helpers of {{cookiecutter.project_name}}."""
+
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.profiling import write_collapsed
+
+
+@pytest.mark.parametrize(
+    ("mode", "files"),
+    [("cpu", ["cpu.prof", "cpu.txt", "cpu.collapsed"]), ("memory", ["memory.txt", "memory.collapsed"])],
+)
+def test_profile_writes_reports(tmp_path: Path, mode: str, files: list[str]) -> None:
+    """Profiling a module writes its reports to the output directory."""
+    # A separate interpreter, since profilers can't be nested inside a profiled test run.
+    module = "{{cookiecutter.project_slug}}.profiling"
+    command = [sys.executable, "-m", module, "--output-dir", str(tmp_path), mode, "json.tool", "--help"]
+    result = subprocess.run(command, capture_output=True, text=True, check=False)  # noqa: S603
+
+    assert result.returncode == 0, result.stderr
+    for name in files:
+        assert (tmp_path / name).is_file(), f"Expected {name} in the output directory"
+
+
+def test_write_collapsed(tmp_path: Path) -> None:
+    """Collapsed stacks are written most frequent first, one stack and count per line."""
+    path = tmp_path / "stacks.collapsed"
+    write_collapsed(Counter({"main;work": 3, "main": 1, "main;work;io": 7}), path)
+
+    assert path.read_text() == "main;work;io 7\nmain;work 3\nmain 1\n"
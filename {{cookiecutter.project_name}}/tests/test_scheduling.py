@@ -0,0 +1,84 @@
+"""Tests for the duration-aware test scheduling in tests/conftest.py."""
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from conftest import estimated_durations, imported_modules, module_name, pack_shards
+
+CONFTEST = Path(__file__).with_name("conftest.py")
+
+
+def test_pack_shards_balances_longest_first() -> None:
+    """Each test goes to the least loaded shard, longest first."""
+    durations = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 2.0, "f": 1.0}
+    shards = pack_shards(durations, 2)
+    assert shards == [["a", "d", "f"], ["b", "c", "e"]]
+    assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(durations)
+
+
+def test_pack_shards_with_more_shards_than_tests() -> None:
+    """Surplus shards stay empty."""
+    assert pack_shards({"a": 1.0}, 3) == [["a"], [], []]
+
+
+def test_estimated_durations_default_to_the_average() -> None:
+    """Tests without a recorded duration count as the average recorded one."""
+    assert estimated_durations(["a", "b", "new"], {"a": 1.0, "b": 3.0, "gone": 9.0}) == {"a": 1.0, "b": 3.0, "new": 2.0}
+    assert estimated_durations(["new"], {}) == {"new": 1.0}
+
+
+def test_module_name_and_imports(tmp_path: Path) -> None:
+    """Changed files map to module names that the imports of a test file are matched against."""
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").touch()
+    (package / "core.py").write_text("")
+    test_file = tmp_path / "test_core.py"
+    test_file.write_text("import os\nfrom pkg import core\nfrom . import helpers\n")
+
+    assert module_name(package / "core.py") == "pkg.core"
+    assert module_name(package / "__init__.py") == "pkg"
+    assert module_name(tmp_path / "README.md") is None
+    assert imported_modules(test_file) == {"os", "pkg", "pkg.core"}
+
+
+def run_pytest(directory: Path, *args: str) -> subprocess.CompletedProcess:
+    """Run pytest with the scheduling plugin on the tests in ``directory``."""
+    command = [sys.executable, "-m", "pytest", *args]
+    return subprocess.run(command, cwd=directory, capture_output=True, text=True)  # noqa: S603
+
+
+def test_workers_record_durations_and_report_one_session(tmp_path: Path) -> None:
+    """Tests split across workers report as one session, and their durations are recorded."""
+    shutil.copy(CONFTEST, tmp_path / "conftest.py")
+    (tmp_path / "test_sample.py").write_text(
+        "import pytest\n\n"
+        "@pytest.mark.parametrize('n', range(6))\n"
+        "def test_passes(n):\n    pass\n\n"
+        "def test_fails():\n    assert False\n"
+    )
+
+    result = run_pytest(tmp_path, "--workers=2")
+    assert result.returncode == 1, result.stdout
+    assert "1 failed, 6 passed" in result.stdout
+    durations = json.loads((tmp_path / ".test-durations.json").read_text())
+    assert len(durations) == 7
+
+    shards = [
+        {
+            line
+            for line in run_pytest(
+                tmp_path, "--collect-only", "-q", "--num-shards=2", f"--shard-id={i}"
+            ).stdout.splitlines()
+            if "::" in line
+        }
+        for i in range(2)
+    ]
+    assert shards[0].isdisjoint(shards[1])
+    assert len(shards[0] | shards[1]) == 7
+
+    result = run_pytest(tmp_path, "--changed-first", "-v")
+    assert result.stdout.index("test_fails") < result.stdout.index("test_passes"), "Expected the last failed test first"
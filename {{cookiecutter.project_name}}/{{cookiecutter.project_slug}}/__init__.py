@@ -1 +1,38 @@
-"""{{cookiecutter.project_name}} package."""
+"""{{cookiecutter.project_name}} package.
+
+Public names are imported lazily, on first access, so that ``import {{cookiecutter.project_slug}}`` stays cheap however
+many submodules the package grows. Declare every export in ``_EXPORTS`` and ``__all__``, and import it
+in the ``TYPE_CHECKING`` block so that type checkers and IDEs see the real objects.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from {{cookiecutter.project_slug}} import main
+
+__all__ = ["main"]
+
+# Maps each public name to "package.module" (a submodule) or "package.module:attribute".
+_EXPORTS: dict[str, str] = {
+    "main": "{{cookiecutter.project_slug}}.main",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import the object exported as ``name`` on first access and cache it in the module."""
+    try:
+        module_name, _, attribute = _EXPORTS[name].partition(":")
+    except KeyError:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg) from None
+    value = importlib.import_module(module_name)
+    if attribute:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazy exports alongside the attributes that are already loaded."""
+    return sorted(set(globals()) | set(_EXPORTS))
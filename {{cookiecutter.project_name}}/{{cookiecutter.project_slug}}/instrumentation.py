@@ -0,0 +1,391 @@
+"""Low-overhead runtime metrics for {{cookiecutter.project_name}}: counters, latency histograms and timers.
+
+Metrics are off unless the ``{{cookiecutter.project_slug|upper}}_METRICS`` environment variable is ``1`` when this
+module is first imported. While they are off, the module-level registry hands out metrics whose methods
+do nothing and `timed` returns the function it decorates unchanged, so instrumented code runs at full
+speed::
+
+    from {{cookiecutter.project_slug}}.instrumentation import counter, histogram, timed
+
+    REQUESTS = counter("requests", "Requests handled")
+    PAYLOAD_BYTES = histogram("payload_bytes", "Request payload sizes", buckets=(256, 1024, 4096))
+
+    @timed("handle_seconds", "Time spent handling a request")
+    def handle(request: bytes) -> None:
+        REQUESTS.inc()
+        PAYLOAD_BYTES.observe(len(request))
+
+A histogram counts observations in fixed buckets, in an array allocated when it is created, so
+recording never allocates. Metrics are safe to update from any thread, but each process has its own:
+a forked child starts again from zero, and the workers of a process pool record into theirs. A worker
+hands its values to the parent with `Registry.drain`, for the parent to add them to its own registry
+with `Registry.merge`; exports label each value with the ``pid`` of the exporting process.
+
+`Registry.write` exports a snapshot to a file and `Registry.send` to a Unix or TCP socket, as JSON
+lines or in the Prometheus text format::
+
+    REGISTRY.write("metrics.jsonl", "jsonl")  # Appends one line per metric
+    REGISTRY.write("/var/lib/node_exporter/{{cookiecutter.project_slug}}.prom", "prometheus")  # Replaces the file
+    REGISTRY.send("/run/metrics.sock", "jsonl")
+"""
+
+import functools
+import inspect
+import json
+import os
+import re
+import socket
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any, Literal, TypeVar, cast
+
+SERVICE = "{{cookiecutter.project_slug}}"
+ENV_VAR = "{{cookiecutter.project_slug|upper}}_METRICS"
+
+# Upper bounds, in seconds, of the latency buckets; larger values fall in the final +Inf bucket.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+Format = Literal["jsonl", "prometheus"]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Counter:
+    """A value that only goes up, such as the number of requests handled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str = "") -> None:
+        """Create a counter at zero."""
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        """Add ``amount`` to the counter."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        """The current value."""
+        return self._value
+
+    def reset(self) -> float:
+        """Set the counter back to zero, returning its value before."""
+        with self._lock:
+            value, self._value = self._value, 0.0
+        return value
+
+
+class Histogram:
+    """Counts of observations, such as latencies, in buckets with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Create an empty histogram with the sorted upper bounds ``buckets`` and a final +Inf bucket."""
+        if list(buckets) != sorted(set(buckets)):
+            msg = f"Histogram buckets must be strictly increasing, got {buckets}"
+            raise ValueError(msg)
+        self.name = name
+        self.description = description
+        self.buckets = tuple(float(bound) for bound in buckets)
+        self._counts = array("Q", bytes(8 * (len(buckets) + 1)))
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Count ``value`` in the first bucket whose upper bound is at least ``value``."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> AbstractContextManager[None]:
+        """Observe the seconds spent in a ``with`` block."""
+        return _Timer(self)
+
+    def counts(self) -> tuple[list[int], float]:
+        """Return the count of each bucket, +Inf last, and the sum of all observations."""
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def add(self, counts: list[int], total: float) -> None:
+        """Add the bucket ``counts`` and ``total`` of observations made elsewhere with the same buckets."""
+        if len(counts) != len(self._counts):
+            msg = f"Expected {len(self._counts)} bucket counts for {self.name}, got {len(counts)}"
+            raise ValueError(msg)
+        with self._lock:
+            for index, count in enumerate(counts):
+                self._counts[index] += count
+            self._sum += total
+
+    def reset(self) -> tuple[list[int], float]:
+        """Drop every observation, returning the counts and sum from before like `counts`."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+            for index in range(len(self._counts)):
+                self._counts[index] = 0
+            self._sum = 0.0
+        return counts, total
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _DisabledCounter(Counter):
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+
+class _DisabledHistogram(Histogram):
+    def observe(self, value: float) -> None:
+        pass
+
+    def add(self, counts: list[int], total: float) -> None:
+        pass
+
+    def time(self) -> AbstractContextManager[None]:
+        return _NULL_CONTEXT
+
+
+_NULL_CONTEXT: AbstractContextManager[None] = nullcontext()
+# Every registry, for resetting after a fork. Registries live as long as the process, like the metrics of a
+# module (and compiled classes don't support weak references).
+_REGISTRIES: "list[Registry]" = []
+
+
+class Registry:
+    """The metrics of a process, by name, and their export.
+
+    A disabled registry hands out metrics that record nothing, and `timed` leaves functions as they are.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Create an empty registry."""
+        self.enabled = enabled
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+        _REGISTRIES.append(self)
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Return the counter called ``name``, creating it on first use."""
+        factory = Counter if self.enabled else _DisabledCounter
+        metric = self._register(name, lambda: factory(name, description))
+        if not isinstance(metric, Counter):
+            msg = f"Metric {name} is a {metric.kind}, not a counter"
+            raise TypeError(msg)
+        return metric
+
+    def histogram(self, name: str, description: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Return the histogram called ``name``, creating it with ``buckets`` on first use."""
+        factory = Histogram if self.enabled else _DisabledHistogram
+        metric = self._register(name, lambda: factory(name, description, buckets))
+        if not isinstance(metric, Histogram):
+            msg = f"Metric {name} is a {metric.kind}, not a histogram"
+            raise TypeError(msg)
+        return metric
+
+    def _register(self, name: str, create: Callable[[], Counter | Histogram]) -> Counter | Histogram:
+        if not _NAME.fullmatch(name):
+            msg = f"Invalid metric name {name!r}: use letters, digits and underscores, not starting with a digit"
+            raise ValueError(msg)
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = create()
+            return metric
+
+    def timed(self, name: str, description: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Callable[[F], F]:
+        """Decorate a function, or a coroutine function, to observe the seconds each call takes in a histogram."""
+        histogram = self.histogram(name, description, buckets)
+
+        def decorate(func: F) -> F:
+            if not self.enabled:
+                return func
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def timed_coroutine(*args: Any, **kwargs: Any) -> Any:
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        histogram.observe(time.perf_counter() - start)
+
+                return cast(F, timed_coroutine)
+
+            @functools.wraps(func)
+            def timed_function(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+            return cast(F, timed_function)
+
+        return decorate
+
+    def reset(self) -> None:
+        """Set every metric back to zero."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the current value of every metric, by name."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        values: dict[str, Any] = {}
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                values[metric.name] = metric.value
+            else:
+                counts, total = metric.counts()
+                values[metric.name] = {"buckets": list(metric.buckets), "counts": counts, "sum": total}
+        return values
+
+    def drain(self) -> dict[str, Any]:
+        """Return the value of every metric like `snapshot`, and set each back to zero as it is read.
+
+        Nothing recorded meanwhile is lost: it is in this snapshot or counts towards the next one. A disabled
+        registry returns an empty snapshot.
+        """
+        if not self.enabled:
+            return {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+        values: dict[str, Any] = {}
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                values[metric.name] = metric.reset()
+            else:
+                counts, total = metric.reset()
+                values[metric.name] = {"buckets": list(metric.buckets), "counts": counts, "sum": total}
+        return values
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """Add the values of a `snapshot` or `drain` of another registry, such as a worker process's, to this one."""
+        for name, value in snapshot.items():
+            if isinstance(value, dict):
+                self.histogram(name, buckets=tuple(value["buckets"])).add(value["counts"], value["sum"])
+            else:
+                self.counter(name).inc(value)
+
+    def to_json_lines(self) -> str:
+        """Return one JSON object per metric, each on its own line."""
+        header = {"time": time.time(), "service": SERVICE, "pid": os.getpid()}
+        lines = []
+        with self._lock:
+            kinds = {name: metric.kind for name, metric in self._metrics.items()}
+        for name, value in self.snapshot().items():
+            if kinds[name] == "counter":
+                line = {**header, "name": name, "type": "counter", "value": value}
+            else:
+                line = {**header, "name": name, "type": "histogram", **value, "count": sum(value["counts"])}
+            lines.append(json.dumps(line) + "\n")
+        return "".join(lines)
+
+    def to_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        labels = f'service="{SERVICE}",pid="{os.getpid()}"'
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            name = metric.name
+            if isinstance(metric, Counter):
+                name = name if name.endswith("_total") else f"{name}_total"
+            if metric.description:
+                lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if isinstance(metric, Counter):
+                lines.append(f"{name}{_braced(labels)} {metric.value!r}")
+                continue
+            counts, total = metric.counts()
+            cumulative = 0
+            for bound, count in zip([*map(repr, metric.buckets), "+Inf"], counts, strict=True):
+                cumulative += count
+                bucket_labels = f'{labels},le="{bound}"'
+                lines.append(f"{name}_bucket{_braced(bucket_labels)} {cumulative}")
+            lines.append(f"{name}_sum{_braced(labels)} {total!r}")
+            lines.append(f"{name}_count{_braced(labels)} {cumulative}")
+        return "".join(f"{line}\n" for line in lines)
+
+    def export(self, fmt: Format) -> str:
+        """Return a snapshot of the metrics as ``"jsonl"`` or ``"prometheus"`` text."""
+        if fmt == "jsonl":
+            return self.to_json_lines()
+        if fmt == "prometheus":
+            return self.to_prometheus()
+        msg = f"Unknown metrics format {fmt!r}, expected 'jsonl' or 'prometheus'"
+        raise ValueError(msg)
+
+    def write(self, path: str | Path, fmt: Format = "jsonl") -> None:
+        """Append a JSON-lines snapshot to ``path``, or replace ``path`` with a Prometheus one.
+
+        The Prometheus file is replaced in one step, so a reader such as node_exporter's textfile
+        collector never sees it half written.
+        """
+        path = Path(path)
+        content = self.export(fmt)
+        if fmt == "jsonl":
+            with path.open("a", encoding="utf-8") as f:
+                f.write(content)
+            return
+        partial = path.with_name(f".{path.name}.{os.getpid()}")
+        partial.write_text(content, encoding="utf-8")
+        partial.replace(path)
+
+    def send(self, address: str | tuple[str, int], fmt: Format = "jsonl", timeout: float = 1.0) -> None:
+        """Send a snapshot to the Unix socket at path ``address``, or to a ``(host, port)`` TCP address."""
+        content = self.export(fmt).encode("utf-8")
+        if isinstance(address, str):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(address)
+                sock.sendall(content)
+        else:
+            with socket.create_connection(address, timeout=timeout) as sock:
+                sock.sendall(content)
+
+
+def _braced(labels: str) -> str:
+    return "{" + labels + "}"
+
+
+def _reset_after_fork() -> None:
+    # Another thread of the parent may have held a lock at the fork, so the child gets new ones.
+    for registry in _REGISTRIES:
+        registry._lock = threading.Lock()
+        for metric in registry._metrics.values():
+            metric._lock = threading.Lock()
+        registry.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+REGISTRY = Registry(enabled=os.environ.get(ENV_VAR) == "1")
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+timed = REGISTRY.timed
@@ -1,6 +1,11 @@
+{% if cookiecutter.concurrency == "none" -%}
 """Main module for {{cookiecutter.project_name}}."""
+{% if cookiecutter.instrumentation == "y" %}
+from {{cookiecutter.project_slug}}.instrumentation import timed
 
-def main(bar: str) -> str:
+{% endif %}
+{% if cookiecutter.instrumentation == "y" %}@timed("main_seconds", "Time spent in main")
+{% endif %}def main(bar: str) -> str:
     """Summary line.
 
     Extended description of function.
@@ -17,3 +22,648 @@ def main(bar: str) -> str:
 
 if __name__ == "__main__":  # pragma: no cover
     pass
+{% elif cookiecutter.concurrency == "threads" -%}
+"""Main module for {{cookiecutter.project_name}}.
+
+`Pipeline` processes a stream of items on a pool of worker threads, in batches, through a bounded
+queue. Put the service's work in `process_batch`, and feed the pipeline with `Pipeline.submit`.
+"""
+
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from types import TracebackType
+{%- if cookiecutter.instrumentation == "y" %}
+
+from {{cookiecutter.project_slug}}.instrumentation import timed
+{%- endif %}
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[str]], list[str]]
+Sink = Callable[[list[str]], None]
+
+
+{% if cookiecutter.instrumentation == "y" %}@timed("main_seconds", "Time spent in main")
+{% endif %}def main(bar: str) -> str:
+    """Summary line.
+
+    Extended description of function.
+
+    Args:
+        bar: Description of input argument.
+
+    Returns:
+        Description of return value
+    """
+    return bar
+
+
+def process_batch(batch: list[str]) -> list[str]:
+    """Process a batch of items and return their results.
+
+    Handling items in batches amortizes per-call costs such as I/O round trips; replace the body with
+    the service's work.
+
+    Args:
+        batch: Items in submission order.
+
+    Returns:
+        One result per item.
+    """
+    return [main(item) for item in batch]
+
+
+class Pipeline:
+    """Process items in batches on a pool of worker threads, through a bounded queue.
+
+    - Backpressure: `submit` blocks while ``max_pending`` items wait, so producers slow down to the
+      pace of the workers instead of queueing without bound.
+    - Batching: a worker takes up to ``batch_size`` waiting items at once, and waits up to
+      ``batch_timeout`` seconds for a batch to fill.
+    - Graceful shutdown: `close`, or leaving the ``with`` block, stops accepting items, lets the
+      workers finish every submitted item and joins them.
+
+    A batch that raises is logged and counted in ``failed``; the workers carry on. ``sink`` receives
+    the results of each batch, on the worker threads. Threads suit I/O-bound work: the GIL runs
+    pure-Python computation one thread at a time.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler = process_batch,
+        sink: Sink | None = None,
+        *,
+        workers: int = 4,
+        max_pending: int = 1024,
+        batch_size: int = 64,
+        batch_timeout: float = 0.005,
+    ) -> None:
+        """Start ``workers`` threads that pass batches of submitted items to ``handler``."""
+        if min(workers, max_pending, batch_size) < 1:
+            msg = "workers, max_pending and batch_size must be at least 1"
+            raise ValueError(msg)
+        self.handler = handler
+        self.sink = sink
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.processed = 0
+        self.failed = 0
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=max_pending)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._submitting = 0
+        self._workers = [threading.Thread(target=self._work, name=f"pipeline-{i}") for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, item: str, timeout: float | None = None) -> None:
+        """Queue ``item``, blocking while ``max_pending`` items wait.
+
+        Raises:
+            queue.Full: No room was freed within ``timeout`` seconds.
+            RuntimeError: The pipeline is closed.
+        """
+        with self._condition:
+            if self._closed:
+                msg = "Pipeline is closed"
+                raise RuntimeError(msg)
+            self._submitting += 1
+        # Wait for room outside the lock, so that the workers can count their batches meanwhile.
+        try:
+            self._queue.put(item, timeout=timeout)
+        finally:
+            with self._condition:
+                self._submitting -= 1
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Process every submitted item, then stop the workers."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            # Submissions that got past the check queue their items before the stop markers.
+            self._condition.wait_for(lambda: not self._submitting)
+        # One stop marker per worker, queued behind the items, so that every item is processed first.
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self) -> "Pipeline":
+        """Return the running pipeline."""
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Close the pipeline, finishing the submitted items."""
+        self.close()
+
+    def _next_batch(self) -> tuple[list[str], bool]:
+        """Wait for an item, then gather more for up to ``batch_timeout``; also return whether to stop."""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _work(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = self.handler(batch)
+                if self.sink is not None:
+                    self.sink(results)
+            except Exception:
+                logger.exception("Failed to process a batch of %d items", len(batch))
+                with self._condition:
+                    self.failed += len(batch)
+            else:
+                with self._condition:
+                    self.processed += len(batch)
+
+
+def run(items: Iterable[str], workers: int = 4, batch_size: int = 64) -> list[str]:
+    """Process ``items`` with a `Pipeline` and return their results, in completion order.
+
+    Args:
+        items: Items to process.
+        workers: Number of worker threads.
+        batch_size: Maximum number of items per batch.
+
+    Returns:
+        The results of every item that was processed successfully.
+    """
+    results: list[str] = []
+    with Pipeline(sink=results.extend, workers=workers, batch_size=batch_size) as pipeline:
+        for item in items:
+            pipeline.submit(item)
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover
+    # Process stdin line by line; on SIGTERM or Ctrl-C, stop reading and finish the submitted lines.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with Pipeline(sink=lambda results: sys.stdout.writelines(f"{result}\n" for result in results)) as pipeline:
+        try:
+            for line in sys.stdin:
+                pipeline.submit(line.rstrip("\n"))
+        except KeyboardInterrupt:
+            pass
+{% elif cookiecutter.concurrency == "asyncio" -%}
+"""Main module for {{cookiecutter.project_name}}.
+
+`Pipeline` processes a stream of items on a pool of asyncio worker tasks, in batches, through a
+bounded queue. Put the service's work in `process_batch`, and feed the pipeline with `Pipeline.submit`.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+import threading
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from types import TracebackType
+{%- if cookiecutter.instrumentation == "y" %}
+
+from {{cookiecutter.project_slug}}.instrumentation import timed
+{%- endif %}
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[str]], Awaitable[list[str]]]
+Sink = Callable[[list[str]], None]
+
+
+{% if cookiecutter.instrumentation == "y" %}@timed("main_seconds", "Time spent in main")
+{% endif %}def main(bar: str) -> str:
+    """Summary line.
+
+    Extended description of function.
+
+    Args:
+        bar: Description of input argument.
+
+    Returns:
+        Description of return value
+    """
+    return bar
+
+
+async def process_batch(batch: list[str]) -> list[str]:
+    """Process a batch of items and return their results.
+
+    Handling items in batches amortizes per-call costs such as I/O round trips; replace the body with
+    the service's work. Run blocking or CPU-heavy code with ``await asyncio.to_thread(...)``, so that
+    it doesn't stall the event loop.
+
+    Args:
+        batch: Items in submission order.
+
+    Returns:
+        One result per item.
+    """
+    return [main(item) for item in batch]
+
+
+class Pipeline:
+    """Process items in batches on a pool of worker tasks, through a bounded queue.
+
+    - Backpressure: `submit` waits while ``max_pending`` items wait, so producers slow down to the
+      pace of the workers instead of queueing without bound.
+    - Batching: a worker takes up to ``batch_size`` waiting items at once, and gives a batch that is
+      not full ``batch_timeout`` seconds to fill.
+    - Graceful shutdown: `close`, or leaving the ``async with`` block, stops accepting items, lets the
+      workers finish every submitted item and waits for them.
+
+    A batch that raises is logged and counted in ``failed``; the workers carry on. ``sink`` receives
+    the results of each batch.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler = process_batch,
+        sink: Sink | None = None,
+        *,
+        workers: int = 4,
+        max_pending: int = 1024,
+        batch_size: int = 64,
+        batch_timeout: float = 0.005,
+    ) -> None:
+        """Configure a pipeline that passes batches of submitted items to ``handler``; `start` runs it."""
+        if min(workers, max_pending, batch_size) < 1:
+            msg = "workers, max_pending and batch_size must be at least 1"
+            raise ValueError(msg)
+        self.handler = handler
+        self.sink = sink
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.processed = 0
+        self.failed = 0
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=max_pending)
+        self._tasks: list[asyncio.Task[None]] = []
+        self._closed = False
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        self._tasks = [asyncio.create_task(self._work(), name=f"pipeline-{i}") for i in range(self.workers)]
+
+    async def submit(self, item: str) -> None:
+        """Queue ``item``, waiting while ``max_pending`` items wait; bound the wait with `asyncio.wait_for`.
+
+        Raises:
+            RuntimeError: The pipeline is closed.
+        """
+        if self._closed:
+            msg = "Pipeline is closed"
+            raise RuntimeError(msg)
+        await self._queue.put(item)
+
+    async def close(self) -> None:
+        """Process every submitted item, then stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        # One stop marker per worker, queued behind the items, so that every item is processed first.
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+
+    async def __aenter__(self) -> "Pipeline":
+        """Start the pipeline."""
+        self.start()
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Close the pipeline, finishing the submitted items."""
+        await self.close()
+
+    def _take_waiting(self, batch: list[str]) -> bool:
+        """Move waiting items into ``batch`` until it is full; return whether a stop marker was taken."""
+        while len(batch) < self.batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    async def _next_batch(self) -> tuple[list[str], bool]:
+        """Wait for an item and gather a batch around it; also return whether to stop."""
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        stop = self._take_waiting(batch)
+        if not stop and len(batch) < self.batch_size and self.batch_timeout > 0:
+            await asyncio.sleep(self.batch_timeout)
+            stop = self._take_waiting(batch)
+        return batch, stop
+
+    async def _work(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = await self.handler(batch)
+                if self.sink is not None:
+                    self.sink(results)
+            except Exception:
+                logger.exception("Failed to process a batch of %d items", len(batch))
+                self.failed += len(batch)
+            else:
+                self.processed += len(batch)
+
+
+async def run(items: Iterable[str] | AsyncIterable[str], workers: int = 4, batch_size: int = 64) -> list[str]:
+    """Process ``items`` with a `Pipeline` and return their results, in completion order.
+
+    Args:
+        items: Items to process.
+        workers: Number of worker tasks.
+        batch_size: Maximum number of items per batch.
+
+    Returns:
+        The results of every item that was processed successfully.
+    """
+    results: list[str] = []
+    async with Pipeline(sink=results.extend, workers=workers, batch_size=batch_size) as pipeline:
+        if isinstance(items, AsyncIterable):
+            async for item in items:
+                await pipeline.submit(item)
+        else:
+            for item in items:
+                await pipeline.submit(item)
+    return results
+
+
+async def _serve_stdin() -> None:  # pragma: no cover
+    """Process stdin line by line; on SIGTERM or Ctrl-C, stop reading and finish the submitted lines."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    async with Pipeline(sink=lambda results: sys.stdout.writelines(f"{result}\n" for result in results)) as pipeline:
+
+        def read_stdin() -> None:
+            # Blocking reads run on their own thread; waiting for each submission keeps the backpressure.
+            try:
+                for line in sys.stdin:
+                    asyncio.run_coroutine_threadsafe(pipeline.submit(line.rstrip("\n")), loop).result()
+                loop.call_soon_threadsafe(stop.set)
+            except RuntimeError:
+                return
+
+        threading.Thread(target=read_stdin, daemon=True).start()
+        await stop.wait()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    asyncio.run(_serve_stdin())
+{% elif cookiecutter.concurrency == "processes" -%}
+"""Main module for {{cookiecutter.project_name}}.
+
+`Pipeline` processes a stream of items on a pool of worker processes, in batches, with a bound on the
+work in flight. Put the service's work in `process_batch`, and feed the pipeline with `Pipeline.submit`.
+"""
+
+import logging
+import multiprocessing
+import queue
+import signal
+import sys
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import TracebackType
+{%- if cookiecutter.instrumentation == "y" %}
+from typing import Any
+
+from {{cookiecutter.project_slug}}.instrumentation import REGISTRY, timed
+{%- endif %}
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[str]], list[str]]
+Sink = Callable[[list[str]], None]
+
+
+{% if cookiecutter.instrumentation == "y" %}@timed("main_seconds", "Time spent in main")
+{% endif %}def main(bar: str) -> str:
+    """Summary line.
+
+    Extended description of function.
+
+    Args:
+        bar: Description of input argument.
+
+    Returns:
+        Description of return value
+    """
+    return bar
+
+
+def process_batch(batch: list[str]) -> list[str]:
+    """Process a batch of items and return their results.
+
+    Runs in a worker process, so it must be a module-level function, and items and results must be
+    picklable. Batches amortize the cost of sending work to another process; replace the body with
+    the service's work.
+
+    Args:
+        batch: Items in submission order.
+
+    Returns:
+        One result per item.
+    """
+    return [main(item) for item in batch]
+
+
+{% if cookiecutter.instrumentation == "y" %}def _run_batch(handler: BatchHandler, batch: list[str]) -> tuple[list[str], dict[str, Any]]:
+    """Run ``handler`` in a worker process and return its results with the metrics the worker recorded."""
+    return handler(batch), REGISTRY.drain()
+
+
+{% endif %}def _ignore_interrupts() -> None:
+    """Leave Ctrl-C, which the terminal sends to every process of the group, to the parent's shutdown."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class Pipeline:
+    """Process items in batches on a pool of worker processes, with a bound on the work in flight.
+
+    - Batching: submitted items are collected into batches of ``batch_size``, each sent to a worker
+      process in one call. A partial batch is sent by `flush` or `close`.
+    - Backpressure: `submit` blocks while ``max_pending`` items are sent but not yet processed, so
+      producers slow down to the pace of the workers instead of queueing without bound.
+    - Graceful shutdown: `close`, or leaving the ``with`` block, stops accepting items, lets the
+      workers finish every submitted item and shuts the pool down.
+
+    A batch that raises is logged and counted in ``failed``; the workers carry on. ``sink`` receives
+    the results of each batch, in this process, on the pool's result thread. Processes suit CPU-bound
+    work, which runs in parallel on every core; workers start with the ``spawn`` method, the same way
+    on every platform.
+{%- if cookiecutter.instrumentation == "y" %} The metrics a worker records while processing a batch are
+    merged into this process's registry along with the batch's results.
+{%- endif %}
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler = process_batch,
+        sink: Sink | None = None,
+        *,
+        workers: int | None = None,
+        max_pending: int = 4096,
+        batch_size: int = 256,
+    ) -> None:
+        """Start a pool of ``workers`` processes (one per CPU by default) that run ``handler`` on batches."""
+        if min(max_pending, batch_size) < 1 or (workers is not None and workers < 1):
+            msg = "workers, max_pending and batch_size must be at least 1"
+            raise ValueError(msg)
+        self.handler = handler
+        self.sink = sink
+        self.batch_size = batch_size
+        self.processed = 0
+        self.failed = 0
+        # Room for at least one batch in flight, whatever max_pending is.
+        self._in_flight = threading.BoundedSemaphore(max(max_pending // batch_size, 1))
+        self._batch: list[str] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"), initializer=_ignore_interrupts
+        )
+
+    def submit(self, item: str, timeout: float | None = None) -> None:
+        """Add ``item`` to the current batch, sending the batch once it is full.
+
+        Raises:
+            queue.Full: No batch finished within ``timeout`` seconds to make room for a full one.
+            RuntimeError: The pipeline is closed.
+        """
+        with self._lock:
+            if self._closed:
+                msg = "Pipeline is closed"
+                raise RuntimeError(msg)
+            self._batch.append(item)
+            if len(self._batch) < self.batch_size:
+                return
+            batch, self._batch = self._batch, []
+        self._send(batch, timeout)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Send the current batch even if it is not full."""
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            self._send(batch, timeout)
+
+    def close(self) -> None:
+        """Process every submitted item, then shut the worker processes down."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "Pipeline":
+        """Return the running pipeline."""
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Close the pipeline, finishing the submitted items."""
+        self.close()
+
+    def _send(self, batch: list[str], timeout: float | None) -> None:
+        if not self._in_flight.acquire(timeout=timeout):
+            with self._lock:
+                # Keep the items: they go out with a later batch.
+                self._batch[:0] = batch
+            msg = f"No room for a batch within {timeout} seconds"
+            raise queue.Full(msg)
+{%- if cookiecutter.instrumentation == "y" %}
+        future = self._pool.submit(_run_batch, self.handler, batch)
+{%- else %}
+        future = self._pool.submit(self.handler, batch)
+{%- endif %}
+        future.add_done_callback(lambda future: self._done(future, len(batch)))
+
+{%- if cookiecutter.instrumentation == "y" %}
+
+    def _done(self, future: Future[tuple[list[str], dict[str, Any]]], size: int) -> None:
+        self._in_flight.release()
+        try:
+            results, metrics = future.result()
+            REGISTRY.merge(metrics)
+{%- else %}
+
+    def _done(self, future: Future[list[str]], size: int) -> None:
+        self._in_flight.release()
+        try:
+            results = future.result()
+{%- endif %}
+            if self.sink is not None:
+                self.sink(results)
+        except Exception:
+            logger.exception("Failed to process a batch of %d items", size)
+            with self._lock:
+                self.failed += size
+        else:
+            with self._lock:
+                self.processed += size
+
+
+def run(items: Iterable[str], workers: int | None = None, batch_size: int = 256) -> list[str]:
+    """Process ``items`` with a `Pipeline` and return their results, in completion order.
+
+    Args:
+        items: Items to process.
+        workers: Number of worker processes; one per CPU by default.
+        batch_size: Number of items per batch.
+
+    Returns:
+        The results of every item that was processed successfully.
+    """
+    results: list[str] = []
+    with Pipeline(sink=results.extend, workers=workers, batch_size=batch_size) as pipeline:
+        for item in items:
+            pipeline.submit(item)
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover
+    # Process stdin line by line; on SIGTERM or Ctrl-C, stop reading and finish the submitted lines.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with Pipeline(sink=lambda results: sys.stdout.writelines(f"{result}\n" for result in results)) as pipeline:
+        try:
+            for line in sys.stdin:
+                pipeline.submit(line.rstrip("\n"))
+        except KeyboardInterrupt:
+            pass
+{% endif -%}
@@ -0,0 +1,166 @@
+"""CPU and memory profiling helpers for {{cookiecutter.project_name}}.
+
+Run a module (such as ``pytest``, to profile a test selection) under a profiler and write the results
+to ``.profiles/``::
+
+    python -m {{cookiecutter.project_slug}}.profiling cpu pytest tests -k slow
+    python -m {{cookiecutter.project_slug}}.profiling memory {{cookiecutter.project_slug}}.main
+
+``cpu`` writes the raw cProfile data (``cpu.prof``), the stats sorted by cumulative time
+(``cpu.txt``) and sampled call stacks in the collapsed format read by flamegraph.pl and speedscope
+(``cpu.collapsed``). ``memory`` writes the top allocation sites still held when the target finishes
+(``memory.txt``) and their allocation stacks, weighted by bytes (``memory.collapsed``).
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import runpy
+import sys
+import sysconfig
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import CodeType, TracebackType
+
+DEFAULT_OUTPUT_DIR = Path(".profiles")
+
+
+def _short_path(filename: str) -> str:
+    """Shorten a source path to its location inside site-packages, the working directory or the stdlib."""
+    if "site-packages" + os.sep in filename:
+        return filename.rsplit("site-packages" + os.sep, 1)[-1]
+    for root in (os.getcwd(), sysconfig.get_path("stdlib")):
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1 :]
+    return filename
+
+
+def _frame_label(code: CodeType) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def write_collapsed(counts: Counter[str], path: Path) -> None:
+    """Write stack counts in the collapsed format: frames joined by ``;``, a space and the count."""
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in counts.most_common()))
+
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval and counts identical stacks."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001) -> None:
+        """Prepare to sample the thread with ``thread_id`` every ``interval`` seconds."""
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        """Start sampling."""
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+
+def run_module(module: str, args: list[str]) -> int:
+    """Run ``module`` like ``python -m module args`` and return its exit code."""
+    saved_argv = sys.argv
+    sys.argv = [module, *args]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def profile_cpu(module: str, args: list[str], output_dir: Path, top: int = 50) -> int:
+    """Run ``module`` under cProfile and a stack sampler, writing ``cpu.*`` files to ``output_dir``."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    with StackSampler(threading.get_ident()) as sampler:
+        profiler.enable()
+        try:
+            exit_code = run_module(module, args)
+        finally:
+            profiler.disable()
+
+    profiler.dump_stats(output_dir / "cpu.prof")
+    with (output_dir / "cpu.txt").open("w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    write_collapsed(sampler.counts, output_dir / "cpu.collapsed")
+    return exit_code
+
+
+def profile_memory(module: str, args: list[str], output_dir: Path, top: int = 50, frames: int = 25) -> int:
+    """Run ``module`` under tracemalloc, writing ``memory.*`` files to ``output_dir``."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tracemalloc.start(frames)
+    try:
+        exit_code = run_module(module, args)
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+    )
+
+    lines = [f"Peak traced memory: {peak / 1024:.1f} KiB", f"Top {top} allocation sites still held at exit:", ""]
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {_short_path(frame.filename)}:{frame.lineno}"
+        )
+    (output_dir / "memory.txt").write_text("\n".join(lines) + "\n")
+
+    counts: Counter[str] = Counter()
+    for stat in snapshot.statistics("traceback"):
+        stack = ";".join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+        counts[stack] += stat.size
+    write_collapsed(counts, output_dir / "memory.collapsed")
+    return exit_code
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point; see the module docstring."""
+    parser = argparse.ArgumentParser(prog="profiling", description="Profile a module run like `python -m`.")
+    parser.add_argument("mode", choices=["cpu", "memory"])
+    parser.add_argument("module", help="module to run, e.g. pytest or {{cookiecutter.project_slug}}.main")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the module")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--top", type=int, default=50, help="number of entries in the text reports")
+    options = parser.parse_args(argv)
+
+    profile = profile_cpu if options.mode == "cpu" else profile_memory
+    exit_code = profile(options.module, options.args, options.output_dir, top=options.top)
+    print(f"Wrote {options.mode} profile to {options.output_dir}/")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())